@@ -0,0 +1,441 @@
+"""
+Benchmarks of the main paths of mpPy6 (headless, using the offscreen Qt platform). The throughput benchmarks use the
+Qt-free CProcessControlCore (signals are delivered in the monitor thread), thus they measure mpPy6 and not the event
+loop of Qt.
+
+    python benchmarks/benchmark_mppy6.py --output results.json
+    python benchmarks/benchmark_mppy6.py --quick --baseline results.json
+
+The results are written as JSON, thus they can be compared between versions (--baseline prints the relative change of
+every value). Durations are in seconds, rates in 1/s and payload sizes in bytes.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '../src'))
+
+from PySide6.QtWidgets import QApplication
+
+import mpPy6
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# ======================================================================================================================
+#   Child process and control class used by all benchmarks
+# ======================================================================================================================
+class BenchmarkChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(signal_name='echoed')
+    def echo(self, value):
+        return value
+
+    @mpPy6.CProcess.register_signal()
+    def consume(self, payload):
+        return len(payload)
+
+    @mpPy6.CProcess.register_signal()
+    def produce(self, nbytes: int):
+        if np is not None:
+            return np.ones(nbytes, dtype=np.uint8)
+        return bytes(nbytes)
+
+    @mpPy6.CProcess.register_signal(signal_name='ticked')
+    def tick(self, i: int):
+        return i
+
+    @mpPy6.CProcess.register_signal()
+    def burst(self, n: int):
+        for i in range(n):
+            self.tick(i)
+
+    @mpPy6.CProcess.register_signal()
+    def spin(self, duration: float):
+        t_end = time.perf_counter() + duration
+        while time.perf_counter() < t_end:
+            pass
+
+
+class BenchmarkChildProcessControl(mpPy6.CProcessControl):
+    echoed = mpPy6.Signal(object)
+    ticked = mpPy6.Signal(int)
+
+    def __init__(self, parent=None, workers: int = 1, *args, **kwargs):
+        super().__init__(parent, module_log_level=100, *args, **kwargs)
+        self.on_exception_raised.disconnect(self.display_exception)
+        self.register_child_pool(BenchmarkChildProcess, workers)
+
+    @mpPy6.CProcessControl.register_function()
+    def echo(self, value):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def consume(self, payload):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def produce(self, nbytes: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def burst(self, n: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def spin(self, duration: float):
+        pass
+
+    def close(self):
+        self.safe_exit(reason="Benchmark finished.")
+        for child in self.children:
+            child.join(timeout=10)
+
+
+class BenchmarkChildProcessControlCore(mpPy6.CProcessControlCore):
+    """
+    Headless control class (CSignal instead of Qt signals) of the throughput benchmarks.
+    """
+    echoed = mpPy6.CSignal(object)
+    ticked = mpPy6.CSignal(int)
+
+    def __init__(self, workers: int = 1, *args, **kwargs):
+        super().__init__(module_log_level=100, *args, **kwargs)
+        self.on_exception_raised.disconnect(self.display_exception)
+        self.register_child_pool(BenchmarkChildProcess, workers)
+
+    @mpPy6.CProcessControlCore.register_function()
+    def echo(self, value):
+        pass
+
+    @mpPy6.CProcessControlCore.register_function()
+    def burst(self, n: int):
+        pass
+
+    @mpPy6.CProcessControlCore.register_function()
+    def spin(self, duration: float):
+        pass
+
+    def close(self):
+        self.safe_exit(reason="Benchmark finished.")
+        for child in self.children:
+            child.join(timeout=10)
+
+
+# ======================================================================================================================
+#   Helpers
+# ======================================================================================================================
+def wait_for(predicate, timeout: float = 60):
+    """
+    Processes the Qt events (thus queued signals are delivered) until predicate() is True.
+    """
+    t_end = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > t_end:
+            raise TimeoutError("Benchmark timed out.")
+        QApplication.processEvents()
+
+
+class Counter:
+    """
+    Counts the emissions of a CSignal (in the monitor thread) and wakes up the thread waiting for a number of them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._condition = threading.Condition()
+
+    def __call__(self, *args):
+        with self._condition:
+            self.count += 1
+            self._condition.notify_all()
+
+    def wait(self, n: int, timeout: float = 60):
+        with self._condition:
+            if not self._condition.wait_for(lambda: self.count >= n, timeout=timeout):
+                raise TimeoutError("Benchmark timed out.")
+
+
+def summarize(samples: list[float]) -> dict:
+    samples = sorted(samples)
+    return {'n': len(samples),
+            'mean': statistics.fmean(samples),
+            'p50': samples[len(samples) // 2],
+            'p90': samples[int(len(samples) * 0.9)],
+            'p99': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+            'max': samples[-1]}
+
+
+def make_payload(nbytes: int):
+    if np is not None:
+        return np.ones(nbytes, dtype=np.uint8)
+    return bytes(nbytes)
+
+
+def start_controller(control_class: type = BenchmarkChildProcessControl, **kwargs):
+    control = control_class(**kwargs)
+    try:
+        # Wait until the children are running
+        for _ in control.children:
+            control.echo(0).result(timeout=60)
+    except Exception:
+        control.close()
+        raise
+    return control
+
+
+# ======================================================================================================================
+#   Benchmarks
+# ======================================================================================================================
+def bench_round_trip(args) -> dict:
+    """
+    Latency of a command until its signal has been delivered in the GUI thread (and until its future is resolved).
+    """
+    control = start_controller()
+    received = []
+    control.echoed.connect(received.append)
+    signal_latency, future_latency = [], []
+    try:
+        for i in range(args.round_trips):
+            t0 = time.perf_counter()
+            future = control.echo(i)
+            future.result(timeout=60)
+            future_latency.append(time.perf_counter() - t0)
+            wait_for(lambda: len(received) > i)
+            signal_latency.append(time.perf_counter() - t0)
+    finally:
+        control.close()
+    return {'signal': summarize(signal_latency), 'future': summarize(future_latency)}
+
+
+def bench_command_throughput(args) -> dict:
+    """
+    Commands per second, sent without waiting, until all signals have been delivered.
+    """
+    control = start_controller(BenchmarkChildProcessControlCore)
+    received = Counter()
+    control.echoed.connect(received)
+    try:
+        t0 = time.perf_counter()
+        for i in range(args.commands):
+            control.echo(i)
+        t_sent = time.perf_counter() - t0
+        received.wait(args.commands)
+        duration = time.perf_counter() - t0
+    finally:
+        control.close()
+    return {'commands': args.commands, 'send_rate': args.commands / t_sent, 'rate': args.commands / duration}
+
+
+def bench_result_throughput(args) -> dict:
+    """
+    Results per second, emitted by the child in a loop, with and without batching.
+    """
+    results = {}
+    for name, kwargs in (('unbatched', {}),
+                         ('batched', {'result_batch_interval': 0.01, 'result_batch_size': 500})):
+        control = start_controller(BenchmarkChildProcessControlCore, **kwargs)
+        received = Counter()
+        control.ticked.connect(received)
+        try:
+            t0 = time.perf_counter()
+            control.burst(args.results)
+            received.wait(args.results)
+            duration = time.perf_counter() - t0
+        finally:
+            control.close()
+        results[name] = {'results': args.results, 'rate': args.results / duration}
+    return results
+
+
+def bench_payload_scaling(args) -> dict:
+    """
+    Time to transfer a payload as argument (to the child) and as result (from the child), pickled or using shared
+    memory.
+    """
+    results = {}
+    for name, threshold in (('pickle', None), ('shared_memory', 0)):
+        control = start_controller(shared_memory_threshold=threshold)
+        results[name] = {}
+        try:
+            for nbytes in args.payload_sizes:
+                payload = make_payload(nbytes)
+                to_child, from_child = [], []
+                for _ in range(args.payload_repeats):
+                    t0 = time.perf_counter()
+                    assert control.consume(payload).result(timeout=600) == nbytes
+                    to_child.append(time.perf_counter() - t0)
+
+                    t0 = time.perf_counter()
+                    res = control.produce(nbytes).result(timeout=600)
+                    from_child.append(time.perf_counter() - t0)
+                    del res
+                del payload
+                results[name][str(nbytes)] = {'argument': statistics.median(to_child),
+                                              'result': statistics.median(from_child),
+                                              'argument_bandwidth': nbytes / statistics.median(to_child),
+                                              'result_bandwidth': nbytes / statistics.median(from_child)}
+        finally:
+            control.close()
+    return results
+
+
+def bench_process_scaling(args) -> dict:
+    """
+    Throughput with several controllers (one child each) and with a pool of workers executing CPU bound commands.
+    """
+    controllers = {}
+    for n in args.process_counts:
+        controls = [start_controller(BenchmarkChildProcessControlCore) for _ in range(n)]
+        try:
+            t0 = time.perf_counter()
+            futures = [c.echo(i) for i in range(args.commands // n) for c in controls]
+            for f in futures:
+                f.result(timeout=60)
+            controllers[str(n)] = {'rate': len(futures) / (time.perf_counter() - t0)}
+        finally:
+            for c in controls:
+                c.close()
+
+    pool = {}
+    for n in args.process_counts:
+        control = start_controller(BenchmarkChildProcessControlCore, workers=n)
+        try:
+            t0 = time.perf_counter()
+            futures = [control.spin(0.01) for _ in range(args.pool_tasks)]
+            for f in futures:
+                f.result(timeout=60)
+            pool[str(n)] = {'rate': args.pool_tasks / (time.perf_counter() - t0)}
+        finally:
+            control.close()
+    return {'controllers': controllers, 'pool': pool}
+
+
+def bench_startup_shutdown(args) -> dict:
+    """
+    Time until a new controller's child answers its first command, and until the child has ended after safe_exit.
+    Children started by a forkserver (with Qt and NumPy preloaded) are measured separately, the first start (of the
+    server) is excluded.
+    """
+    results = {}
+    for name, kwargs in (('', {}),
+                         ('forkserver_', {'start_method': 'forkserver', 'preload': ['PySide6.QtWidgets', 'numpy']})):
+        if kwargs:
+            BenchmarkChildProcessControl(**kwargs).close()
+        startup, shutdown = [], []
+        for _ in range(args.startups):
+            t0 = time.perf_counter()
+            control = BenchmarkChildProcessControl(**kwargs)
+            control.echo(0).result(timeout=60)
+            startup.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            control.close()
+            shutdown.append(time.perf_counter() - t0)
+        results[f'{name}startup'] = summarize(startup)
+        results[f'{name}shutdown'] = summarize(shutdown)
+    return results
+
+
+BENCHMARKS = {
+    'round_trip': bench_round_trip,
+    'command_throughput': bench_command_throughput,
+    'result_throughput': bench_result_throughput,
+    'payload_scaling': bench_payload_scaling,
+    'process_scaling': bench_process_scaling,
+    'startup_shutdown': bench_startup_shutdown,
+}
+
+
+# ======================================================================================================================
+#   Reporting
+# ======================================================================================================================
+def metadata() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': commit or None,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np is not None}
+
+
+def flatten(results: dict, prefix: str = '') -> dict:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def compare(results: dict, baseline: dict):
+    current, previous = flatten(results), flatten(baseline)
+    for key, value in current.items():
+        if key in previous and isinstance(value, (int, float)) and previous[key]:
+            change = (value - previous[key]) / previous[key] * 100
+            print(f"{key:70s} {previous[key]:14.6g} -> {value:14.6g} ({change:+7.1f}%)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('benchmarks', nargs='*', choices=[[]] + list(BENCHMARKS),
+                        help="Benchmarks to run (default: all).")
+    parser.add_argument('--output', '-o', help="Write the results to this JSON file.")
+    parser.add_argument('--baseline', '-b', help="Compare the results with this JSON file.")
+    parser.add_argument('--quick', action='store_true', help="Smaller workloads, e.g. for CI.")
+    args = parser.parse_args(argv)
+
+    args.round_trips = 100 if args.quick else 1000
+    args.commands = 1000 if args.quick else 10000
+    args.results = 5000 if args.quick else 50000
+    args.payload_sizes = ([2 ** 10, 2 ** 20, 2 ** 24] if args.quick else
+                          [2 ** 4, 2 ** 10, 2 ** 16, 2 ** 20, 2 ** 24, 2 ** 27, 2 ** 28])
+    args.payload_repeats = 3 if args.quick else 5
+    args.process_counts = [1, 2, 4] if args.quick else [1, 2, 4, 8]
+    args.pool_tasks = 40 if args.quick else 200
+    args.startups = 3 if args.quick else 10
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+
+    results = {}
+    for name in args.benchmarks or list(BENCHMARKS):
+        print(f"Running {name}...", file=sys.stderr)
+        results[name] = BENCHMARKS[name](args)
+
+    report = {'metadata': metadata(), 'results': results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f)['results'])
+
+
+if __name__ == '__main__':
+    main()
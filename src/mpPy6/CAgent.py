@@ -0,0 +1,167 @@
+import argparse
+import importlib
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import connection
+
+from mpPy6.CBase import CBase
+from mpPy6.CQueue import CQueue
+
+
+class CAgent(CBase):
+    """
+        Hosts children on another machine. A control class started with agent_address connects once per child (see
+        CRemoteProcess) and sends the class of the child (which has to be importable by the agent), its arguments and
+        then the commands. The agent starts the child with local queues and sends its results and log records back.
+        The connection is authenticated with authkey (HMAC, see multiprocessing.connection), thus only trusted control
+        classes can start children: the messages are pickled.
+
+        Started with "python -m mpPy6.CAgent HOST:PORT" (or a path of a Unix socket), the authkey is read from the
+        environment variable MPPY6_AGENT_AUTHKEY.
+    """
+
+    def __init__(self, address, authkey: bytes, start_method: str = None):
+        """
+        :param address: (host, port) of a TCP socket or the path of a Unix socket.
+        :param authkey: Key shared with the control classes.
+        :param start_method: Start method of the children, None uses the default of multiprocessing.
+        """
+        super().__init__()
+        if not authkey:
+            raise ValueError("The agent requires an authkey.")
+        self._module_logger = self.create_new_logger(f"(cmp) {self.name}")
+        self._mp_context = multiprocessing.get_context(start_method)
+        self._listener = connection.Listener(address, authkey=authkey)
+        self.address = self._listener.address
+
+    def serve_forever(self):
+        """
+        Accepts control classes until close() is called. Every connection is served by a thread.
+        """
+        self._module_logger.info(f"Agent listening on {self.address}.")
+        while True:
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError) as e:
+                if self._listener._listener is None:
+                    # Closed
+                    return
+                self._module_logger.warning(f"Connection refused: {e}")
+                continue
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def close(self):
+        self._listener.close()
+
+    def _serve(self, conn: connection.Connection):
+        try:
+            _, child_path, args, kwargs, options, command_table = conn.recv()
+            module_name, _, class_name = child_path.partition(':')
+            child_class = importlib.import_module(module_name)
+            for attribute in class_name.split('.'):
+                child_class = getattr(child_class, attribute)
+            # The commands are sent by their index in the table (CCommandRecord.func_id)
+            if child_class.command_table() != tuple(command_table):
+                raise ValueError(f"the commands of {child_path} differ from the ones of the control class (another "
+                                 f"version of the code?)")
+        except Exception as e:
+            self._module_logger.error(f"Cannot start child: {e}")
+            conn.send(('exit', 1))
+            conn.close()
+            return
+
+        ctx = self._mp_context
+        priority_queues = [CQueue(ctx=ctx) for _ in range(options.pop('lanes'))]
+        state_queue, log_queue = CQueue(ctx=ctx), CQueue(ctx=ctx)
+        control_queue, command_acks = ctx.Queue(), CQueue(ctx=ctx)
+        kill_flag = ctx.Value('i', 1)
+        child = child_class(state_queue, priority_queues[options.pop('cmd_lane')],
+                            kill_flag=kill_flag,
+                            control_queue=control_queue,
+                            priority_queues=priority_queues,
+                            log_queue=log_queue,
+                            command_acks=command_acks,
+                            *args, **options, **kwargs)
+        child.start()
+        self._module_logger.info(f"Started {child_path} ({child.pid}) for {conn}.")
+
+        threading.Thread(target=self._forward_commands,
+                         args=(conn, control_queue, priority_queues, kill_flag), daemon=True).start()
+        self._forward_records(conn, child, state_queue, log_queue, command_acks)
+        child.join()
+        self._module_logger.info(f"Child {child_path} ({child.pid}) ended with exit code {child.exitcode}.")
+        try:
+            conn.send(('exit', child.exitcode))
+        except OSError:
+            pass
+        conn.close()
+
+    def _forward_commands(self, conn: connection.Connection, control_queue, priority_queues: list[CQueue], kill_flag):
+        """
+        Puts the commands received from the control class into the queue of their lane (-1 is the control_queue).
+        Stops the child, if the control class stops it or the connection is lost.
+        """
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == 'stop':
+                break
+            _, lane, cmd, timeout = message
+            # Relative to the time of receipt, since the clocks of the machines may differ
+            cmd.deadline = time.time() + timeout if timeout is not None else None
+            (control_queue if lane < 0 else priority_queues[lane]).put(cmd)
+        kill_flag.value = 0
+        control_queue.put(None)
+
+    @staticmethod
+    def _forward_records(conn: connection.Connection, child, state_queue: CQueue, log_queue: CQueue, command_acks):
+        """
+        Sends the results and log records of the child to the control class, until the child ended. The commands
+        taken by the child are acknowledged (see CRemoteProcess._forward_commands). A record the child was writing
+        when it ended is discarded.
+        """
+        while True:
+            ready = connection.wait([state_queue._reader, log_queue._reader, command_acks._reader, child.sentinel])
+            for kind, q in (('state', state_queue), ('log', log_queue), ('ack', command_acks)):
+                while True:
+                    try:
+                        record = q.get_written_by(child.sentinel)
+                    except (queue.Empty, EOFError):
+                        break
+                    try:
+                        conn.send((kind, record))
+                    except OSError:
+                        # The control class is gone, the child is stopped by _forward_commands
+                        pass
+            if child.sentinel in ready:
+                # All records of the child have been written before it ended
+                return
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description="Hosts mpPy6 children for remote control classes.")
+    parser.add_argument('address', help="HOST:PORT of a TCP socket or the path of a Unix socket")
+    parser.add_argument('--start-method', default=None, help="Start method of the children")
+    parser.add_argument('--log-level', default='INFO')
+    arguments = parser.parse_args(argv)
+
+    logging.basicConfig(level=arguments.log_level)
+    host, _, port = arguments.address.rpartition(':')
+    address = (host, int(port)) if port.isdigit() else arguments.address
+    authkey = os.environ.get('MPPY6_AGENT_AUTHKEY', '').encode()
+    agent = CAgent(address, authkey, arguments.start_method)
+    try:
+        agent.serve_forever()
+    except KeyboardInterrupt:
+        agent.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,5 @@
 import logging
 
-from rich.logging import RichHandler
-
 
 class CBase:
 
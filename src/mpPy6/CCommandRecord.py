@@ -1,7 +1,20 @@
+import time
+from contextvars import ContextVar
+
 from mpPy6 import CProcess as CProcess
+from mpPy6.CSharedMemory import from_shared_memory
 
 
 class CCommandRecord:
+    __slots__ = ('func_name', 'args', 'kwargs', 'proc_name', 'signal_name', 'func_id', 'cmd_id', 'deadline',
+                 't_sent', 't_received', 't_started')
+
+    # Id of the command currently executed, that has not been answered yet. It is consumed by the first function
+    # registered as signal (CProcess.register_signal), thus nested calls of registered functions do not answer it.
+    reply_to: ContextVar = ContextVar('reply_to', default=None)
+    # The command currently executed (not consumed by nested calls)
+    executing: ContextVar = ContextVar('executing', default=None)
+
     def __init__(self, proc_name: str, func_name: str, *args: (), **kwargs: {}, ):
         self.func_name: str = func_name
         self.args: () = args
@@ -9,17 +22,114 @@ class CCommandRecord:
         self.proc_name = proc_name
 
         self.signal_name: str = None
+        # Index of the function in the command table of the child (CProcess.command_table). If None, the function is
+        # looked up by its name.
+        self.func_id: int = None
+        # Correlation id, used by the control class to resolve the future of this command
+        self.cmd_id: int = None
+        # Time (time.time()) after which the command is not executed anymore, but answered with a CTimeoutException
+        self.deadline: float = None
+
+        # Timestamps (time.time()) of the stages: put into the cmd_queue, taken by the child, execution started
+        self.t_sent: float = None
+        self.t_received: float = None
+        self.t_started: float = None
 
     def register_signal(self, signal_name: str):
         self.signal_name: str = signal_name
 
+    def __getstate__(self):
+        # Compact wire format: a tuple instead of a dict of attribute names. The function is sent as its id, if it is
+        # in the command table, the process name is only known to the sender (see resolve_names).
+        func = self.func_id if self.func_id is not None else self.func_name
+        return func, self.args, self.kwargs, self.signal_name, self.cmd_id, self.deadline, self.t_sent
+
+    def __setstate__(self, state):
+        func, self.args, self.kwargs, self.signal_name, self.cmd_id, self.deadline, self.t_sent = state
+        if isinstance(func, int):
+            self.func_id, self.func_name = func, None
+        else:
+            self.func_id, self.func_name = None, func
+        self.proc_name = None
+        self.t_received = None
+        self.t_started = None
+
+    def resolve_names(self, command_table: tuple[str, ...], proc_name: str):
+        """
+        Restores the names, that are not sent with the command (see __getstate__).
+        :param command_table: CProcess.command_table() of the child class.
+        """
+        if self.func_name is None:
+            self.func_name = command_table[self.func_id]
+        self.proc_name = proc_name
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.time() > self.deadline
+
     def execute(self, class_object: CProcess):
+        args, kwargs = self._prepare(class_object)
+        token = CCommandRecord.reply_to.set(self.cmd_id)
+        executing_token = CCommandRecord.executing.set(self)
+        try:
+            res = self._call(class_object, args, kwargs)
+        except Exception as e:
+            self._answer_exception(class_object, e)
+            raise e
+        else:
+            self._answer(class_object, res)
+        finally:
+            self._finished(class_object)
+            CCommandRecord.executing.reset(executing_token)
+            CCommandRecord.reply_to.reset(token)
+
+    async def execute_async(self, class_object: CProcess):
+        """
+        Same as execute, but for coroutine functions. Has to be awaited in the event loop of the child.
+        """
+        args, kwargs = self._prepare(class_object)
+        token = CCommandRecord.reply_to.set(self.cmd_id)
+        executing_token = CCommandRecord.executing.set(self)
+        try:
+            res = await self._call(class_object, args, kwargs)
+        except Exception as e:
+            self._answer_exception(class_object, e)
+            raise e
+        else:
+            self._answer(class_object, res)
+        finally:
+            self._finished(class_object)
+            CCommandRecord.executing.reset(executing_token)
+            CCommandRecord.reply_to.reset(token)
+
+    def _prepare(self, class_object: CProcess):
         if hasattr(class_object, '_internal_logger'):
             class_object._module_logger.info(f"Executing {self} in {class_object.name}.")
+        # Arguments placed in shared memory are handed over as views of the segments
+        args = from_shared_memory(self.args, class_object._shared_memory)
+        kwargs = from_shared_memory(self.kwargs, class_object._shared_memory)
+        self.t_started = time.time()
+        return args, kwargs
+
+    def _finished(self, class_object: CProcess):
+        statistics = class_object.command_statistics
+        if self.t_sent is not None and self.t_received is not None:
+            statistics.add(self.func_name, statistics.QUEUE_WAIT, self.t_received - self.t_sent)
+        statistics.add(self.func_name, statistics.EXECUTION, time.time() - self.t_started)
+
+    def _call(self, class_object: CProcess, args, kwargs):
+        method = class_object.resolve_command(self)[0]
         if self.signal_name is not None:
-            getattr(class_object, self.func_name)(signal_name=self.signal_name, *self.args, **self.kwargs)
-        else:
-            getattr(class_object, self.func_name)(*self.args, **self.kwargs)
+            return method(signal_name=self.signal_name, *args, **kwargs)
+        return method(*args, **kwargs)
+
+    def _answer(self, class_object: CProcess, res):
+        # The function is not registered as signal and did not answer the command, send its return value
+        if CCommandRecord.reply_to.get() is not None:
+            class_object._put_result_to_queue(self.func_name, None, res, cmd_id=self.cmd_id)
+
+    def _answer_exception(self, class_object: CProcess, e: Exception):
+        if CCommandRecord.reply_to.get() is not None:
+            class_object._put_exception_to_queue(self.func_name, e, cmd_id=self.cmd_id)
 
     def __repr__(self):
         args_str = ', '.join(map(repr, self.args))
@@ -12,6 +12,8 @@ class CException:
             value=self.exception,
             tb=self.exception.__traceback__)
         self.additional_info: str = ""
+        # Id of the command (CCommandRecord.cmd_id) that raised the exception
+        self.cmd_id: int = None
 
     def traceback_short(self) -> str:
         return "".join(self.traceback_list[-2:len(self.traceback_list)])
@@ -21,3 +23,10 @@ class CException:
 
     def set_additional_info(self, additional_info: str):
         self.additional_info = additional_info
+
+
+class CTimeoutException(CException):
+    """
+        Sent instead of executing a command, whose deadline (see CProcessControl.register_function) has passed. The
+        exception is a TimeoutError.
+    """
@@ -0,0 +1,22 @@
+import concurrent.futures
+
+
+class CFuture(concurrent.futures.Future):
+    """
+        Future of a registered function (CProcessControl.register_function), resolved by the monitor thread as soon as
+        the child has answered the command. It can be waited for from threads (result()) or awaited in a coroutine
+        running in an asyncio event loop (e.g. qasync). Done callbacks are called from the monitor thread.
+    """
+
+    def __init__(self, cmd_id: int, func_name: str):
+        super().__init__()
+        self.cmd_id: int = cmd_id
+        self.func_name: str = func_name
+
+    def __await__(self):
+        # Imported on demand, since most users never await a future
+        import asyncio
+        return asyncio.wrap_future(self).__await__()
+
+    def __repr__(self):
+        return f"CFuture <{self.func_name}#{self.cmd_id}> ({self._state})"
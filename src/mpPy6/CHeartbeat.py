@@ -0,0 +1,123 @@
+import os
+import sys
+import threading
+import time
+
+
+class CHeartbeat:
+    """
+        Health of a child, written by the child into shared memory and read by the control class. A thread of the child
+        updates the time of the heartbeat, the memory and CPU usage periodically, independent of the command loop. The
+        command loop records the command it is executing. Reading does not need any message, thus it also works while
+        the child is busy, and the control class knows the command of a child that died.
+    """
+    # Indices of the fields in the shared array
+    T_BEAT, CPU_TIME, RSS, COMMANDS, FUNC_ID, T_COMMAND, CMD_ID = range(7)
+    FIELDS = 7
+
+    def __init__(self, ctx, interval: float = 1.0):
+        """
+        :param ctx: Multiprocessing context of the child.
+        :param interval: Time between two heartbeats in seconds. If None, only the current command is recorded.
+        """
+        self.interval = interval
+        # Without a lock: every field is written by one thread only, and the control class must not block on a lock
+        # held by a child that died
+        self._values = ctx.RawArray('d', self.FIELDS)
+        self._values[self.FUNC_ID] = -1
+        self._values[self.CMD_ID] = -1
+        self._stop: threading.Event = None
+
+    def __getstate__(self):
+        return self.interval, self._values
+
+    def __setstate__(self, state):
+        self.interval, self._values = state
+        self._stop = None
+
+    # ==================================================================================================================
+    #   Child
+    # ==================================================================================================================
+    def start(self, name: str):
+        """
+        Starts the thread sending the heartbeats (called in the child).
+        """
+        if self.interval is None:
+            return
+        self._stop = threading.Event()
+        threading.Thread(target=self._run, name=f"{name}-heartbeat", daemon=True).start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    def _run(self):
+        while True:
+            self._values[self.CPU_TIME] = time.process_time()
+            rss = _resident_set_size()
+            self._values[self.RSS] = rss if rss is not None else -1
+            self._values[self.T_BEAT] = time.time()
+            if self._stop.wait(self.interval):
+                return
+
+    def command_started(self, func_id: int, cmd_id: int = None):
+        self._values[self.T_COMMAND] = time.time()
+        self._values[self.CMD_ID] = cmd_id if cmd_id is not None else -1
+        self._values[self.FUNC_ID] = func_id if func_id is not None else -2
+
+    def command_finished(self):
+        self._values[self.FUNC_ID] = -1
+        self._values[self.CMD_ID] = -1
+        self._values[self.COMMANDS] += 1
+
+    # ==================================================================================================================
+    #   Control class
+    # ==================================================================================================================
+    def command_id(self) -> int:
+        """
+        :return: cmd_id of the command executed by the command loop, None if there is none or it has no future.
+        """
+        cmd_id = int(self._values[self.CMD_ID])
+        return cmd_id if cmd_id >= 0 else None
+
+    def snapshot(self, command_table: tuple[str, ...]) -> dict:
+        """
+        :param command_table: CProcess.command_table() of the child, used to name the current command.
+        :return: {'heartbeat_age', 'cpu_time', 'rss', 'commands', 'command', 'command_duration'}. The ages and durations
+            are in seconds, None if there was no heartbeat or there is no current command. 'rss' is in bytes, None if
+            the platform does not report it.
+        """
+        values = list(self._values)
+        now = time.time()
+        func_id = int(values[self.FUNC_ID])
+        if func_id == -1:
+            command, command_duration = None, None
+        else:
+            command = command_table[func_id] if 0 <= func_id < len(command_table) else '<unknown>'
+            command_duration = now - values[self.T_COMMAND]
+        return {'heartbeat_age': now - values[self.T_BEAT] if values[self.T_BEAT] else None,
+                'cpu_time': values[self.CPU_TIME],
+                'rss': int(values[self.RSS]) if values[self.RSS] >= 0 else None,
+                'commands': int(values[self.COMMANDS]),
+                'command': command,
+                'command_duration': command_duration}
+
+
+def _resident_set_size() -> int:
+    """
+    Current resident set size in bytes. Falls back to the peak (getrusage), if /proc is not available. None on
+    platforms without both (Windows).
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        # POSIX only
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS, in kilobytes elsewhere
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
@@ -0,0 +1,97 @@
+import collections
+import logging
+import logging.handlers
+import threading
+import time
+
+
+class CBatchedQueueHandler(logging.handlers.QueueHandler):
+    """
+        QueueHandler, that sends the records as lists. A batch is sent if it has reached batch_size records, if a
+        record of at least flush_level is emitted, if flush() is called (the child does so, before it waits for the
+        next command), or at the latest max_delay seconds after its first record.
+    """
+
+    def __init__(self, queue, batch_size: int = 100, flush_level: int = logging.WARNING, on_batch_started=None,
+                 max_delay: float = None):
+        """
+        :param on_batch_started: Called if the first record of a new batch is emitted (e.g. for waking up the command
+            loop, that flushes the batch).
+        :param max_delay: Maximum time (seconds) a record waits in the batch, e.g. while the command loop executes a
+            long-running command. The batch is sent by a thread. None waits for one of the other conditions.
+        """
+        super().__init__(queue)
+        self.batch_size = batch_size
+        self.flush_level = flush_level
+        self.on_batch_started = on_batch_started
+        self.max_delay = max_delay
+        self._batch: list[logging.LogRecord] = []
+        self._batch_lock = threading.Lock()
+        # Set if a new batch has been started, the flush thread sends it after max_delay (created on first use)
+        self._batch_started = threading.Event()
+        self._flush_thread: threading.Thread = None
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            record = self.prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+        with self._batch_lock:
+            self._batch.append(record)
+            started = len(self._batch) == 1
+            full = len(self._batch) >= self.batch_size or record.levelno >= self.flush_level
+        if full:
+            self.flush()
+        elif started:
+            if self.on_batch_started is not None:
+                self.on_batch_started()
+            if self.max_delay is not None:
+                self._start_flush_timer()
+
+    def flush(self):
+        # Sent while holding the lock, thus the batches of several threads keep their order
+        with self._batch_lock:
+            if not self._batch:
+                return
+            batch, self._batch = self._batch, []
+            try:
+                self.enqueue(batch)
+            except Exception:
+                self.handleError(batch[-1])
+
+    def _start_flush_timer(self):
+        if self._flush_thread is None:
+            self._flush_thread = threading.Thread(target=self._flush_delayed, name="log-flush", daemon=True)
+            self._flush_thread.start()
+        self._batch_started.set()
+
+    def _flush_delayed(self):
+        while True:
+            self._batch_started.wait()
+            self._batch_started.clear()
+            time.sleep(self.max_delay)
+            self.flush()
+
+
+class CRingBufferHandler(logging.Handler):
+    """
+        Keeps the latest records in memory, thus they do not have to be sent to the control class. The records are
+        formatted when read (see lines()).
+    """
+
+    def __init__(self, capacity: int = 10000):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord):
+        self.records.append(record)
+
+    def lines(self, n: int = None) -> list[str]:
+        """
+        :param n: Number of latest records to return. None returns all records.
+        """
+        records = list(self.records)
+        if n is not None:
+            records = records[-n:]
+        return [self.format(record) for record in records]
@@ -1,23 +1,49 @@
+import collections
+import concurrent.futures
+import inspect
 import logging
 import logging.handlers
 import multiprocessing
 import os
+import queue
+import threading
 import time
 import traceback
-from multiprocessing import Process, Queue
+from multiprocessing import Process, Queue, connection
 
 import mpPy6
 from mpPy6.CBase import CBase
+from mpPy6.CHeartbeat import CHeartbeat
+from mpPy6.CLogHandler import CBatchedQueueHandler, CRingBufferHandler
+from mpPy6.CPropertyStore import CPropertyStore
+from mpPy6.CQueue import CQueue
+from mpPy6.CStatistics import CStatistics
+from mpPy6.CStream import CStreamNotification
+from mpPy6.CSharedMemory import CSharedMemoryRegistry, release_shared_memory, to_shared_memory
 
 
 # This is a Queue that behaves like stdout
 
 
 class CProcess(CBase, Process):
+    # Maximum number of threads executing the commands registered as concurrent. None uses the default of
+    # concurrent.futures.ThreadPoolExecutor.
+    max_concurrent_commands: int = None
+    # Maximum number of cancelled command ids kept. Cancellations are sent to every worker of a pool, thus most of them
+    # belong to commands executed by other workers (or already finished), the oldest ids are forgotten.
+    _CANCELLED_COMMANDS_LIMIT = 1024
+    # Maximum time (seconds) a log record below WARNING waits in the batch of the log queue, e.g. while a long-running
+    # command is executed
+    log_max_delay: float = 0.005
 
     def __init__(self, state_queue: Queue, cmd_queue: Queue,
                  kill_flag,
                  internal_log, internal_log_level, log_file=None,
+                 control_queue: Queue = None, priority_queues: list[Queue] = None, worker_index: int = 0,
+                 shared_memory_threshold: int = None,
+                 result_batch_interval: float = None, result_batch_size: int = None,
+                 log_queue: Queue = None, log_ring_size: int = None, standby: bool = False,
+                 heartbeat: CHeartbeat = None, property_store: CPropertyStore = None, command_acks: Queue = None,
                  *args, **kwargs):
         Process.__init__(self)
 
@@ -25,15 +51,131 @@ class CProcess(CBase, Process):
         self._internal_log_level_ = internal_log_level
         self.logger = None
         self.logger_handler = None
+        # The log records are sent to the control class via the log_queue (in batches), unless they are written to
+        # log_file or kept in a ring buffer of log_ring_size records. log_file may contain the placeholders {pid},
+        # {name} and {worker_index}.
         self.log_file = log_file
+        self.log_queue = log_queue if log_queue is not None else state_queue
+        self.log_ring_size = log_ring_size
 
         self.cmd_queue = cmd_queue
         self.state_queue = state_queue
+        # Private queue of this very child. Used for commands that have to reach every child of a pool (e.g.
+        # changing the log level), since the cmd_queue is shared between all workers.
+        self.control_queue = control_queue
+        # Command queues ordered by priority (highest first), the cmd_queue is one of them
+        self.priority_queues = priority_queues if priority_queues is not None else [cmd_queue]
+        self.worker_index = worker_index
         self._kill_flag = kill_flag
+        # A standby child is initialized (postrun_init), but only takes commands of its control_queue until it is
+        # activated by the control class (to replace a child that ended, see CProcessControl.restart_children).
+        self._active = not standby
+        # Shared with the control class: health of this child, updated by a thread independent of the command loop
+        self.heartbeat = heartbeat
+        # Values of the shared properties (see CProperty), read by the control class without messages
+        self.property_store = property_store
+        # Set by CAgent: every command taken by the command loop is acknowledged, thus the stand-in (CRemoteProcess)
+        # only forwards the next command of the shared queues if the command loop is ready for it
+        self.command_acks = command_acks
+        # Streams of this child to the control class, by name (see attach_stream)
+        self.streams: dict[str, 'mpPy6.CStream'] = {}
+        # Pipelines to other children (see CProcessControlCore.connect_pipeline): the results emitted as signal are
+        # sent as commands to the connected children (by signal name), the commands of the inputs are executed like
+        # the commands of the queues.
+        self._pipeline_outputs: dict[str, list[tuple]] = {}
+        self._pipeline_inputs: list[connection.Connection] = []
+
+        # Results (buffers) with at least this size in bytes are transferred using shared memory.
+        self.shared_memory_threshold = shared_memory_threshold
+        self._shared_memory: CSharedMemoryRegistry = None
+
+        # Results are grouped and sent as list, if they are produced within this time window (seconds) or until the
+        # batch has reached this size. If both are None, every result is sent on its own.
+        self.result_batch_interval = result_batch_interval
+        self.result_batch_size = result_batch_size
+        self._result_batch: list = []
+        self._result_batch_deadline: float = None
+        self._result_batch_lock: threading.RLock = None
+
+        # Durations of the commands executed by this child (see CStatistics)
+        self.command_statistics: CStatistics = None
+
+        # Created on demand in the child: executors of the concurrent commands and a pipe to wake up the command loop
+        self._executor: concurrent.futures.ThreadPoolExecutor = None
+        self._event_loop: 'asyncio.AbstractEventLoop' = None
+        self._wakeup_reader, self._wakeup_writer = None, None
+        # Ids of the commands cancelled by the control class (see cancel_command). Streaming functions stop before their
+        # next chunk, queued commands are skipped.
+        self._cancelled_commands: collections.OrderedDict[int, None] = collections.OrderedDict()
+        # Commands taken from the control_queue while a stream was executed in the command loop
+        self._deferred_commands: collections.deque = collections.deque()
+        # Entries (bound function, execution mode) of the functions in command_table(), built in the child
+        self._dispatch_table: list[tuple[callable, str]] = None
+        # Ids of the function and signal names, used for sending results (see CResultRecord.resolve_names)
+        self._function_ids: dict[str, int] = {}
+        self._signal_ids: dict[str, int] = {}
 
     # ==================================================================================================================
     #   Process
     # ==================================================================================================================
+    @classmethod
+    def command_table(cls) -> tuple[str, ...]:
+        """
+        Names of the functions, that can be called by the control class. The index of a name is the id of the command
+        (CCommandRecord.func_id). The table only depends on the class, thus it is the same in both processes.
+        """
+        table = cls.__dict__.get('_command_table')
+        if table is None:
+            table = tuple(sorted(name for name in dir(cls)
+                                 if not name.startswith('__') and callable(inspect.getattr_static(cls, name))))
+            cls._command_table = table
+        return table
+
+    @classmethod
+    def signal_table(cls) -> tuple[str, ...]:
+        """
+        Default signal names (see register_signal) of the functions in command_table(), None for functions without a
+        signal. Results are sent with the index of their signal (CResultRecord.signal_id), if it is in the table.
+        """
+        table = cls.__dict__.get('_signal_table')
+        if table is None:
+            table = tuple(getattr(inspect.getattr_static(cls, name), 'signal_name', None)
+                          for name in cls.command_table())
+            cls._signal_table = table
+        return table
+
+    # Execution modes of the dispatch table
+    _INLINE, _CONCURRENT, _ASYNC = 'inline', 'concurrent', 'async'
+
+    def _build_dispatch_table(self):
+        self._dispatch_table = []
+        self._function_ids = {name: func_id for func_id, name in enumerate(self.command_table())}
+        self._signal_ids = {}
+        for signal_id, signal_name in enumerate(self.signal_table()):
+            if signal_name is not None:
+                self._signal_ids.setdefault(signal_name, signal_id)
+        for name in self.command_table():
+            method = getattr(self, name)
+            if inspect.iscoroutinefunction(method):
+                mode = self._ASYNC
+            elif getattr(method, 'concurrent', False):
+                mode = self._CONCURRENT
+            else:
+                mode = self._INLINE
+            self._dispatch_table.append((method, mode))
+
+    def resolve_command(self, cmd) -> tuple[callable, str]:
+        """
+        Returns the function called by the command and its execution mode.
+        """
+        if cmd.func_id is not None:
+            return self._dispatch_table[cmd.func_id]
+        # Command built without the table of this class, e.g. for a function added to the instance
+        method = getattr(self, cmd.func_name)
+        if inspect.iscoroutinefunction(method):
+            return method, self._ASYNC
+        return method, self._CONCURRENT if getattr(method, 'concurrent', False) else self._INLINE
+
     def postrun_init(self):
         """
             Dummy function  for initializing e.g. loggers (some handlers are not pickable)
@@ -51,48 +193,121 @@ class CProcess(CBase, Process):
         if not isinstance(self.state_queue, multiprocessing.queues.Queue):
             raise TypeError(f"state_queue must be of type {Queue}, not {type(self.state_queue)}")
 
+        if (self.control_queue is not None and
+                not isinstance(self.control_queue, multiprocessing.queues.Queue)):
+            raise TypeError(f"control_queue must be of type {Queue}, not {type(self.control_queue)}")
+
+        for q in self.priority_queues:
+            if not isinstance(q, multiprocessing.queues.Queue):
+                raise TypeError(f"priority_queues must be of type {Queue}, not {type(q)}")
+
         return True
 
+    def _next_command(self, timeout: float = None):
+        """
+        Blocks until a command has been received. Commands addressed to this child (control_queue) are always taken
+        first, followed by the commands of the (possibly shared) priority_queues in order of their priority. Instead of
+        polling, the process sleeps on the pipes of the queues and on the sentinel of the parent process, thus it wakes
+        up immediately if something happens.
+        :param timeout: Maximum time to wait in seconds. None waits until something happens.
+        :return: The command or None, if woken up without a command (timeout, wakeup message or parent died).
+        """
+        if self._deferred_commands:
+            return self._deferred_commands.popleft()
+        queues = [self.control_queue] + self.priority_queues if self._active else [self.control_queue]
+        queues = [q for q in queues if q is not None]
+        parent = multiprocessing.parent_process()
+        sentinels = [parent.sentinel] if parent is not None else []
+        while True:
+            for q in queues:
+                try:
+                    return q.get(block=False)
+                except queue.Empty:
+                    pass
+            inputs = self._pipeline_inputs if self._active else []
+            for pipeline_input in inputs:
+                try:
+                    if pipeline_input.poll():
+                        return pipeline_input.recv()
+                except (EOFError, OSError):
+                    self._module_logger.warning(f"Pipeline input of {self.name} closed.")
+                    self._pipeline_inputs = [c for c in self._pipeline_inputs if c is not pipeline_input]
+                    return None
+            if self._result_batch and self._result_batch_deadline is None:
+                # Nothing to do: a partial batch without deadline (only result_batch_size) is not kept while sleeping
+                self._flush_result_batch()
+            ready = connection.wait([q._reader for q in queues] + inputs + [self._wakeup_reader] + sentinels,
+                                    timeout)
+            if not ready:
+                return None
+            if self._wakeup_reader in ready:
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv_bytes()
+                return None
+            if parent is not None and parent.sentinel in ready:
+                self._module_logger.error(f"Parent process {parent.pid} died. Terminating Process {os.getpid()}")
+                self._kill_flag.value = 0
+                return None
+
     def run(self):
         self.name = f"{os.getpid()}({self.name})"
-
+        self._shared_memory = CSharedMemoryRegistry()
+        self._result_batch_lock = threading.RLock()
+        self.command_statistics = CStatistics()
+        self._wakeup_reader, self._wakeup_writer = multiprocessing.Pipe(duplex=False)
+        if isinstance(self.state_queue, CQueue):
+            self.state_queue.on_drop = self._result_dropped
+
+        self.logger_handler = self._create_log_handler()
         self._module_logger = self.create_new_logger(f"(cmp) {self.name}",
-                                                     logger_handler=logging.handlers.QueueHandler(self.state_queue),
+                                                     logger_handler=self.logger_handler,
                                                      enabled=self._internal_log_enabled_,
                                                      level=self._internal_log_level_,
                                                      propagate=True
                                                      )
 
         self.logger = self.create_new_logger(f"{os.getpid()}({self.__class__.__name__})",
-                                             logger_handler=logging.handlers.QueueHandler(self.state_queue),
+                                             logger_handler=self.logger_handler,
                                              enabled=True)
 
         self._module_logger.debug(f"Child process {self.__class__.__name__} started.")
+        if self.heartbeat is not None:
+            self.heartbeat.start(self.name)
+        if self.property_store is not None:
+            self.property_store._notify = self._notify_property_store
 
         # sys.stderr.write = self.logger.error
         # sys.stdout.write = self.logger.info
 
         self.postrun_init()
+        self._build_dispatch_table()
 
         try:
             self._typecheck()
             while self._kill_flag.value:
-                try:
-                    cmd = self.cmd_queue.get(block=True, timeout=1)
-                except:
+                self.logger_handler.flush()
+                cmd = self._next_command(timeout=self._result_batch_timeout())
+                if self._result_batch_deadline is not None and time.time() >= self._result_batch_deadline:
+                    self._flush_result_batch()
+                if cmd is None:
+                    # Wakeup (e.g. by safe_exit of the control class), the kill flag is checked again
                     continue
 
                 if isinstance(cmd, mpPy6.CCommandRecord):
-                    self._module_logger.debug(
-                        f"Received cmd: {cmd}, args: {cmd.args}, kwargs: {cmd.kwargs}, Signal to emit: {cmd.signal_name}")
-                    try:
-                        cmd.execute(self)
-                    except Exception as e:
-                        traceback_str = ''.join(traceback.format_tb(e.__traceback__))
-                        self._module_logger.error(f"Exception '{e}' occurred in {cmd}!. Traceback:\n{traceback_str}")
-                    self._module_logger.debug(f"Command {cmd} finished.")
+                    cmd.t_received = time.time()
+                    cmd.resolve_names(self.command_table(), self.name)
+                    if self._module_logger.isEnabledFor(logging.DEBUG):
+                        self._module_logger.debug(f"Received cmd: {cmd}, args: {cmd.args}, kwargs: {cmd.kwargs}, "
+                                                  f"Signal to emit: {cmd.signal_name}")
+                    self._dispatch_command(cmd)
                 else:
                     self._module_logger.error(f"Received unknown command {cmd}!")
+                self._acknowledge_command()
+            self._stop_concurrent_execution()
+            self._flush_result_batch()
+            # Taken from the control_queue, but never executed
+            while self._deferred_commands:
+                self._release_arguments(self._deferred_commands.popleft())
             self._module_logger.error(f"Control Process exited. Terminating Process {os.getpid()}")
             if self._kill_flag.value == 0:
                 self._module_logger.error(f"Process {os.getpid()} received kill signal!")
@@ -103,59 +318,395 @@ class CProcess(CBase, Process):
         except Exception as e:
             self._module_logger.warning(f"Received Exception {e}! Exiting Process {os.getpid()}")
 
+        if self.heartbeat is not None:
+            self.heartbeat.stop()
         self._module_logger.warning(f"Child process monitor {self.__class__.__name__} ended.")
+        self.logger_handler.flush()
+
+    def _create_log_handler(self) -> logging.Handler:
+        if self.log_file is not None:
+            handler = logging.FileHandler(self.log_file.format(pid=os.getpid(), name=self.name,
+                                                               worker_index=self.worker_index))
+        elif self.log_ring_size is not None:
+            handler = CRingBufferHandler(self.log_ring_size)
+        else:
+            return CBatchedQueueHandler(self.log_queue, on_batch_started=self._wakeup, max_delay=self.log_max_delay)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s: %(message)s"))
+        return handler
+
+    def _dispatch_command(self, cmd):
+        """
+        Executes the command in the command loop, or hands it over to the thread pool (functions registered with
+        concurrent=True) or the event loop (coroutine functions) of the child. Concurrent commands are answered as soon
+        as they are finished, thus not necessarily in the order they were received.
+        """
+        if cmd.cmd_id in self._cancelled_commands:
+            self._cancelled_commands.pop(cmd.cmd_id, None)
+            self._module_logger.info(f"Command {cmd} has been cancelled.")
+            self._release_arguments(cmd)
+            return
+        if cmd.expired():
+            self._module_logger.warning(f"Deadline of {cmd} has passed, it is not executed.")
+            self._put_exception_to_queue(cmd.func_name, TimeoutError(f"Deadline of {cmd.func_name} has passed."),
+                                         cmd.cmd_id, record_class=mpPy6.CTimeoutException)
+            self._release_arguments(cmd)
+            return
+        try:
+            mode = self.resolve_command(cmd)[1]
+        except AttributeError:
+            # Answered with the exception by execute
+            mode = self._INLINE
+        if mode == self._ASYNC:
+            import asyncio
+            asyncio.run_coroutine_threadsafe(self._execute_command_async(cmd), self._get_event_loop())
+        elif mode == self._CONCURRENT:
+            self._get_executor().submit(self._execute_command, cmd)
+        elif self.heartbeat is not None:
+            # Only the commands executed in the command loop block it, thus only these are reported as current command
+            self.heartbeat.command_started(self._function_ids.get(cmd.func_name), cmd.cmd_id)
+            self._execute_command(cmd)
+            self.heartbeat.command_finished()
+        else:
+            self._execute_command(cmd)
+
+    @staticmethod
+    def _release_arguments(cmd):
+        # The segments of arguments in shared memory are owned by this child, they are removed if not executed
+        release_shared_memory(cmd.args)
+        release_shared_memory(cmd.kwargs)
+
+    def _execute_command(self, cmd):
+        try:
+            cmd.execute(self)
+        except Exception as e:
+            traceback_str = ''.join(traceback.format_tb(e.__traceback__))
+            self._module_logger.error(f"Exception '{e}' occurred in {cmd}!. Traceback:\n{traceback_str}")
+        self._cancelled_commands.pop(cmd.cmd_id, None)
+        if self._module_logger.isEnabledFor(logging.DEBUG):
+            self._module_logger.debug(f"Command {cmd} finished.")
+        # Close the shared memory segments of arguments that are not referenced anymore
+        self._shared_memory.sweep()
+
+    async def _execute_command_async(self, cmd):
+        try:
+            await cmd.execute_async(self)
+        except Exception as e:
+            traceback_str = ''.join(traceback.format_tb(e.__traceback__))
+            self._module_logger.error(f"Exception '{e}' occurred in {cmd}!. Traceback:\n{traceback_str}")
+        self._cancelled_commands.pop(cmd.cmd_id, None)
+        if self._module_logger.isEnabledFor(logging.DEBUG):
+            self._module_logger.debug(f"Command {cmd} finished.")
+        self._shared_memory.sweep()
+
+    def is_cancelled(self) -> bool:
+        """
+        Returns True, if the command currently executed has been cancelled (CProcessControl.cancel_command) or its
+        deadline has passed. Long-running functions can poll it and return early.
+        """
+        cmd = mpPy6.CCommandRecord.executing.get()
+        if cmd is None:
+            return False
+        # The command loop does not take commands while a function is executed in it
+        if threading.current_thread() is threading.main_thread():
+            self._poll_control_queue()
+        return cmd.cmd_id in self._cancelled_commands or cmd.expired()
+
+    def _acknowledge_command(self):
+        if self.command_acks is not None:
+            self.command_acks.put(1)
+
+    def _poll_control_queue(self):
+        """
+        Takes the commands of the control_queue without waiting, while a function is executed by the command loop.
+        Cancellations are executed immediately, all other commands after the function.
+        """
+        if self.control_queue is None:
+            return
+        while True:
+            try:
+                cmd = self.control_queue.get(block=False)
+            except queue.Empty:
+                return
+            if not isinstance(cmd, mpPy6.CCommandRecord):
+                continue
+            cmd.t_received = time.time()
+            cmd.resolve_names(self.command_table(), self.name)
+            if cmd.func_name == 'cancel_command':
+                self._execute_command(cmd)
+                self._acknowledge_command()
+            else:
+                self._deferred_commands.append(cmd)
+
+    def _stream(self, func_name: str, signal_name: str, finished_signal_name: str, generator, cmd_id: int):
+        """
+        Sends every item of the generator as result (emitted as signal_name), followed by the return value of the
+        generator (emitted as finished_signal_name, answers the command). Stops if the command has been cancelled or
+        its deadline has passed.
+        """
+        while True:
+            try:
+                item = next(generator)
+            except StopIteration as stop:
+                # The return value of the generator
+                self._put_result_to_queue(func_name, finished_signal_name, stop.value, cmd_id)
+                return stop.value
+            self._put_result_to_queue(func_name, signal_name, item)
+            if self.is_cancelled():
+                generator.close()
+                self._stream_stopped(func_name, cmd_id)
+                return None
+
+    async def _stream_async(self, func_name: str, signal_name: str, finished_signal_name: str, generator,
+                            cmd_id: int):
+        """
+        Same as _stream, but for asynchronous generators (which have no return value).
+        """
+        async for item in generator:
+            self._put_result_to_queue(func_name, signal_name, item)
+            if self.is_cancelled():
+                await generator.aclose()
+                self._stream_stopped(func_name, cmd_id)
+                return None
+        self._put_result_to_queue(func_name, finished_signal_name, None, cmd_id)
+        return None
+
+    def _stream_stopped(self, func_name: str, cmd_id: int):
+        cmd = mpPy6.CCommandRecord.executing.get()
+        if cmd is not None and cmd.cmd_id not in self._cancelled_commands:
+            self._module_logger.warning(f"Deadline of stream {func_name} has passed.")
+            self._put_exception_to_queue(func_name, TimeoutError(f"Deadline of {func_name} has passed."), cmd_id,
+                                         record_class=mpPy6.CTimeoutException)
+        else:
+            self._module_logger.info(f"Stream {func_name} has been cancelled.")
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_concurrent_commands,
+                                                                   thread_name_prefix=f"{self.name}-worker")
+        return self._executor
+
+    def _get_event_loop(self) -> 'asyncio.AbstractEventLoop':
+        if self._event_loop is None:
+            # asyncio is only imported by children executing coroutine functions (it takes a noticeable share of the
+            # import time of this module)
+            import asyncio
+            self._event_loop = asyncio.new_event_loop()
+            threading.Thread(target=self._event_loop.run_forever, name=f"{self.name}-event-loop",
+                             daemon=True).start()
+        return self._event_loop
+
+    def _stop_concurrent_execution(self):
+        """
+        Stops accepting concurrent commands. Running commands are not waited for, since they may block for an unknown
+        time, they are terminated together with the process.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._event_loop is not None:
+            self._event_loop.call_soon_threadsafe(self._event_loop.stop)
+
+    def _wakeup(self):
+        """
+        Wakes up the command loop, if called from another thread (e.g. to recompute the timeout of the result batch).
+        """
+        if self._wakeup_writer is not None and threading.current_thread() is not threading.main_thread():
+            self._wakeup_writer.send_bytes(b'')
 
     def __del__(self):
         self.cleanup()
         # self.logger.warning(f"Child process {self.name} deleted.")
-        self.cmd_queue.close()
+        for q in self.priority_queues:
+            q.close()
         self.state_queue.close()
+        self.log_queue.close()
+        if self.control_queue is not None:
+            self.control_queue.close()
+
+    def _put_result_to_queue(self, func_name, signal_name, res, cmd_id: int = None):
+        pipelines = self._pipeline_outputs.get(signal_name) if signal_name is not None else None
+        if pipelines and not self._send_to_pipelines(pipelines, res):
+            # Not observed by the control class, only the command (if any) is answered
+            if cmd_id is None:
+                return
+            signal_name = None
+        if self._module_logger.isEnabledFor(logging.DEBUG):
+            if signal_name is not None:
+                self._module_logger.debug(f"{func_name} finished. Emitting signal {signal_name} in control class.")
+            else:
+                self._module_logger.debug(f"{func_name} finished. No signal to emit.")
+        res = to_shared_memory(res, self.shared_memory_threshold, self._shared_memory)
+        result = mpPy6.CResultRecord(func_name, signal_name, res, cmd_id)
+        result.func_id = self._function_ids.get(func_name)
+        result.signal_id = self._signal_ids.get(signal_name)
+        cmd = mpPy6.CCommandRecord.executing.get()
+        if cmd_id is not None and cmd is not None:
+            result.t_sent, result.t_received, result.t_started = cmd.t_sent, cmd.t_received, cmd.t_started
+        if self.result_batch_interval is None and self.result_batch_size is None:
+            self.state_queue.put(result)
+            return
+
+        with self._result_batch_lock:
+            self._result_batch.append(result)
+            if self._result_batch_deadline is None and self.result_batch_interval is not None:
+                self._result_batch_deadline = time.time() + self.result_batch_interval
+                # The command loop has to send the batch in time, even if it is waiting for commands
+                self._wakeup()
+            elif len(self._result_batch) == 1 and self.result_batch_interval is None:
+                # Only result_batch_size: the command loop sends a partial batch before it waits for commands
+                self._wakeup()
+            if ((self.result_batch_size is not None and len(self._result_batch) >= self.result_batch_size) or
+                    (self._result_batch_deadline is not None and time.time() >= self._result_batch_deadline)):
+                self._flush_result_batch()
+
+    def _send_to_pipelines(self, pipelines: list[tuple], res) -> bool:
+        """
+        Sends res as command to the children connected to the signal. The arguments are the same as the arguments of
+        the signal (a tuple is sent as several arguments). Blocks, if the connected child does not keep up.
+        :return: True if the signal is observed by the control class (see connect_pipeline), i.e. has to be sent too.
+        """
+        args = res if isinstance(res, tuple) else () if res is None else (res,)
+        observed = False
+        for pipeline_output, function_name, observe, lock in pipelines:
+            observed = observed or observe
+            cmd = mpPy6.CCommandRecord(None, function_name)
+            cmd.args = to_shared_memory(args, self.shared_memory_threshold, self._shared_memory)
+            cmd.t_sent = time.time()
+            try:
+                with lock:
+                    pipeline_output.send(cmd)
+            except (OSError, ValueError) as e:
+                self._module_logger.error(f"Error sending {function_name} to pipeline of {self.name}: {e}")
+                release_shared_memory(cmd.args)
+        return observed
+
+    def _result_dropped(self, result):
+        """
+        Called for every result dropped by the policy of the full state queue. Releases its shared memory segments.
+        """
+        for record in (result if isinstance(result, list) else [result]):
+            if isinstance(record, mpPy6.CResultRecord):
+                release_shared_memory(record.result)
 
-    def _put_result_to_queue(self, func_name, signal_name, res):
-        if signal_name is not None:
-            self._module_logger.debug(f"{func_name} finished. Emitting signal {signal_name} in control class.")
-        else:
-            self._module_logger.debug(f"{func_name} finished. No signal to emit.")
-        result = mpPy6.CResultRecord(func_name, signal_name, res)
-        self.state_queue.put(result)
+    def _result_batch_timeout(self):
+        """
+        Returns the time until the pending result batch has to be sent, or None if there is no pending batch.
+        """
+        if self._result_batch_deadline is None:
+            return None
+        return max(0.0, self._result_batch_deadline - time.time())
+
+    def _flush_result_batch(self):
+        """
+        Sends all pending results as one list to the control class.
+        """
+        with self._result_batch_lock:
+            self._result_batch_deadline = None
+            if self._result_batch:
+                batch, self._result_batch = self._result_batch, []
+                self.state_queue.put(batch)
 
-    def _put_exception_to_queue(self, func_name, exc):
+    def _put_exception_to_queue(self, func_name, exc, cmd_id: int = None, record_class: type = None):
         self._module_logger.debug(f"Error executing {func_name}.")
         tb_str = traceback.format_exception(type(exc), value=exc, tb=exc.__traceback__)
         tb_join = "".join(tb_str[-2:len(tb_str)])
-        result = mpPy6.CException(self.name, func_name, exc, )
+        result = (record_class or mpPy6.CException)(self.name, func_name, exc, )
         result.set_additional_info(tb_join)
-        self.state_queue.put(result)
+        result.cmd_id = cmd_id
+        # Keep the order of results and exceptions
+        with self._result_batch_lock:
+            self._flush_result_batch()
+            self.state_queue.put(result)
 
     #@staticmethod
-    def register_signal(postfix=None, signal_name: str = None):
+    def register_signal(postfix=None, signal_name: str = None, concurrent: bool = False,
+                        finished_signal_name: str = None):
+        """
+        Registers a function, whose result is emitted as signal in the control class.
+        Generator functions (and asynchronous generators) stream their results: every yielded item is emitted as
+        signal on its own, followed by finished_signal_name, emitted with the return value of the generator. The
+        future of the command is resolved with the return value, or cancelled by CProcessControl.cancel_command.
+        :param postfix: The signal name is the name of the function with this postfix.
+        :param signal_name: Name of the signal (overrides postfix).
+        :param concurrent: If True, the function is executed by a thread pool of the child, thus it does not block
+            the execution of other commands (e.g. for functions waiting for I/O). Coroutine functions (async def) are
+            always executed concurrently by an event loop of the child.
+        :param finished_signal_name: Name of the signal emitted after the last item of a generator function.
+        """
         _postfix = postfix.strip() if postfix is not None else None
         _signal_name = signal_name.strip() if signal_name is not None else None
+        _finished_signal_name = finished_signal_name.strip() if finished_signal_name is not None else None
 
         def register(func):
 
-            def get_signature(self, *args, **kwargs):
-                func_name = f"{func.__name__}->{self.pid}"
-
-                if _signal_name is not None:
-                    kwargs['signal_name'] = _signal_name
-
-                if 'signal_name' in kwargs and kwargs['signal_name'] is not None:
-                    sign = kwargs.pop('signal_name')
-                elif _postfix is not None:
-                    sign = f"{func.__name__}{_postfix}"
-                    self._module_logger.debug(f"Constructing signal name for function '{func.__name__}': {sign}")
-                else:
-                    sign = None
-                try:
-                    res = func(self, *args, **kwargs)
-                    self._put_result_to_queue(func_name, sign, res)
-                    return res
-                except Exception as e:
-                    self._module_logger.error(f"Error in function {func_name}: {e} ({type(e)})")
-                    self._put_exception_to_queue(func.__name__, e)
-                    return None
+            # Signal emitted, if the caller does not pass another one (CCommandRecord.signal_name)
+            default_signal_name = _signal_name
+            if default_signal_name is None and _postfix is not None:
+                default_signal_name = f"{func.__name__}{_postfix}"
+
+            def get_signal_name(self, kwargs):
+                sign = kwargs.pop('signal_name', None)
+                if _signal_name is not None or sign is None:
+                    return default_signal_name
+                return sign
+
+            def consume_cmd_id():
+                # Answer the command (if called by one), but not for nested calls of registered functions
+                cmd_id = mpPy6.CCommandRecord.reply_to.get()
+                if cmd_id is not None:
+                    mpPy6.CCommandRecord.reply_to.set(None)
+                return cmd_id
+
+            if inspect.isasyncgenfunction(func):
+                async def get_signature(self, *args, **kwargs):
+                    sign = get_signal_name(self, kwargs)
+                    cmd_id = consume_cmd_id()
+                    try:
+                        return await self._stream_async(func.__name__, sign, _finished_signal_name,
+                                                        func(self, *args, **kwargs), cmd_id)
+                    except Exception as e:
+                        self._module_logger.error(f"Error in function {func.__name__}->{self.pid}: {e} ({type(e)})")
+                        self._put_exception_to_queue(func.__name__, e, cmd_id)
+                        return None
+            elif inspect.isgeneratorfunction(func):
+                def get_signature(self, *args, **kwargs):
+                    sign = get_signal_name(self, kwargs)
+                    cmd_id = consume_cmd_id()
+                    try:
+                        return self._stream(func.__name__, sign, _finished_signal_name,
+                                            func(self, *args, **kwargs), cmd_id)
+                    except Exception as e:
+                        self._module_logger.error(f"Error in function {func.__name__}->{self.pid}: {e} ({type(e)})")
+                        self._put_exception_to_queue(func.__name__, e, cmd_id)
+                        return None
+            elif inspect.iscoroutinefunction(func):
+                async def get_signature(self, *args, **kwargs):
+                    func_name = f"{func.__name__}->{self.pid}"
+                    sign = get_signal_name(self, kwargs)
+                    cmd_id = consume_cmd_id()
+                    try:
+                        res = await func(self, *args, **kwargs)
+                        self._put_result_to_queue(func.__name__, sign, res, cmd_id)
+                        return res
+                    except Exception as e:
+                        self._module_logger.error(f"Error in function {func_name}: {e} ({type(e)})")
+                        self._put_exception_to_queue(func.__name__, e, cmd_id)
+                        return None
+            else:
+                def get_signature(self, *args, **kwargs):
+                    func_name = f"{func.__name__}->{self.pid}"
+                    sign = get_signal_name(self, kwargs)
+                    cmd_id = consume_cmd_id()
+                    try:
+                        res = func(self, *args, **kwargs)
+                        self._put_result_to_queue(func.__name__, sign, res, cmd_id)
+                        return res
+                    except Exception as e:
+                        self._module_logger.error(f"Error in function {func_name}: {e} ({type(e)})")
+                        self._put_exception_to_queue(func.__name__, e, cmd_id)
+                        return None
 
+            get_signature.concurrent = concurrent
+            get_signature.signal_name = default_signal_name
             return get_signature
 
         return register
@@ -176,6 +727,68 @@ class CProcess(CBase, Process):
     def set_child_log_enabled(self, enabled):
         self.logger.disabled = not enabled
 
+    @register_signal()
+    def get_command_statistics(self):
+        return self.command_statistics.snapshot()
+
+    def activate(self):
+        """
+        Called by the control class, when this standby child replaces a child that ended.
+        """
+        self._module_logger.info(f"Standby child {self.name} activated.")
+        self._active = True
+
+    def attach_stream(self, stream: 'mpPy6.CStream'):
+        """
+        Called by the control class, when a stream to it has been created (see CProcessControlCore.create_stream).
+        """
+        stream._notify = self._notify_stream
+        self.streams[stream.name] = stream
+
+    def attach_property_store(self, property_store: CPropertyStore):
+        """
+        Called by the control class, when this standby child replaces a child and continues its property store.
+        """
+        # Entries the ended child was writing
+        property_store.recover()
+        property_store._notify = self._notify_property_store
+        self.property_store = property_store
+
+    def attach_pipeline_output(self, signal_name: str, pipeline_output: connection.Connection, function_name: str,
+                               observe: bool = False):
+        """
+        Called by the control class, when the signal of this child has been connected to a function of another child.
+        """
+        # Replaced (not modified), since concurrent commands may send results meanwhile
+        self._pipeline_outputs = {**self._pipeline_outputs, signal_name: self._pipeline_outputs.get(signal_name, []) + [
+            (pipeline_output, function_name, observe, threading.Lock())]}
+
+    def attach_pipeline_input(self, pipeline_input: connection.Connection):
+        """
+        Called by the control class, when a signal of another child has been connected to a function of this child.
+        """
+        self._pipeline_inputs = self._pipeline_inputs + [pipeline_input]
+
+    def _notify_property_store(self):
+        # Wakes up the monitor thread of the control class, that reads the changed values
+        self.state_queue.put(None)
+
+    def _notify_stream(self, name: str):
+        # Not a result: neither batched nor counted in the statistics, always emitted by the control class itself
+        self.state_queue.put(CStreamNotification(name))
+
+    @register_signal()
+    def cancel_command(self, cmd_id: int):
+        self._cancelled_commands[cmd_id] = None
+        if len(self._cancelled_commands) > self._CANCELLED_COMMANDS_LIMIT:
+            self._cancelled_commands.popitem(last=False)
+
+    @register_signal()
+    def get_child_log(self, n: int = None):
+        if isinstance(self.logger_handler, CRingBufferHandler):
+            return self.logger_handler.lines(n)
+        return []
+
     @staticmethod
     def setter(signal_same: str = None):
         def register(func):
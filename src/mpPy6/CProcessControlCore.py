@@ -0,0 +1,1283 @@
+import concurrent.futures
+import gc
+import itertools
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import queue
+import re
+import sys
+import threading
+import time
+from multiprocessing import Queue, connection, forkserver
+
+import mpPy6
+from mpPy6.CBase import CBase
+from mpPy6.CProcess import CProcess
+from mpPy6.CResultRecord import CResultRecord
+from mpPy6.CException import CException
+from mpPy6.CFuture import CFuture
+from mpPy6.CHeartbeat import CHeartbeat
+from mpPy6.CPropertyStore import CPropertyStore
+from mpPy6.CQueue import CQueue
+from mpPy6.CRemoteProcess import CRemoteProcess
+from mpPy6.CResultCache import CResultCache
+from mpPy6.CStatistics import CStatistics
+from mpPy6.CSharedMemory import CSharedMemoryRegistry, from_shared_memory, to_shared_memory, release_shared_memory
+from mpPy6.CSignal import CSignal
+from mpPy6.CStream import CStream, CStreamNotification
+
+
+_SIGNAL_PATTERN = re.compile(r'(\w+)\(([^)]*)\)')
+
+
+def _match_signal_name(signal) -> tuple[str, list[str]]:
+    match = _SIGNAL_PATTERN.match(str(signal))
+    return match.group(1).strip(), match.group(2).split(',')
+
+
+def _ensure_forkserver(preload: list[str]):
+    """
+    Starts the forkserver of multiprocessing (once per process), which imports the preloaded modules before forking
+    the children. Later calls do not change the preloaded modules. The server is started with the sys.path of this
+    process, since multiprocessing does not pass it (the preloaded modules would silently not be found).
+    """
+    forkserver.set_forkserver_preload(preload)
+    python_path = os.environ.get('PYTHONPATH')
+    os.environ['PYTHONPATH'] = os.pathsep.join([p for p in sys.path if p] + ([python_path] if python_path else []))
+    try:
+        forkserver.ensure_running()
+    finally:
+        if python_path is None:
+            del os.environ['PYTHONPATH']
+        else:
+            os.environ['PYTHONPATH'] = python_path
+
+
+class CProcessControlCore(CBase):
+    """
+        Controls the children without Qt: sends the commands, receives the results and calls the slots connected to
+        the signals (CSignal) by the monitor thread. Callers can also wait for the returned futures (CFuture), with
+        result(), add_done_callback() or await. CProcessControl is the Qt adapter of this class.
+    """
+    on_exception_raised = CSignal(object)
+    # Emitted periodically with a snapshot of the command statistics, see set_statistics_interval
+    on_statistics_updated = CSignal(object)
+    # Emitted after a child that ended unexpectedly has been replaced, see restart_children
+    on_child_restarted = CSignal(object)
+    # Emitted every heartbeat_interval with the health of the children (see child_health) and once per stall of a child
+    on_heartbeat = CSignal(object)
+    on_child_stalled = CSignal(object)
+    # Emitted with the name of a stream (see create_stream), when data is available after the stream has been emptied
+    on_stream_data = CSignal(str)
+
+    COALESCE_LATEST = 'latest'
+    COALESCE_LIST = 'list'
+
+    # Priorities of registered functions. The children always take the next command of the highest priority, commands
+    # of the same priority are executed in order. Broadcasts are sent via the control queues and precede everything.
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 1
+    PRIORITY_LOW = 2
+
+    def __init__(self, signal_class: object = None,
+                 module_log: bool = True, module_log_level: int = logging.WARNING, log_file: str = None,
+                 shared_memory_threshold: int = None,
+                 result_batch_interval: float = None, result_batch_size: int = None,
+                 cmd_queue_size: int = 0, cmd_queue_policy: str = CQueue.BLOCK,
+                 state_queue_size: int = 0, state_queue_policy: str = CQueue.BLOCK,
+                 log_ring_size: int = None,
+                 restart_children: bool = False, standby_children: int = 0,
+                 start_method: str = None, preload: list[str] = None,
+                 heartbeat_interval: float = None, stall_timeout: float = None,
+                 agent_address=None, agent_authkey: bytes = None,
+                 property_interval: float = 1 / 60):
+        CBase.__init__(self)
+
+        # Start method of the children ('fork', 'spawn' or 'forkserver', None uses the default of multiprocessing).
+        # With 'forkserver', the children are forked from a server process, that has imported mpPy6 and the modules in
+        # preload (e.g. the module of the child class and its scientific stack) once, thus the children start without
+        # importing them again (and without inheriting the state of this process, e.g. Qt).
+        self.start_method = start_method
+        self._mp_context = multiprocessing.get_context(start_method)
+        if self._mp_context.get_start_method() == 'forkserver':
+            _ensure_forkserver(['mpPy6'] + list(preload or []))
+
+        # The children are hosted by the CAgent at agent_address ((host, port) or the path of a Unix socket) instead of
+        # this machine. Every child is represented by a local CRemoteProcess, that forwards its queues to the agent.
+        # Results and arguments cannot be transferred via shared memory to another machine.
+        self.agent_address = agent_address
+        self.agent_authkey = agent_authkey
+        if agent_address is not None:
+            shared_memory_threshold = None
+
+        # The children write their log records to log_file (e.g. "child_{worker_index}.log") or keep the latest
+        # log_ring_size records in memory (see get_child_log), instead of sending them to this class.
+        self.log_file = log_file
+        self.log_ring_size = log_ring_size
+        # Results and arguments with at least this size in bytes (NumPy arrays, bytes, memoryviews) are not pickled
+        # but transferred using shared memory. None disables the transfer via shared memory.
+        self.shared_memory_threshold = shared_memory_threshold
+        self._shared_memory = CSharedMemoryRegistry()
+        # The children send their results in batches, collected within this time (seconds) or up to this size
+        self.result_batch_interval = result_batch_interval
+        self.result_batch_size = result_batch_size
+        # Maximum number of records handled per wakeup of the monitor thread and the coalescing mode of the signals
+        self.drain_limit = 1000
+        self._signal_coalescing: dict[str, str] = {}
+        self._module_logger = self.create_new_logger(f"(cmp) {self.name}",
+                                                     enabled=module_log, level=module_log_level
+                                                     )
+
+        self.logger = self.create_new_logger(f"{self.__class__.__name__}({os.getpid()})", enabled=module_log)
+
+        # Register this class as signal class (all signals will be implemented in and emitted from this class)
+        if signal_class is not None:
+            self.register_signal_class(signal_class)
+        else:
+            self.register_signal_class(self)
+
+        # The child process. In pool mode, _child is the first worker of the pool.
+        self._child: CProcess = None
+        self._children: list[CProcess] = []
+        # Class and additional arguments of the children, used for creating replacements
+        self._child_class: type = None
+        self._child_args: tuple = ()
+        self._child_kwargs: dict = {}
+        # Children that end unexpectedly (not by safe_exit) are replaced. standby_children are started in advance and
+        # wait (without taking commands) until they replace a child, thus a restart does not have to wait for the
+        # start of a process and the initialization of the child (postrun_init).
+        self.restart_children = restart_children
+        self.standby_children = standby_children
+        self._standby_children: list[CProcess] = []
+        # Children that have been replaced. They are kept, since deleting a CProcess closes the shared queues.
+        self._ended_children: list[CProcess] = []
+        self._control_queue_of: dict[int, Queue] = {}
+        self._restarts = 0
+        self._downtime = 0.0
+        # Ids of the functions of the child class (see CProcess.command_table)
+        self._command_ids: dict[str, int] = {}
+        # Tables of the child class, used to restore the names of received records (see CResultRecord.resolve_names)
+        self._command_table: tuple[str, ...] = ()
+        self._signal_table: tuple[str, ...] = ()
+        # Every heartbeat_interval seconds, a thread of each child reports its health (see CHeartbeat). A child is
+        # stalled, if its heartbeat or its current command is older than stall_timeout seconds. None disables them.
+        self.heartbeat_interval = heartbeat_interval
+        self.stall_timeout = stall_timeout
+        self._heartbeat_of: dict[int, CHeartbeat] = {}
+        self._stalled_children: set[int] = set()
+        self._health_deadline: float = None
+        # Streams of high-rate data from the children (see create_stream) and the worker index of their writer
+        self._streams: dict[str, tuple[CStream, int]] = {}
+        # Interval (seconds) of checking the streams for notifications the writers have missed
+        self.stream_check_interval = 0.1
+        self._stream_deadline: float = None
+        # Values of the shared properties (see CProperty) of every child (by worker index). They are not sent as
+        # messages: every property_interval seconds (e.g. the refresh rate of the display), the changed values are
+        # emitted with the signals of the properties.
+        self.property_interval = property_interval
+        self._property_stores: dict[int, CPropertyStore] = {}
+        self._property_signals: dict[str, str] = {}
+        # Pipelines between children of this and other control classes (see connect_pipeline). Both ends are kept,
+        # thus they can be handed over to replacements of the children.
+        self._pipeline_outputs: list[tuple[int, str, connection.Connection, str, bool]] = []
+        self._pipeline_inputs: list[tuple[int, connection.Connection]] = []
+        self._property_deadline: float = None
+
+        # Queues for data exchange. cmd_queue is the lane of PRIORITY_NORMAL. The size of the queues can be limited,
+        # the policy (see CQueue) decides what happens if a queue is full. 0 means unbounded.
+        self._priority_queues: dict[int, CQueue] = {
+            priority: CQueue(cmd_queue_size, cmd_queue_policy, on_drop=self._command_dropped, ctx=self._mp_context)
+            for priority in (self.PRIORITY_HIGH, self.PRIORITY_NORMAL, self.PRIORITY_LOW)}
+        self.cmd_queue = self._priority_queues[self.PRIORITY_NORMAL]
+        # Every child sends its results via its own state queue (of this size and policy) and its log records via its
+        # own log queue, thus they do not delay the results. A child that ended while writing a record leaves the rest
+        # of the record in its own queues only, which are discarded (see _forget_child).
+        self.state_queue_size = state_queue_size
+        self.state_queue_policy = state_queue_policy
+        self._state_queue_of: dict[int, CQueue] = {}
+        self._log_queue_of: dict[int, CQueue] = {}
+        self._sentinel_of: dict[int, int] = {}
+        # Statistics of the state queues of the children that ended (see queue_statistics)
+        self._ended_state_statistics = dict.fromkeys(CQueue.COUNTERS, 0)
+        # Wakes up the monitor thread, e.g. to apply a new statistics interval
+        self._wakeup_reader, self._wakeup_writer = self._mp_context.Pipe(duplex=False)
+        # One private queue per child, used to reach every child (see register_function(broadcast=True))
+        self._control_queues: list[Queue] = []
+
+        # The child process pid
+        self._pid = os.getpid()
+        self._child_process_pid = None
+
+        self.name = f"{self._pid}({self.__class__.__name__})"
+
+        self._child_kill_flag = self._mp_context.Value('i', 1)
+
+        # Futures of the commands, that have not been answered by the child yet (by correlation id)
+        self._cmd_ids = itertools.count()
+        self._pending_futures: dict[int, CFuture] = {}
+        self._pending_futures_lock = threading.Lock()
+        # Results of the functions registered with cache=True (by function name) and the cache keys of their pending
+        # commands (by correlation id)
+        self._result_caches: dict[str, CResultCache] = {}
+        self._cache_keys: dict[int, tuple[str, object]] = {}
+
+        # Durations of the stages of every command and result (see CStatistics)
+        self._command_statistics = CStatistics()
+        self.statistics_interval: float = None
+        self._statistics_deadline: float = None
+
+
+        self.on_exception_raised.connect(self.display_exception)
+
+    # ==================================================================================================================
+    #
+    # ==================================================================================================================
+    def register_signal_class(self, signal_class: object):
+        self._signal_class = signal_class
+
+    @property
+    def child_process_pid(self):
+        return self._child_process_pid
+
+    @property
+    def state_queue(self) -> CQueue:
+        """
+        The state queue of the (first) child.
+        """
+        return self._state_queue_of.get(self._child.pid) if self._child is not None else None
+
+    @property
+    def child_process_pids(self) -> list[int]:
+        return [c.pid for c in self._children]
+
+    def register_child_process(self, child, *args, **kwargs):
+        self.register_child_pool(child, 1, *args, **kwargs)
+
+    def register_child_pool(self, child, workers: int = None, *args, **kwargs):
+        """
+        Registers a pool of identical child processes. All workers share the same cmd_queue, thus every command is
+        executed by the next idle worker. Results of all workers are emitted as signals of the signal class.
+        Functions registered with broadcast=True are sent to every worker of the pool.
+        :param child: The CProcess class to instantiate.
+        :param workers: Number of worker processes. Defaults to the number of CPUs.
+        :return:
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"A pool needs at least one worker, not {workers}.")
+        self._module_logger.debug(f"Registering {workers} child process(es).")
+        self._command_table = child.command_table()
+        self._signal_table = child.signal_table()
+        self._command_ids = {name: func_id for func_id, name in enumerate(self._command_table)}
+        self._child_class, self._child_args, self._child_kwargs = child, args, kwargs
+
+        for worker_index in range(workers):
+            _child = self._start_child(worker_index)
+            self._children.append(_child)
+            self._module_logger.info(f"Child process {_child.name} ({worker_index + 1}/{workers}) created.")
+        for standby_index in range(self.standby_children):
+            self._standby_children.append(self._start_child(workers + standby_index, standby=True))
+
+        self._child = self._children[0]
+        self._child_process_pid = self._child.pid
+        self._start_monitor()
+
+    def _start_monitor(self):
+        """
+        Starts the thread monitoring the state queues.
+        """
+        threading.Thread(target=self._monitor_result_state, name=f"{self.name}-monitor", daemon=True).start()
+
+    def _start_child(self, worker_index: int, standby: bool = False) -> CProcess:
+        control_queue = self._mp_context.Queue()
+        state_queue = CQueue(self.state_queue_size, self.state_queue_policy, ctx=self._mp_context)
+        log_queue = CQueue(ctx=self._mp_context)
+        heartbeat = None
+        options = dict(kill_flag=self._child_kill_flag,
+                       internal_log=self.internal_log_enabled,
+                       internal_log_level=self.internal_log_level,
+                       log_file=self.log_file,
+                       control_queue=control_queue,
+                       priority_queues=[self._priority_queues[p] for p in sorted(self._priority_queues)],
+                       worker_index=worker_index,
+                       shared_memory_threshold=self.shared_memory_threshold,
+                       result_batch_interval=self.result_batch_interval,
+                       result_batch_size=self.result_batch_size,
+                       log_queue=log_queue,
+                       log_ring_size=self.log_ring_size,
+                       standby=standby)
+        if self.agent_address is not None:
+            # Local stand-in, forwarding the queues to the child hosted by the agent
+            _child = CRemoteProcess(state_queue, self.cmd_queue,
+                                    address=self.agent_address, authkey=self.agent_authkey,
+                                    child_class=self._child_class, child_args=self._child_args,
+                                    child_kwargs=self._child_kwargs, **options)
+        else:
+            # Without heartbeat_interval, the heartbeat only records the current command (see _forget_child)
+            heartbeat = CHeartbeat(self._mp_context, self.heartbeat_interval)
+            property_store = None if standby else self._property_store(worker_index)
+            _child = self._child_class(state_queue, self.cmd_queue, heartbeat=heartbeat,
+                                       property_store=property_store,
+                                       *self._child_args, **options, **self._child_kwargs)
+        # Started with the start method of the context of the queues
+        _child._Popen = self._mp_context.Process._Popen
+        # Garbage of this process must not be collected in a forked child: finalizers (e.g. of queues) would wait
+        # for locks held by threads, that do not exist in the child.
+        gc.freeze()
+        try:
+            _child.start()
+        finally:
+            gc.unfreeze()
+        self._control_queues = self._control_queues + [control_queue]
+        self._control_queue_of[_child.pid] = control_queue
+        self._state_queue_of[_child.pid] = state_queue
+        self._log_queue_of[_child.pid] = log_queue
+        self._sentinel_of[_child.pid] = _child.sentinel
+        if heartbeat is not None:
+            self._heartbeat_of[_child.pid] = heartbeat
+        self._attach_streams(_child, worker_index)
+        self._attach_pipelines(_child, worker_index)
+        return _child
+
+    def _supervise(self):
+        """
+        Handles the children (and standby children) that ended unexpectedly: they are replaced if restart_children is
+        enabled, otherwise they are only forgotten. Called by the monitor thread.
+        """
+        if not self._child_kill_flag.value:
+            return
+        if not self.restart_children:
+            for _child in self._children:
+                if not _child.is_alive() and _child not in self._ended_children:
+                    self._forget_child(_child)
+            return
+        for standby in [c for c in self._standby_children if not c.is_alive()]:
+            self._standby_children.remove(standby)
+            self._forget_child(standby)
+            self._heartbeat_of.pop(standby.pid, None)
+        for index, _child in enumerate(self._children):
+            if not _child.is_alive():
+                self._replace_child(index)
+        while len(self._standby_children) < self.standby_children:
+            self._standby_children.append(self._start_child(len(self._children) + len(self._standby_children),
+                                                            standby=True))
+
+    def _replace_child(self, index: int):
+        t_detected = time.time()
+        ended = self._children[index]
+        self._forget_child(ended)
+        self._heartbeat_of.pop(ended.pid, None)
+        if index in self._property_stores:
+            # Entries the ended child was writing, before the replacement continues writing the store
+            self._property_stores[index].recover()
+        if self._standby_children:
+            replacement = self._standby_children.pop(0)
+            # The standby child starts taking commands
+            self._control_queue_of[replacement.pid].put(mpPy6.CCommandRecord(replacement.name, 'activate'))
+            self._attach_streams(replacement, index)
+            self._attach_pipelines(replacement, index)
+            property_store = self._property_store(index)
+            if property_store is not None:
+                self._control_queue_of[replacement.pid].put(
+                    mpPy6.CCommandRecord(replacement.name, 'attach_property_store', property_store))
+        else:
+            replacement = self._start_child(index)
+        self._children[index] = replacement
+        if index == 0:
+            self._child = replacement
+            self._child_process_pid = replacement.pid
+
+        downtime = time.time() - t_detected
+        self._restarts += 1
+        self._downtime += downtime
+        self._module_logger.warning(f"Child process {ended.name} ended (exit code {ended.exitcode}), replaced by "
+                                    f"{replacement.name}.")
+        self.on_child_restarted.emit({'worker_index': index, 'ended_pid': ended.pid, 'exitcode': ended.exitcode,
+                                      'pid': replacement.pid, 'downtime': downtime})
+
+    def _forget_child(self, ended: CProcess):
+        """
+        Handles the records sent by the child before it ended and discards its queues. The future of the command it
+        was executing is failed. Called by the monitor thread.
+        """
+        self._ended_children.append(ended)
+        self._handle_remaining_records(ended)
+        heartbeat = self._heartbeat_of.get(ended.pid)
+        if heartbeat is not None:
+            self._fail_future(heartbeat.command_id(),
+                              f"Child process {ended.name} ended (exit code {ended.exitcode}) while executing the "
+                              f"command.")
+        for priority, q in self._priority_queues.items():
+            released = q.release_locks_of(ended.pid)
+            if released:
+                self._module_logger.warning(f"Child process {ended.name} ended while holding the "
+                                            f"{' and '.join(released)} lock of the cmd_queue (priority {priority}), "
+                                            f"released.")
+        self._sentinel_of.pop(ended.pid, None)
+        self._stalled_children.discard(ended.pid)
+        control_queue = self._control_queue_of.pop(ended.pid, None)
+        if control_queue is not None:
+            # The list is replaced (not modified), since broadcasts may iterate it concurrently. The queue is not
+            # closed for the same reason, but its unsent commands are discarded.
+            self._control_queues = [q for q in self._control_queues if q is not control_queue]
+            control_queue.cancel_join_thread()
+
+    def _handle_remaining_records(self, ended: CProcess):
+        """
+        Handles the records the child sent before it ended and discards its state and log queues.
+        """
+        state_queue = self._state_queue_of.pop(ended.pid, None)
+        if state_queue is not None:
+            for counter, n in state_queue.statistics().items():
+                self._ended_state_statistics[counter] += n
+            self._handle_records(self._drain_ended_queue(state_queue, ended))
+        log_queue = self._log_queue_of.pop(ended.pid, None)
+        if log_queue is not None:
+            for record in self._drain_ended_queue(log_queue, ended):
+                self._handle_record(record)
+
+    def _drain_ended_queue(self, q: CQueue, ended: CProcess) -> list:
+        """
+        Returns all records of a queue written by a child that ended, and closes the queue. A record the child was
+        writing when it ended is incomplete, it is discarded instead of waiting for the missing part.
+        """
+        # The child may have ended while holding the lock of the readers (taking the oldest record, see CQueue)
+        q.release_locks_of(ended.pid)
+        records = []
+        while True:
+            try:
+                res = q.get_written_by(ended.sentinel)
+            except queue.Empty:
+                break
+            except EOFError:
+                self._module_logger.error(f"Child process {ended.name} ended while sending a record, the incomplete "
+                                          f"record has been discarded.")
+                break
+            if isinstance(res, list):
+                records.extend(res)
+            elif res is not None:
+                records.append(res)
+        q.close()
+        for res in records:
+            if isinstance(res, CResultRecord):
+                res.resolve_names(self._command_table, self._signal_table)
+        return records
+
+    def create_stream(self, name: str, slot_size: int, slots: int = 16, dtype=None, shape: tuple = None,
+                      drop_if_slow: bool = False, worker_index: int = 0, timeout: float = 10) -> CStream:
+        """
+        Creates a stream (see CStream) for high-rate data from a child to this class. The child writes the items with
+        self.streams[name].write(data), this class reads them with read() of the returned stream, e.g. when
+        on_stream_data is emitted. A child replacing the writer (see restart_children) continues writing the stream.
+        :param name: Name of the stream.
+        :param slot_size: Maximum size of an item in bytes.
+        :param slots: Number of items the stream can hold until the writer waits (or drops them, see drop_if_slow).
+        :param dtype: NumPy dtype of the items, read returns arrays instead of bytes.
+        :param shape: Shape of the arrays returned by read.
+        :param drop_if_slow: The writer drops items instead of waiting, if this class reads too slowly.
+        :param worker_index: The child writing the stream (in pool mode).
+        :param timeout: Maximum time (seconds) to wait until the running child has attached the stream, thus the
+            commands sent afterwards can write it. Raises TimeoutError, if the child is busy for longer.
+        """
+        if self.agent_address is not None:
+            raise RuntimeError(f"Stream {name} cannot be created, the children are hosted on another machine.")
+        if name in self._streams:
+            raise ValueError(f"Stream {name} already exists.")
+        stream = CStream(name, slot_size, slots, dtype, shape, drop_if_slow)
+        self._streams[name] = (stream, worker_index)
+        if worker_index < len(self._children):
+            for future in self._attach_streams(self._children[worker_index], worker_index, [stream]):
+                future.result(timeout)
+        return stream
+
+    def _attach_streams(self, _child: CProcess, worker_index: int, streams: list[CStream] = None) -> list[CFuture]:
+        """
+        Hands the streams written by the child with worker_index over to _child.
+        :return: The futures of the attachments.
+        """
+        if streams is None:
+            streams = [stream for stream, index in self._streams.values() if index == worker_index]
+        return [self._call_child(_child, 'attach_stream', stream) for stream in streams]
+
+    def _call_child(self, _child: CProcess, func_name: str, *args) -> CFuture:
+        """
+        Calls func_name in _child via its control queue, thus before the next command of its queues. The commands
+        already sent may be taken first, since every queue is written by its own thread. The returned future is
+        resolved by the monitor thread, it must not be waited for by the monitor thread itself.
+        """
+        cmd = mpPy6.CCommandRecord(_child.name, func_name, *args)
+        cmd.cmd_id = next(self._cmd_ids)
+        future = CFuture(cmd.cmd_id, func_name)
+        with self._pending_futures_lock:
+            self._pending_futures[cmd.cmd_id] = future
+        cmd.t_sent = time.time()
+        self._control_queue_of[_child.pid].put(cmd)
+        return future
+
+    def connect_pipeline(self, signal_name: str, target: 'CProcessControlCore', function_name: str,
+                         observe: bool = False, worker_index: int = 0, target_worker_index: int = 0,
+                         timeout: float = 10):
+        """
+        Connects a signal of a child of this class directly to a function of a child of target (e.g. acquisition ->
+        filter -> analysis). Every result emitted as signal_name is sent as command to the function, through a pipe
+        between the two children: the data is pickled once and neither the control classes nor the GUI thread are
+        involved. The connected child executes these commands like the commands of its queues, its results are
+        emitted by target as usual. If the connected child does not keep up, the sending child is blocked.
+        :param signal_name: Signal of the child of this class (see CProcess.register_signal).
+        :param target: Control class of the connected child, may be this class (but not the same child).
+        :param function_name: Function of the connected child, called with the arguments of the signal.
+        :param observe: The signal is also emitted by this class (otherwise, it is only sent to the connected child).
+        :param worker_index: The sending child (in pool mode).
+        :param target_worker_index: The connected child (in pool mode).
+        :param timeout: Maximum time (seconds) to wait until the running sending child has attached the pipeline, thus
+            the commands sent afterwards use it. Raises TimeoutError, if the child is busy for longer.
+        """
+        if self.agent_address is not None or target.agent_address is not None:
+            raise RuntimeError(f"Pipeline {signal_name} -> {function_name} cannot be connected, the children are "
+                               f"hosted on another machine.")
+        if target is self and target_worker_index == worker_index:
+            # The child would block sending to its own pipe, since it is the only reader
+            raise ValueError(f"Pipeline {signal_name} -> {function_name} cannot connect a child to itself.")
+        pipeline_input, pipeline_output = self._mp_context.Pipe(duplex=False)
+        output = (worker_index, signal_name, pipeline_output, function_name, observe)
+        self._pipeline_outputs.append(output)
+        target._pipeline_inputs.append((target_worker_index, pipeline_input))
+        if target_worker_index < len(target._children):
+            target._attach_pipelines(target._children[target_worker_index], target_worker_index, [], [pipeline_input])
+        if worker_index < len(self._children):
+            # Items sent before the connected child has attached its end wait in the pipe
+            for future in self._attach_pipelines(self._children[worker_index], worker_index, [output], []):
+                future.result(timeout)
+
+    def _attach_pipelines(self, _child: CProcess, worker_index: int, outputs: list[tuple] = None,
+                          inputs: list[connection.Connection] = None) -> list[CFuture]:
+        """
+        Hands the ends of the pipelines of the child with worker_index over to _child.
+        :return: The futures of the attachments.
+        """
+        if outputs is None:
+            outputs = [output for output in self._pipeline_outputs if output[0] == worker_index]
+        if inputs is None:
+            inputs = [pipeline_input for index, pipeline_input in self._pipeline_inputs if index == worker_index]
+        futures = [self._call_child(_child, 'attach_pipeline_output', signal_name, pipeline_output, function_name,
+                                    observe)
+                   for _, signal_name, pipeline_output, function_name, observe in outputs]
+        return futures + [self._call_child(_child, 'attach_pipeline_input', pipeline_input)
+                          for pipeline_input in inputs]
+
+    def _property_store(self, worker_index: int) -> CPropertyStore:
+        """
+        Returns the property store of the child with worker_index (created on first use), None if the child class has
+        no shared properties or the children are hosted on another machine.
+        """
+        if worker_index not in self._property_stores:
+            properties = CPropertyStore.shared_properties(self._child_class)
+            if not properties or self.agent_address is not None:
+                return None
+            self._property_stores[worker_index] = CPropertyStore({n: p.shared for n, p in properties.items()})
+            self._property_signals = {n: p.signal_name for n, p in properties.items()}
+        return self._property_stores[worker_index]
+
+    def property_value(self, name: str, worker_index: int = 0):
+        """
+        Returns the current value of the shared property name (see CProperty) of a child, without sending a message.
+        None if the child has not set it yet.
+        """
+        property_store = self._property_stores.get(worker_index)
+        if property_store is None or name not in property_store:
+            raise KeyError(f"{name} is not a shared property of the child with worker index {worker_index}.")
+        return property_store.read(name)
+
+    def _property_timeout(self):
+        if self._property_deadline is None:
+            return None
+        return max(0.0, self._property_deadline - time.time())
+
+    def _emit_properties(self, force: bool = False):
+        """
+        Emits the signals of the shared properties, that have changed since the last call (at most once every
+        property_interval). Called by the monitor thread. While the values change, the stores are read again after
+        property_interval, otherwise the child announces the next change (see CPropertyStore.changes).
+        """
+        if not self._property_stores:
+            return
+        now = time.time()
+        if not force and self._property_deadline is not None and now < self._property_deadline:
+            return
+        self._property_deadline = None
+        for property_store in list(self._property_stores.values()):
+            changes = property_store.changes()
+            if changes:
+                self._property_deadline = now + self.property_interval
+            for name, value in changes.items():
+                if self._property_signals.get(name) is None:
+                    continue
+                try:
+                    getattr(self._signal_class, self._property_signals[name]).emit(value)
+                except Exception as e:
+                    self._module_logger.error(f"Error while emitting property {name} in {self.__class__.__name__}: {e}")
+
+    def _stream_timeout(self):
+        if not self._streams:
+            return None
+        if self._stream_deadline is None:
+            return 0.0
+        return max(0.0, self._stream_deadline - time.time())
+
+    def _check_streams(self):
+        """
+        Emits on_stream_data for the streams with items that have not been announced (see
+        CStream.take_lost_notification), at most once every stream_check_interval. Called by the monitor thread.
+        """
+        if not self._streams:
+            return
+        now = time.time()
+        if self._stream_deadline is not None and now < self._stream_deadline:
+            return
+        self._stream_deadline = now + self.stream_check_interval
+        for stream, _ in list(self._streams.values()):
+            try:
+                announce = stream.take_lost_notification()
+            except ValueError:
+                # Closed by safe_exit in the meantime
+                continue
+            if announce:
+                self._handle_record(CStreamNotification(stream.name))
+
+    def supervision_statistics(self) -> dict:
+        """
+        :return: {'restarts': number of replaced children, 'downtime': sum of the time (seconds) from detecting the end
+            of a child until its replacement has been started or activated, 'standby': number of standby children}
+        """
+        return {'restarts': self._restarts, 'downtime': self._downtime, 'standby': len(self._standby_children)}
+
+    def child_health(self) -> list[dict]:
+        """
+        Health of the children, read from their heartbeats (empty, if heartbeat_interval is None).
+        :return: Per child: {'worker_index', 'pid', 'alive', 'stalled', 'heartbeat_age', 'cpu_time', 'rss', 'commands',
+            'command', 'command_duration', 'control_queue_depth', 'cmd_queue_depth', 'state_queue_depth'}, see
+            CHeartbeat.snapshot. 'stalled' is None if stall_timeout is None, otherwise 'heartbeat' or 'command' if the
+            child is stalled, else False. The depths are the numbers of records waiting in the queues: commands for
+            this child, commands for the next idle worker by priority (shared by the pool) and results of this child not
+            handled yet. None if the platform does not support it (macOS).
+        """
+        if self.heartbeat_interval is None:
+            return []
+        health = []
+        cmd_queue_depth = {priority: self._queue_depth(q) for priority, q in self._priority_queues.items()}
+        for index, _child in enumerate(list(self._children)):
+            heartbeat = self._heartbeat_of.get(_child.pid)
+            if heartbeat is None:
+                continue
+            child_health = {'worker_index': index, 'pid': _child.pid, 'alive': _child.is_alive(), 'stalled': None}
+            child_health.update(heartbeat.snapshot(self._command_table))
+            child_health.update({'control_queue_depth': self._queue_depth(_child.control_queue),
+                                 'cmd_queue_depth': dict(cmd_queue_depth),
+                                 'state_queue_depth': self._queue_depth(self._state_queue_of.get(_child.pid))})
+            if self.stall_timeout is not None:
+                child_health['stalled'] = self._stall_reason(child_health)
+            health.append(child_health)
+        return health
+
+    @staticmethod
+    def _queue_depth(q) -> int:
+        if q is None:
+            return None
+        try:
+            return q.qsize()
+        except (NotImplementedError, OSError):
+            # sem_getvalue is not implemented on macOS, the queue may have been closed
+            return None
+
+    def _stall_reason(self, child_health: dict):
+        if not child_health['alive']:
+            return False
+        if child_health['heartbeat_age'] is not None and child_health['heartbeat_age'] > self.stall_timeout:
+            # The child does not run Python code anymore (e.g. blocked in an extension holding the GIL, or stopped)
+            return 'heartbeat'
+        if child_health['command_duration'] is not None and child_health['command_duration'] > self.stall_timeout:
+            return 'command'
+        return False
+
+    def _health_timeout(self):
+        if self._health_deadline is None:
+            return None
+        return max(0.0, self._health_deadline - time.time())
+
+    def _check_health(self):
+        """
+        Emits on_heartbeat every heartbeat_interval and on_child_stalled when a child becomes stalled. Called by the
+        monitor thread.
+        """
+        if self.heartbeat_interval is None:
+            return
+        now = time.time()
+        if self._health_deadline is not None and now < self._health_deadline:
+            return
+        self._health_deadline = now + self.heartbeat_interval
+        health = self.child_health()
+        for child_health in health:
+            if not child_health['stalled']:
+                self._stalled_children.discard(child_health['pid'])
+            elif child_health['pid'] not in self._stalled_children:
+                self._stalled_children.add(child_health['pid'])
+                self._module_logger.warning(f"Child process {child_health['pid']} stalled "
+                                            f"({child_health['stalled']}): {child_health}")
+                self.on_child_stalled.emit(child_health)
+        self.on_heartbeat.emit(health)
+
+    @property
+    def child(self):
+        return self._child
+
+    @property
+    def children(self) -> list[CProcess]:
+        return self._children
+
+    def _monitor_result_state(self):
+        self._module_logger.info("Starting monitor thread.")
+        try:
+            while True:
+                # Close the shared memory segments of results that are not referenced anymore
+                self._shared_memory.sweep()
+                # Also while other children keep the queues busy, the children that ended are replaced immediately
+                self._supervise()
+                self._emit_statistics()
+                self._check_health()
+                self._emit_properties()
+                self._check_streams()
+                records = []
+                for pid, state_queue in list(self._state_queue_of.items()):
+                    records.extend(self._drain_queue(state_queue, self._sentinel_of[pid]))
+                if records:
+                    self._handle_records(records)
+                # Log records are handled after the results
+                log_records = []
+                for pid, log_queue in list(self._log_queue_of.items()):
+                    log_records.extend(self._drain_queue(log_queue, self._sentinel_of[pid]))
+                for record in log_records:
+                    self._handle_record(record)
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv_bytes()
+                if not records and not log_records:
+                    supervised = self._children + self._standby_children
+                    sentinels = [c.sentinel for c in supervised if c.is_alive()]
+                    if len(sentinels) < len(supervised) and self.restart_children and self._child_kill_flag.value:
+                        # A child ended after _supervise, it is replaced in the next iteration
+                        continue
+                    if not sentinels:
+                        # All children ended, the records they sent last are handled below
+                        break
+                    # Sleep until a record arrives or a child ends, thus the death of a child is detected immediately
+                    timeouts = [t for t in (self._statistics_timeout(), self._health_timeout(),
+                                            self._property_timeout(), self._stream_timeout()) if t is not None]
+                    readers = [q._reader for q in list(self._state_queue_of.values()) +
+                               list(self._log_queue_of.values())]
+                    connection.wait(readers + [self._wakeup_reader] + sentinels, min(timeouts, default=None))
+
+        except Exception as e:
+            self._module_logger.error(f"Error in monitor thread: {e}")
+            time.sleep(1)
+
+        self._module_logger.info(f"Ended monitor thread. Child process alive: {self._child.is_alive()}")
+        for _child in self._standby_children:
+            _child.join(timeout=1)
+        for _child in self._children + self._standby_children:
+            self._handle_remaining_records(_child)
+        self._release_queued_commands()
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
+        for cmd_queue in self._priority_queues.values():
+            cmd_queue.close()
+        for control_queue in self._control_queues:
+            control_queue.close()
+        # The values set by the children before they ended
+        self._emit_properties(force=True)
+        for property_store in self._property_stores.values():
+            property_store.close()
+        for _, _, pipeline_output, _, _ in self._pipeline_outputs:
+            pipeline_output.close()
+        for _, pipeline_input in self._pipeline_inputs:
+            pipeline_input.close()
+        # After closing the queues, no new command can be sent
+        self._fail_pending_futures(f"Child process of {self.name} ended before answering the command.")
+
+    def _release_queued_commands(self):
+        """
+        Takes the commands, that no child has taken before all children ended, out of the command and control queues
+        and releases their arguments in shared memory. The segments are owned by the receiving child, thus nobody else
+        would ever remove them. Called by the monitor thread, after the children ended.
+        """
+        for q in list(self._priority_queues.values()) + list(self._control_queues):
+            t_end = time.time() + 1
+            while True:
+                try:
+                    cmd = q.get(block=False)
+                except queue.Empty:
+                    if not q._buffer or time.time() > t_end:
+                        break
+                    # Not written to the pipe by the feeder thread yet
+                    time.sleep(0.001)
+                    continue
+                except (OSError, ValueError):
+                    break
+                if isinstance(cmd, mpPy6.CCommandRecord):
+                    release_shared_memory(cmd.args)
+                    release_shared_memory(cmd.kwargs)
+
+    def _command_dropped(self, cmd):
+        """
+        Called for every command dropped by the policy of a full command queue. Its future is cancelled.
+        """
+        cmd.resolve_names(self._command_table, self._child.name)
+        self._module_logger.warning(f"Command queue full, {cmd} dropped.")
+        release_shared_memory(cmd.args)
+        release_shared_memory(cmd.kwargs)
+        with self._pending_futures_lock:
+            future = self._pending_futures.pop(cmd.cmd_id, None)
+        if future is not None:
+            future.cancel()
+
+    def queue_statistics(self) -> dict[str, dict[str, int]]:
+        """
+        Returns how often the policies of the queues fired (see CQueue.statistics), summed up for all command queues
+        and for the state queues of all children.
+        """
+        cmd_statistics = dict.fromkeys(CQueue.COUNTERS, 0)
+        for cmd_queue in self._priority_queues.values():
+            for counter, n in cmd_queue.statistics().items():
+                cmd_statistics[counter] += n
+        state_statistics = dict(self._ended_state_statistics)
+        for state_queue in list(self._state_queue_of.values()):
+            for counter, n in state_queue.statistics().items():
+                state_statistics[counter] += n
+        return {'cmd_queue': cmd_statistics, 'state_queue': state_statistics}
+
+    def _drain_queue(self, q: CQueue, sentinel: int) -> list:
+        """
+        Returns all records currently available in the queue of a child (at most drain_limit). Batches sent by the
+        children are flattened. A record the child was writing when it ended is discarded.
+        """
+        records = []
+        while len(records) < self.drain_limit:
+            try:
+                res = q.get_written_by(sentinel)
+            except queue.Empty:
+                break
+            except EOFError:
+                self._module_logger.error("A child process ended while sending a record, the incomplete record has "
+                                          "been discarded.")
+                break
+            if isinstance(res, list):
+                records.extend(res)
+            elif res is not None:
+                records.append(res)
+        for res in records:
+            if isinstance(res, CResultRecord):
+                res.resolve_names(self._command_table, self._signal_table)
+        return records
+
+    def _handle_records(self, records: list):
+        """
+        Handles the records of one wakeup. Results of coalesced signals (see set_signal_coalescing) are emitted once,
+        after all other records have been handled.
+        """
+        coalesced: dict[str, list[CResultRecord]] = {}
+        for res in records:
+            if isinstance(res, CResultRecord) and res.signal_name in self._signal_coalescing:
+                coalesced.setdefault(res.signal_name, []).append(res)
+            else:
+                self._handle_record(res)
+
+        for signal_name, group in coalesced.items():
+            if self._signal_coalescing[signal_name] == self.COALESCE_LATEST:
+                for res in group[:-1]:
+                    if not self._resolve_future(res):
+                        release_shared_memory(res.result)
+                self._handle_record(group[-1])
+            else:
+                results = []
+                for res in group:
+                    res.result = from_shared_memory(res.result, self._shared_memory)
+                    self._resolve_future(res)
+                    results.append(res.result)
+                self._handle_record(CResultRecord(group[-1].function_name, signal_name, results))
+
+    def _resolve_future(self, res) -> bool:
+        """
+        Resolves the future of the command answered by res (CResultRecord or CException).
+        :return: True if a pending future has been resolved.
+        """
+        if res.cmd_id is None:
+            return False
+        with self._pending_futures_lock:
+            future = self._pending_futures.pop(res.cmd_id, None)
+            cache_key = self._cache_keys.pop(res.cmd_id, None)
+        if future is None:
+            return False
+        try:
+            if isinstance(res, CException):
+                future.set_exception(res.exception)
+            else:
+                result = from_shared_memory(res.result, self._shared_memory)
+                future.set_result(result)
+                if cache_key is not None:
+                    self._result_caches[cache_key[0]].put(cache_key[1], (res.signal_name, result))
+        except concurrent.futures.InvalidStateError:
+            # Cancelled by the caller in the meantime
+            return False
+        return True
+
+    def _fail_future(self, cmd_id: int, reason: str):
+        if cmd_id is None:
+            return
+        with self._pending_futures_lock:
+            future = self._pending_futures.pop(cmd_id, None)
+            self._cache_keys.pop(cmd_id, None)
+        if future is not None:
+            try:
+                future.set_exception(ChildProcessError(reason))
+            except concurrent.futures.InvalidStateError:
+                pass
+
+    def _fail_pending_futures(self, reason: str):
+        with self._pending_futures_lock:
+            futures, self._pending_futures = self._pending_futures, {}
+            self._cache_keys.clear()
+        for future in futures.values():
+            try:
+                future.set_exception(ChildProcessError(reason))
+            except concurrent.futures.InvalidStateError:
+                pass
+
+    def _handle_record(self, res):
+        if isinstance(res, logging.LogRecord):
+            try:
+                self.logger.handle(res)
+            except Exception as e:
+                self.logger.warning(f"Error cannot handle log record: {e}")
+        elif isinstance(res, CResultRecord):
+            try:
+                res.result = from_shared_memory(res.result, self._shared_memory)
+                t_emit = time.time()
+                res.emit_signal(self._signal_class)
+                self._record_statistics(res, t_emit, time.time())
+            except Exception as e:
+                self._module_logger.error(f"Error while emitting {res} in {self.__class__.__name__}: {e}")
+            # The caller waits for the result, even if the signal could not be emitted
+            self._resolve_future(res)
+            # Do not keep the result (e.g. a view of a shared memory segment) alive longer than necessary
+            res.result = None
+        elif isinstance(res, CStreamNotification):
+            # Signal of this class, not of the signal class
+            try:
+                self.on_stream_data.emit(res.name)
+            except Exception as e:
+                self._module_logger.error(f"Error while emitting on_stream_data({res.name}): {e}")
+        elif isinstance(res, CException):
+            self._module_logger.error(f"Received exception: {res}")
+            self._resolve_future(res)
+            try:
+                self.on_exception_raised.emit(res)
+            except Exception as e:
+                self._module_logger.error(f"Error while emitting exception: {e}")
+        else:
+            self._module_logger.error(f"Received unknown result {res}!")
+
+    def _record_statistics(self, res: CResultRecord, t_emit: float, t_emitted: float):
+        statistics = self._command_statistics
+        name = res.function_name.split('->')[0]
+        duration = self._duration
+        statistics.add(name, statistics.QUEUE_WAIT, duration(res.t_received, res.t_sent))
+        statistics.add(name, statistics.EXECUTION, duration(res.t_finished, res.t_started))
+        statistics.add(name, statistics.TOTAL, duration(t_emitted, res.t_sent))
+        statistics.add(name, statistics.RESULT_WAIT, duration(t_emit, res.t_finished))
+        statistics.add(name, statistics.EMIT, t_emitted - t_emit)
+
+    @staticmethod
+    def _duration(t_end: float, t_start: float) -> float:
+        # Timestamps of a record may be missing (e.g. not answering a command), the stage is skipped (None)
+        if t_end is None or t_start is None:
+            return None
+        return t_end - t_start
+
+    def command_statistics(self, function_name: str = None) -> dict:
+        """
+        Returns the durations of the stages of the commands and results (queue_wait, execution, result_wait, emit and
+        total), aggregated per function. See CStatistics.snapshot.
+        :param function_name: Only return the statistics of this function.
+        """
+        return self._command_statistics.snapshot(function_name)
+
+    def reset_command_statistics(self):
+        self._command_statistics.reset()
+
+    def set_statistics_interval(self, interval: float = None):
+        """
+        Emits on_statistics_updated with a snapshot of the command statistics every interval seconds.
+        :param interval: Interval in seconds. None disables the signal.
+        """
+        self.statistics_interval = interval
+        self._statistics_deadline = None
+        # Wake up the monitor thread to apply the new interval
+        try:
+            self._wakeup_writer.send_bytes(b'')
+        except (OSError, ValueError):
+            # The monitor thread has already ended
+            pass
+
+    def _statistics_timeout(self):
+        if self._statistics_deadline is None:
+            return None
+        return max(0.0, self._statistics_deadline - time.time())
+
+    def _emit_statistics(self):
+        if self.statistics_interval is None:
+            self._statistics_deadline = None
+            return
+        now = time.time()
+        if self._statistics_deadline is None:
+            self._statistics_deadline = now + self.statistics_interval
+        elif now >= self._statistics_deadline:
+            self._statistics_deadline = now + self.statistics_interval
+            self.on_statistics_updated.emit(self.command_statistics())
+
+    def set_signal_coalescing(self, signal_name: str, mode: str = COALESCE_LATEST):
+        """
+        Coalesces repeated emissions of a signal, that arrive within one wakeup of the monitor thread (e.g. a property
+        changed in a tight loop of the child).
+        :param signal_name: Name of the signal.
+        :param mode: COALESCE_LATEST emits only the latest result, COALESCE_LIST emits all results as one list (the
+            signal has to accept a list). None disables the coalescing.
+        """
+        if mode is None:
+            self._signal_coalescing.pop(signal_name, None)
+        elif mode in (self.COALESCE_LATEST, self.COALESCE_LIST):
+            self._signal_coalescing[signal_name] = mode
+        else:
+            raise ValueError(f"Unknown coalescing mode {mode}.")
+
+    def display_exception(self, e: mpPy6.CException):
+        self.logger.error(f"Error executing {e.function_name} in {e.parent_name}: {e.exception}\n{e.traceback()}")
+
+    def execute_function(self, func: callable, signal=None):
+        self.register_function(signal)(func)(self)
+
+    #@staticmethod
+    def register_function(signal=None, broadcast: bool = False, shared_memory: bool = None,
+                          priority: int = PRIORITY_NORMAL, timeout: float = None,
+                          cache: bool = False, cache_size: int = 128, cache_ttl: float = None,
+                          cache_max_bytes: int = None):
+        """
+        Decorator for registering functions in the command queue.
+        This automatically puts the command into the queue and executes the function.
+        If a signal_name is specified, the given Signal name will be emitted after the function has been executed.
+        :param signal:
+        :param broadcast: If True, the command is executed by every child of the pool instead of the next idle one.
+        :param shared_memory: If True, all buffer arguments (NumPy arrays, bytes, memoryviews) are passed using shared
+            memory, if False never. If None, only arguments exceeding the shared_memory_threshold are passed this way.
+        :param priority: PRIORITY_HIGH, PRIORITY_NORMAL or PRIORITY_LOW. Commands of a higher priority overtake all
+            waiting commands of lower priorities (e.g. for aborting a measurement). Ignored for broadcasts, which are
+            always taken first.
+        :param timeout: Seconds after calling the function, after which the child does not execute the command anymore
+            and answers it with a CTimeoutException (the future raises a TimeoutError). Running functions can poll
+            CProcess.is_cancelled() to stop early.
+        :param cache: If True, the results are cached by the arguments (which have to be hashable, otherwise the call
+            is not cached). Calling the function again with the same arguments emits the cached result immediately,
+            without sending a command to the child. Only for functions whose result depends on their arguments only,
+            not for streaming functions. See invalidate_cache and cache_statistics.
+        :param cache_size: Maximum number of cached results, the least recently used ones are evicted.
+        :param cache_ttl: Seconds after which a cached result is not used anymore. None keeps them until evicted.
+        :param cache_max_bytes: Maximum size of all cached results in bytes (see CResultCache.size_of).
+        :return: Calling the function returns a CFuture, that is resolved with the return value of the child's function
+            (or its exception). For broadcasts, the future is resolved by the first child answering.
+        """
+
+        if cache and broadcast:
+            raise ValueError("Broadcasts cannot be cached.")
+
+        # Resolved once, on the first call: a CSignal is named when its class has been created
+        resolved_signal = [] if signal is not None else [(None, None)]
+
+        def register(func):
+            name = getattr(func, '__name__', 'unknown')
+
+            def get_signature(self, *args, **kwargs):
+                if not resolved_signal:
+                    resolved_signal.append(_match_signal_name(signal))
+                sig_name, sig_args = resolved_signal[0]
+                # Messages are only formatted, if they are logged (e.g. the repr of large arguments is expensive)
+                debug = self._module_logger.isEnabledFor(logging.DEBUG)
+                cmd = mpPy6.CCommandRecord(self._child.name, name, *args, **kwargs)
+                cmd.func_id = self._command_ids.get(name)
+                if sig_name is not None:
+                    cmd.register_signal(sig_name)
+                    if debug:
+                        self._module_logger.debug(f"New function registered: {cmd} -> {sig_name}("
+                                                  f"{', '.join(str(a) for a in sig_args)})")
+                elif debug:
+                    self._module_logger.debug(f"New function registered: {cmd}")
+
+                try:
+                    if debug:
+                        self._module_logger.debug(f"Executing {name} with args {args} and kwargs {kwargs}")
+                    func(self, *args, **kwargs)
+                except Exception as e:
+                    self._module_logger.error(f"Error while executing {cmd}: {e}")
+                    raise e
+
+                cache_key = None
+                if cache:
+                    result_cache = self._result_caches.get(name)
+                    if result_cache is None:
+                        result_cache = self._result_caches.setdefault(
+                            name, CResultCache(cache_size, cache_ttl, cache_max_bytes))
+                    cache_key = CResultCache.make_key(args, kwargs)
+                    if cache_key is not None:
+                        hit, cached = result_cache.get(cache_key)
+                        if hit:
+                            return self._emit_cached_result(name, *cached)
+
+                # A segment can only be attached (and unlinked) by one child, thus broadcasts are always pickled
+                if broadcast or shared_memory is False or self.agent_address is not None:
+                    threshold = None
+                elif shared_memory:
+                    threshold = 0
+                else:
+                    threshold = self.shared_memory_threshold
+                cmd.args = to_shared_memory(cmd.args, threshold, self._shared_memory)
+                cmd.kwargs = to_shared_memory(cmd.kwargs, threshold, self._shared_memory)
+
+                cmd.cmd_id = next(self._cmd_ids)
+                future = CFuture(cmd.cmd_id, name)
+                with self._pending_futures_lock:
+                    self._pending_futures[cmd.cmd_id] = future
+                    if cache_key is not None:
+                        self._cache_keys[cmd.cmd_id] = (name, cache_key)
+
+                try:
+                    cmd.t_sent = time.time()
+                    if timeout is not None:
+                        cmd.deadline = cmd.t_sent + timeout
+                    if broadcast:
+                        for control_queue in self._control_queues:
+                            control_queue.put(cmd)
+                    else:
+                        self._priority_queues[priority].put(cmd)
+                    if debug:
+                        self._module_logger.debug(f"{cmd} put into cmd_queue (priority {priority}).")
+                except Exception as e:
+                    self._module_logger.error(f"Error while putting {cmd} into cmd_queue: {e}")
+                    release_shared_memory(cmd.args)
+                    release_shared_memory(cmd.kwargs)
+                    with self._pending_futures_lock:
+                        self._pending_futures.pop(cmd.cmd_id, None)
+                        self._cache_keys.pop(cmd.cmd_id, None)
+                    raise e
+                return future
+
+            return get_signature
+
+        return register
+
+    def _emit_cached_result(self, func_name: str, signal_name: str, result) -> CFuture:
+        """
+        Answers a call of a cached function: the signal is emitted by the calling thread, before the call returns.
+        """
+        future = CFuture(next(self._cmd_ids), func_name)
+        try:
+            CResultRecord(func_name, signal_name, result).emit_signal(self._signal_class)
+        except Exception as e:
+            self._module_logger.error(f"Error while emitting the cached result of {func_name}: {e}")
+        future.set_result(result)
+        return future
+
+    def invalidate_cache(self, function_name: str = None, *args, **kwargs):
+        """
+        Removes cached results (see register_function(cache=True)).
+        :param function_name: Only remove the results of this function. None removes all results.
+        :param args: Only remove the result of the call with these arguments (if args or kwargs are given).
+        """
+        if function_name is None:
+            for result_cache in list(self._result_caches.values()):
+                result_cache.invalidate()
+        elif function_name in self._result_caches:
+            key = CResultCache.make_key(args, kwargs) if args or kwargs else None
+            self._result_caches[function_name].invalidate(key)
+
+    def cache_statistics(self) -> dict[str, dict[str, int]]:
+        """
+        :return: {function name: {'entries', 'bytes', 'hits', 'misses'}} of the cached functions called so far.
+        """
+        return {name: result_cache.statistics() for name, result_cache in list(self._result_caches.items())}
+
+    @register_function(broadcast=True)
+    def cancel_command(self, cmd_id: int):
+        """
+        Cancels the command with this id (CFuture.cmd_id). Its future is cancelled immediately. A streaming function
+        (generator) stops before its next item, a command still waiting in the queue is skipped. Items already sent by
+        the child are still emitted.
+        """
+        with self._pending_futures_lock:
+            future = self._pending_futures.pop(cmd_id, None)
+        if future is not None:
+            future.cancel()
+
+    @register_function(broadcast=True)
+    def set_internal_log_level(self, level):
+        self.internal_log_level = level
+        self.set_child_log_level(level)
+
+    @register_function(broadcast=True)
+    def set_internal_log_enabled(self, enabled):
+        self.internal_log_enabled = enabled
+        self.set_child_log_enabled(enabled)
+
+    @register_function(broadcast=True)
+    def set_child_log_level(self, level):
+        """
+        Sets the regular logging level of the child process.
+        :param level:
+        :return:
+        """
+
+    @register_function(broadcast=True)
+    def set_child_log_enabled(self, enabled):
+        """
+        Enables or disables logging of the child process.
+        :param enabled:
+        :return:
+        """
+
+    @register_function()
+    def get_command_statistics(self):
+        """
+        Returns the statistics collected by the child executing this command (see CProcess.command_statistics).
+        """
+
+    @register_function()
+    def get_child_log(self, n: int = None):
+        """
+        Returns the latest n log lines (all if None) kept by the child executing this command, if log_ring_size is set.
+        """
+
+    def safe_exit(self, reason: str = ""):
+        self._module_logger.warning(f"Shutting down ProcessControl {os.getpid()}. Reason: {reason}")
+        self._child_kill_flag.value = 0
+        # The children sleep until a command arrives, wake them up to check the kill flag
+        for control_queue in self._control_queues:
+            try:
+                control_queue.put(None)
+            except ValueError:
+                # Queue has already been closed
+                pass
+        # The segments of the streams are removed, the children keep their mapping until they end
+        for stream, _ in self._streams.values():
+            stream.close()
+        self._streams = {}
+
+    def __del__(self):
+        self._module_logger.warning(f"Closing ProcessControl {self.__class__.__name__} with pid {os.getpid()}")
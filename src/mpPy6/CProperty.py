@@ -1,3 +1,5 @@
+import logging
+
 import mpPy6
 
 
@@ -48,10 +50,13 @@ def Cache(function=None, signal_name=None):
 
 
 class CProperty:
-    def __init__(self, fget = None, fset=None, emit_to: str = None):
+    def __init__(self, fget = None, fset=None, emit_to: str = None, shared=None):
         self.fget = fget
         self.fset = fset
         self.signal_name = emit_to
+        # Type of a property kept in the property store (see CPropertyStore): bool, int, float or (dtype, shape).
+        # Its changes are not sent as messages, the control class reads the store and emits emit_to periodically.
+        self.shared = shared
         self.instance_ = None
 
     def __get__(self, obj, objtype=None):
@@ -64,20 +69,22 @@ class CProperty:
     def __set__(self, obj: mpPy6.CProcess, value):
         if self.fset is None:
             raise AttributeError("can't set attribute")
-        obj._module_logger.debug(f"Setting {self.signal_name}!")
-        result = mpPy6.CResultRecord(str(self.fset.__name__), self.signal_name, value)
-        obj.state_queue.put(result)
+        store = getattr(obj, 'property_store', None)
+        if self.shared is not None and store is not None and self.fset.__name__ in store:
+            store.write(self.fset.__name__, value)
+        else:
+            if obj._module_logger.isEnabledFor(logging.DEBUG):
+                obj._module_logger.debug(f"Setting {self.signal_name}!")
+            obj._put_result_to_queue(str(self.fset.__name__), self.signal_name, value)
 
         self.fset(obj, value)
 
     def getter(self, fget):
 
-        return type(self)(fget, self.fset, self.signal_name)
+        return type(self)(fget, self.fset, self.signal_name, self.shared)
 
     def _setter(self, fset):
-        return type(self)(self.fget, fset, self.signal_name)
-
-    def setter(self, emit_to: str):
-        return type(self)(self.fget, self.fset, emit_to=emit_to)._setter
-
+        return type(self)(self.fget, fset, self.signal_name, self.shared)
 
+    def setter(self, emit_to: str, shared=None):
+        return type(self)(self.fget, self.fset, emit_to=emit_to, shared=shared)._setter
@@ -0,0 +1,191 @@
+import struct
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+from mpPy6.CSharedMemory import _numpy
+
+
+class CPropertyStore:
+    """
+        Table of the shared properties (see CProperty, shared=...) of one child in a shared memory segment. The child
+        writes every value in place, the control class reads the current value at any time, without a message.
+
+        Every entry is guarded by a sequence lock: the writer increments the version of the entry before and after
+        writing the value (odd while writing), the reader repeats reading until the version was even and unchanged.
+        Thus the reader never sees a partially written value and the writer never waits for the reader.
+
+        If the reader has found no changes, it requests a notification: the next write calls _notify (set by the child,
+        wakes up the monitor thread of the control class). Thus the reader does not poll while the values do not change.
+
+        A writer that ended while writing leaves the version of the entry odd. The reader does not wait longer than
+        _READ_TIMEOUT for a value, it returns the last value it has read instead. recover() makes the versions even
+        again, before the store is written by another child.
+    """
+    # Index of the flag in the header: set by the reader if it waits for a notification, reset by the writer when
+    # sending it (as in CStream)
+    NOTIFY = 0
+    _HEADER_BYTES = 64
+    # Formats of the scalar types (struct), arrays are given as (dtype, shape)
+    _FORMATS = {bool: '?', int: 'q', float: 'd'}
+    _ALIGNMENT = 64
+    # Number of failed reads (value changed while reading), before the reader yields to the writer
+    _SPINS = 100
+    # Maximum time (seconds) the reader waits for a value being written
+    _READ_TIMEOUT = 0.1
+
+    def __init__(self, layout: dict[str, object], _shm_name: str = None):
+        """
+        :param layout: Type of every property by name: bool, int, float or (dtype, shape) for NumPy arrays.
+        """
+        self.layout = dict(layout)
+        self._entries: dict[str, tuple[int, object, tuple, int]] = {}
+        offset = self._HEADER_BYTES
+        for name, spec in self.layout.items():
+            if not isinstance(spec, tuple):
+                if spec not in self._FORMATS:
+                    raise ValueError(f"Property {name} cannot be shared: {spec} is not bool, int, float or "
+                                     f"(dtype, shape).")
+                fmt, shape = self._FORMATS[spec], None
+                nbytes = struct.calcsize(fmt)
+            else:
+                dtype, shape = spec
+                fmt, shape = _numpy().dtype(dtype), tuple(shape)
+                nbytes = fmt.itemsize * int(_numpy().prod(shape))
+            self._entries[name] = (offset, fmt, shape, nbytes)
+            # Version (8 bytes) followed by the value, every entry in its own cache lines
+            offset += -(-(8 + nbytes) // self._ALIGNMENT) * self._ALIGNMENT
+        self._owner = _shm_name is None
+        if self._owner:
+            self._shm = SharedMemory(create=True, size=offset)
+        else:
+            # Registered again with the resource tracker, which is shared with the creator. Only the creator unlinks it.
+            self._shm = SharedMemory(name=_shm_name)
+        self._versions = self._shm.buf[:offset].cast('Q')
+        if self._owner:
+            self._versions[self.NOTIFY] = 1
+        # Called by the writer, if the reader waits for a notification (see CProcess)
+        self._notify: callable = None
+        # Versions of the values last seen by changes()
+        self._seen: dict[str, int] = {name: 0 for name in self.layout}
+        # Values last read completely, returned if the value is not completely written in time
+        self._last_values: dict[str, object] = {}
+
+    @staticmethod
+    def shared_properties(child_class: type) -> dict[str, 'CProperty']:
+        """
+        Returns the properties of child_class kept in a property store (CProperty with shared), by name.
+        """
+        from mpPy6.CProperty import CProperty
+        properties = {}
+        for cls in reversed(child_class.__mro__):
+            for attribute in vars(cls).values():
+                if isinstance(attribute, CProperty) and attribute.shared is not None and attribute.fset is not None:
+                    properties[attribute.fset.__name__] = attribute
+        return properties
+
+    def __getstate__(self):
+        return self.layout, self._shm.name
+
+    def __setstate__(self, state):
+        layout, shm_name = state
+        self.__init__(layout, _shm_name=shm_name)
+
+    def __contains__(self, name: str):
+        return name in self._entries
+
+    def write(self, name: str, value):
+        """
+        Writes the value of the property name in place. Called by the child (the only writer of the store).
+        """
+        offset, fmt, shape, nbytes = self._entries[name]
+        version = offset // 8
+        self._versions[version] += 1
+        try:
+            if shape is None:
+                struct.pack_into(fmt, self._shm.buf, offset + 8, value)
+            else:
+                dst = _numpy().ndarray(shape, dtype=fmt, buffer=self._shm.buf, offset=offset + 8)
+                dst[...] = value
+                del dst
+        finally:
+            self._versions[version] += 1
+        if self._versions[self.NOTIFY]:
+            self._versions[self.NOTIFY] = 0
+            if self._notify is not None:
+                self._notify()
+
+    def read(self, name: str):
+        """
+        Returns the current value of the property name, None if it has not been written yet.
+        """
+        return self._read(name)[1]
+
+    def _read(self, name: str) -> tuple[int, object]:
+        offset, fmt, shape, nbytes = self._entries[name]
+        version = offset // 8
+        spins = 0
+        t_end = None
+        while True:
+            before = self._versions[version]
+            if before == 0:
+                return 0, None
+            if not before & 1:
+                if shape is None:
+                    value = struct.unpack_from(fmt, self._shm.buf, offset + 8)[0]
+                else:
+                    value = _numpy().frombuffer(self._shm.buf, dtype=fmt, count=int(_numpy().prod(shape)),
+                                                offset=offset + 8).reshape(shape).copy()
+                if self._versions[version] == before:
+                    self._last_values[name] = value
+                    return before, value
+            spins += 1
+            if spins >= self._SPINS:
+                spins = 0
+                now = time.monotonic()
+                if t_end is None:
+                    t_end = now + self._READ_TIMEOUT
+                elif now >= t_end:
+                    # The writer is too slow or ended while writing (the version stays odd)
+                    return before, self._last_values.get(name)
+                time.sleep(0)
+
+    def changes(self) -> dict[str, object]:
+        """
+        Returns the properties, that have been written since the last call, with their current value. Called by the
+        control class (the only caller of this method). If nothing has changed, the next write is announced.
+        """
+        changed = self._changes()
+        if not changed:
+            self._versions[self.NOTIFY] = 1
+            # Written before the request for a notification has been set (thus not announced): read it now
+            changed = self._changes()
+        return changed
+
+    def _changes(self) -> dict[str, object]:
+        changed = {}
+        for name, (offset, _, _, _) in self._entries.items():
+            if self._versions[offset // 8] != self._seen[name]:
+                self._seen[name], changed[name] = self._read(name)
+        return changed
+
+    def recover(self):
+        """
+        Makes the versions of the entries even again, that a writer left odd since it ended while writing. Called after
+        the writer has ended, before another child continues writing the store. The value of such an entry may be
+        partially written, it is reported as changed.
+        """
+        for offset, _, _, _ in self._entries.values():
+            if self._versions[offset // 8] & 1:
+                self._versions[offset // 8] += 1
+
+    def close(self):
+        """
+        Closes the mapping of the segment, the creator also removes the segment.
+        """
+        self._versions.release()
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
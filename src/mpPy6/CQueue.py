@@ -0,0 +1,279 @@
+import multiprocessing
+import multiprocessing.queues
+import os
+import queue
+import struct
+from multiprocessing import connection
+from multiprocessing.reduction import ForkingPickler
+
+import mpPy6
+from mpPy6.CStream import CStreamNotification
+
+
+class CQueue(multiprocessing.queues.Queue):
+    """
+        Queue with an optional bound and a policy, that decides what happens if a record is put into the full queue.
+        The number of times each policy fired is counted in shared memory, thus it is available in every process.
+
+        Answers of commands (results and exceptions with a cmd_id, also within a batch) and notifications of streams are
+        never dropped, coalesced or rejected, otherwise the future of the command would never be resolved or the reader
+        of the stream never be notified again: if the queue is full, the producer waits.
+    """
+    # The producer waits until the consumer has taken a record
+    BLOCK = 'block'
+    # The oldest record in the queue is removed
+    DROP_OLDEST = 'drop_oldest'
+    # The new record is discarded
+    DROP_NEWEST = 'drop_newest'
+    # Older records of the same function are removed (only the latest one is kept). If there is none, the oldest
+    # record is removed.
+    COALESCE = 'coalesce'
+    # queue.Full is raised
+    RAISE = 'raise'
+
+    POLICIES = (BLOCK, DROP_OLDEST, DROP_NEWEST, COALESCE, RAISE)
+    # Names of the counters, see statistics()
+    COUNTERS = ('blocked', 'dropped_oldest', 'dropped_newest', 'coalesced', 'raised')
+
+    def __init__(self, maxsize: int = 0, policy: str = BLOCK, on_drop: callable = None, ctx=None):
+        """
+        :param maxsize: Maximum number of records. 0 means unbounded.
+        :param policy: One of POLICIES.
+        :param on_drop: Called with every record removed from or not put into the queue due to the policy (e.g. for
+            releasing resources). It is local to a process and not transferred to the child processes.
+        :param ctx: Multiprocessing context of the processes using the queue. Defaults to the default context.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', must be one of {self.POLICIES}.")
+        ctx = ctx if ctx is not None else multiprocessing.get_context()
+        super().__init__(maxsize, ctx=ctx)
+        # The locks of the readers and writers record the process holding them (see release_locks_of)
+        self._rlock = _COwnedLock(ctx)
+        if self._wlock is not None:
+            self._wlock = _COwnedLock(ctx)
+        self.policy = policy
+        self.on_drop = on_drop
+        self._counters = ctx.Array('q', len(self.COUNTERS))
+
+    def __getstate__(self):
+        return super().__getstate__() + (self.policy, self._counters)
+
+    def __setstate__(self, state):
+        super().__setstate__(state[:-2])
+        self.policy, self._counters = state[-2:]
+        self.on_drop = None
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def statistics(self) -> dict[str, int]:
+        """
+        Returns how often each policy fired (over all processes using the queue).
+        """
+        with self._counters.get_lock():
+            return dict(zip(self.COUNTERS, self._counters))
+
+    def release_locks_of(self, pid: int) -> list[str]:
+        """
+        Releases the locks held by a process that ended (e.g. killed while sending a record), otherwise all other
+        processes using the queue would wait for them forever.
+
+        Limitation: a record is written to the pipe of the queue at once only if it is not larger than PIPE_BUF (4096
+        bytes on Linux). If the process ended while writing a larger record, a part of it is left in the pipe and the
+        reader misinterprets the following data (or waits for the missing part). Thus a queue written by several
+        processes cannot be repaired then, a queue written by one process only is read with get_written_by.
+        :return: Names of the released locks ('read', 'write').
+        """
+        released = []
+        if self._rlock.release_if_owned_by(pid):
+            released.append('read')
+        if self._wlock is not None and self._wlock.release_if_owned_by(pid):
+            released.append('write')
+        return released
+
+    def get_written_by(self, sentinel: int):
+        """
+        Takes the next record without waiting, like get(block=False), out of a queue written by one process only (e.g.
+        the state queue of a child). The record is read while the writer writes it: if the writer ends before the
+        record is complete (e.g. killed while sending it), EOFError is raised instead of waiting forever for the
+        missing part. The incomplete record is removed from the queue.
+        :param sentinel: Sentinel of the writing process (see multiprocessing.Process.sentinel).
+        """
+        if os.name != 'posix':
+            # The pipes of Windows transfer a record as one message
+            return self.get(block=False)
+        if self._closed:
+            raise ValueError(f"Queue {self!r} is closed")
+        if not self._rlock.acquire(False):
+            raise queue.Empty
+        try:
+            if not self._poll():
+                raise queue.Empty
+            # The framing of multiprocessing.connection.Connection
+            size, = struct.unpack('!i', self._read_written_by(4, sentinel))
+            if size == -1:
+                size, = struct.unpack('!Q', self._read_written_by(8, sentinel))
+            res = self._read_written_by(size, sentinel)
+            self._sem.release()
+        finally:
+            self._rlock.release()
+        return ForkingPickler.loads(res)
+
+    def _read_written_by(self, nbytes: int, sentinel: int) -> bytearray:
+        buf = bytearray(nbytes)
+        view = memoryview(buf)
+        position = 0
+        while position < nbytes:
+            # Reading only blocks if nothing is available, thus wait for the writer or its end
+            if not self._reader.poll() and self._reader not in connection.wait([self._reader, sentinel]):
+                raise EOFError(f"The writer of the queue ended after {position} of {nbytes} bytes of a record.")
+            n = os.readv(self._reader.fileno(), [view[position:]])
+            if n == 0:
+                raise EOFError(f"The queue has been closed after {position} of {nbytes} bytes of a record.")
+            position += n
+        return buf
+
+    def _count(self, counter: str, n: int = 1):
+        with self._counters.get_lock():
+            self._counters[self.COUNTERS.index(counter)] += n
+
+    def _dropped(self, obj):
+        if self.on_drop is not None:
+            self.on_drop(obj)
+
+    def put(self, obj, block=True, timeout=None):
+        try:
+            return super().put(obj, block=False)
+        except queue.Full:
+            pass
+
+        if self.policy == self.BLOCK or self._is_kept(obj):
+            if not block:
+                raise queue.Full
+            self._count('blocked')
+            return super().put(obj, True, timeout)
+        elif self.policy == self.RAISE:
+            self._count('raised')
+            raise queue.Full
+        elif self.policy == self.DROP_NEWEST:
+            self._count('dropped_newest')
+            self._dropped(obj)
+        elif self.policy == self.DROP_OLDEST:
+            self._put_dropping_oldest(obj)
+        elif self.policy == self.COALESCE:
+            self._put_coalescing(obj)
+
+    def _take(self):
+        """
+        Removes the oldest record. Waits a moment, since records may still be in the buffer of the feeder thread.
+        """
+        try:
+            return self.get(timeout=0.1)
+        except queue.Empty:
+            # Taken by the consumer in the meantime
+            return None
+
+    def _put_dropping_oldest(self, obj):
+        # Number of records taken and put again (see _is_kept), if it reaches maxsize the queue holds only such records
+        kept = 0
+        while True:
+            try:
+                return super().put(obj, block=False)
+            except queue.Full:
+                if kept >= self._maxsize:
+                    if self._is_kept(obj):
+                        self._count('blocked')
+                        return super().put(obj)
+                    self._count('dropped_newest')
+                    return self._dropped(obj)
+                oldest = self._take()
+                if oldest is None:
+                    continue
+                if self._is_kept(oldest):
+                    # Never dropped, put again behind the records that were waiting after it
+                    super().put(oldest)
+                    kept += 1
+                else:
+                    self._count('dropped_oldest')
+                    self._dropped(oldest)
+
+    def _put_coalescing(self, obj):
+        # Take all waiting records (the full queue contains maxsize records, unless the consumer took some of them in
+        # the meantime) and keep only the latest record of every function
+        records = []
+        while len(records) < self._maxsize and (record := self._take()) is not None:
+            records.append(record)
+        records.append(obj)
+
+        latest = {}
+        for i, record in enumerate(records):
+            key = self._coalesce_key(record)
+            if key is not None:
+                latest[key] = i
+        kept = []
+        for i, record in enumerate(records):
+            key = self._coalesce_key(record)
+            if key is None or latest[key] == i:
+                kept.append(record)
+            else:
+                self._count('coalesced')
+                self._dropped(record)
+
+        for record in kept:
+            try:
+                super().put(record, block=False)
+            except queue.Full:
+                # Nothing could be coalesced or other producers filled the queue in the meantime
+                self._put_dropping_oldest(record)
+
+    @staticmethod
+    def _is_kept(obj) -> bool:
+        if isinstance(obj, list):
+            return any(CQueue._is_kept(record) for record in obj)
+        if isinstance(obj, CStreamNotification):
+            return True
+        return isinstance(obj, (mpPy6.CResultRecord, mpPy6.CException)) and obj.cmd_id is not None
+
+    @staticmethod
+    def _coalesce_key(obj):
+        # Records taken from the queue carry ids instead of names (see the compact wire format of the records)
+        if isinstance(obj, mpPy6.CCommandRecord):
+            return 'cmd', obj.func_id if obj.func_id is not None else obj.func_name, obj.signal_name
+        if isinstance(obj, mpPy6.CResultRecord) and obj.cmd_id is None:
+            return ('result', obj.func_id if obj.func_id is not None else obj.function_name,
+                    obj.signal_id if obj.signal_id is not None else obj.signal_name)
+        # Answers, batches, exceptions and log records are never coalesced
+        return None
+
+
+class _COwnedLock:
+    """
+        Lock shared between processes, that records the pid of the process holding it.
+    """
+
+    def __init__(self, ctx):
+        self._lock = ctx.Lock()
+        self._owner = ctx.RawValue('q', 0)
+
+    def acquire(self, block: bool = True, timeout: float = None) -> bool:
+        if not self._lock.acquire(block, timeout):
+            return False
+        self._owner.value = os.getpid()
+        return True
+
+    def release(self):
+        self._owner.value = 0
+        self._lock.release()
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *args):
+        self.release()
+
+    def release_if_owned_by(self, pid: int) -> bool:
+        if self._owner.value != pid:
+            return False
+        self.release()
+        return True
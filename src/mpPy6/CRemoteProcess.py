@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from multiprocessing import connection
+
+from mpPy6.CProcess import CProcess
+
+
+class CRemoteProcess(CProcess):
+    """
+        Local stand-in of a child hosted by a CAgent on another machine. It is attached to the queues of the control
+        class like a child, forwards the commands to the agent and puts the results and log records of the remote
+        child into the state_queue and log_queue. Thus the control class handles remote children like local ones, and
+        the end of the remote child (or of the connection) ends this process (see restart_children).
+    """
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args,
+                 address=None, authkey: bytes = None, child_class: type = None, child_args: tuple = (),
+                 child_kwargs: dict = None, **kwargs):
+        """
+        :param address: Address of the agent, (host, port) or the path of a Unix socket.
+        :param authkey: Key of the agent.
+        :param child_class: Class of the child, importable by the agent.
+        :param child_args: Additional arguments of the child.
+        """
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+        self.address = address
+        self.authkey = authkey
+        self.child_class = child_class
+        self.child_args = child_args
+        self.child_kwargs = child_kwargs or {}
+        self._remote_exitcode: int = None
+        # Commands sent to the agent and commands taken by the remote command loop (acknowledged by the agent)
+        self._forwarded, self._acknowledged = 0, 0
+        # Options passed to the remote child, the queues are created by the agent
+        self._child_options = {'internal_log': self._internal_log_enabled_,
+                               'internal_log_level': self._internal_log_level_,
+                               'log_file': self.log_file,
+                               'worker_index': self.worker_index,
+                               'result_batch_interval': self.result_batch_interval,
+                               'result_batch_size': self.result_batch_size,
+                               'log_ring_size': self.log_ring_size,
+                               'standby': not self._active,
+                               'lanes': len(self.priority_queues),
+                               'cmd_lane': self.priority_queues.index(self.cmd_queue)}
+
+    def run(self):
+        self.name = f"{os.getpid()}({self.name})"
+        self._wakeup_reader, self._wakeup_writer = multiprocessing.Pipe(duplex=False)
+        self.logger_handler = self._create_log_handler()
+        self._module_logger = self.create_new_logger(f"(cmp) {self.name}",
+                                                     logger_handler=self.logger_handler,
+                                                     enabled=self._internal_log_enabled_,
+                                                     level=self._internal_log_level_,
+                                                     propagate=True)
+
+        try:
+            conn = connection.Client(self.address, authkey=self.authkey)
+        except Exception as e:
+            self._module_logger.error(f"Cannot connect to agent {self.address}: {e}")
+            self.logger_handler.flush()
+            sys.exit(1)
+        child_path = f"{self.child_class.__module__}:{self.child_class.__qualname__}"
+        # The agent refuses a child class, whose command table differs (e.g. another version of the code)
+        conn.send(('start', child_path, self.child_args, self.child_kwargs, self._child_options,
+                   self.child_class.command_table()))
+        self._module_logger.debug(f"Started {child_path} on agent {self.address}.")
+
+        receiver = threading.Thread(target=self._receive, args=(conn,), daemon=True)
+        receiver.start()
+        try:
+            self._forward_commands(conn)
+        finally:
+            self.logger_handler.flush()
+        if self._remote_exitcode is None:
+            # Stopped by the control class, the remaining records are received until the remote child ended
+            try:
+                conn.send(('stop',))
+            except OSError:
+                pass
+            receiver.join(timeout=10)
+        conn.close()
+        self.logger_handler.flush()
+        if self._kill_flag.value and self._remote_exitcode:
+            # Ended unexpectedly, reported like the end of a local child
+            sys.exit(self._remote_exitcode)
+
+    def _forward_commands(self, conn: connection.Connection):
+        """
+        Sends the commands to the agent, together with their lane (the index of the priority queue, -1 for the
+        control_queue), thus the remote child executes them in the same order as a local child.
+
+        The commands of the control_queue are sent immediately. A command of the (possibly shared) priority queues is
+        only taken, if the remote command loop has taken all commands sent before, i.e. when a local child would take
+        it. Thus the workers of a pool share the commands like local workers, and the bound of the command queues
+        applies.
+
+        The deadline of a command is sent as the time remaining (the clocks of the machines may differ), the agent
+        turns it into a deadline again when it receives the command.
+        """
+        parent = multiprocessing.parent_process()
+        sentinels = [parent.sentinel] if parent is not None else []
+        while self._kill_flag.value and self._remote_exitcode is None:
+            lanes = [(-1, self.control_queue)]
+            # A standby child only takes the commands of its control_queue (until it is activated)
+            if self._active and self._acknowledged >= self._forwarded:
+                lanes += list(enumerate(self.priority_queues))
+            ready = connection.wait([q._reader for _, q in lanes] + [self._wakeup_reader] + sentinels)
+            if self._wakeup_reader in ready:
+                while self._wakeup_reader.poll():
+                    self._wakeup_reader.recv_bytes()
+                self.logger_handler.flush()
+            if parent is not None and parent.sentinel in ready:
+                self._module_logger.error(f"Parent process {parent.pid} died. Terminating Process {os.getpid()}")
+                return
+            for lane, q in lanes:
+                if lane >= 0 and self._acknowledged < self._forwarded:
+                    # Waiting for the remote command loop
+                    break
+                while True:
+                    try:
+                        cmd = q.get(block=False)
+                    except queue.Empty:
+                        break
+                    if cmd is None:
+                        continue
+                    timeout = cmd.deadline - time.time() if cmd.deadline is not None else None
+                    conn.send(('cmd', lane, cmd, timeout))
+                    self._forwarded += 1
+                    if cmd.func_name == 'activate':
+                        self._active = True
+                        break
+                    if lane >= 0:
+                        break
+
+    def _receive(self, conn: connection.Connection):
+        while True:
+            try:
+                kind, record = conn.recv()
+            except (EOFError, OSError):
+                # Connection lost
+                self._remote_exitcode = -1 if self._remote_exitcode is None else self._remote_exitcode
+                break
+            if kind == 'exit':
+                self._remote_exitcode = record
+                break
+            if kind == 'ack':
+                self._acknowledged += record
+                self._wakeup()
+                continue
+            (self.state_queue if kind == 'state' else self.log_queue).put(record)
+        self._wakeup()
@@ -0,0 +1,107 @@
+import collections
+import pickle
+import threading
+import time
+
+
+class CResultCache:
+    """
+        Results of a function by its arguments, evicted least recently used (if max_entries or max_bytes is exceeded)
+        or after ttl seconds. Used by the control class for functions registered with cache=True (see
+        CProcessControl.register_function).
+    """
+
+    def __init__(self, max_entries: int = 128, ttl: float = None, max_bytes: int = None):
+        """
+        :param max_entries: Maximum number of results. None does not limit the number.
+        :param ttl: Time to live of a result in seconds. None keeps results until they are evicted.
+        :param max_bytes: Maximum size of all results in bytes (see size_of). Larger results are not cached.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # key -> (value, time stored, size in bytes), ordered from least to most recently used
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(args: tuple, kwargs: dict):
+        """
+        :return: Hashable key of the arguments, or None if an argument is not hashable (e.g. a NumPy array).
+        """
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else (args,)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @staticmethod
+    def size_of(value) -> int:
+        """
+        Size of a result in bytes: the size of the buffer of NumPy arrays and bytes-like objects, otherwise the size of
+        the pickled result.
+        """
+        if hasattr(value, 'nbytes'):
+            return int(value.nbytes)
+        if isinstance(value, (bytes, bytearray)):
+            return len(value)
+        if isinstance(value, memoryview):
+            return value.nbytes
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return 0
+
+    def get(self, key) -> tuple[bool, object]:
+        """
+        :return: (True, value) if a valid result is cached, otherwise (False, None).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry[1] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return True, entry[0]
+
+    def put(self, key, value):
+        size = self.size_of(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.time(), size)
+            self._bytes += size
+            while ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+                   (self.max_bytes is not None and self._bytes > self.max_bytes)):
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key=None):
+        """
+        Removes the result of key, or all results if key is None.
+        """
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def _remove(self, key):
+        self._bytes -= self._entries.pop(key)[2]
+
+    def statistics(self) -> dict:
+        """
+        :return: {'entries', 'bytes', 'hits', 'misses'}
+        """
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._bytes, 'hits': self._hits, 'misses': self._misses}
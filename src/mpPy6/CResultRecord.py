@@ -1,26 +1,75 @@
 import logging
+import time
+from typing import TYPE_CHECKING
 
-from mpPy6 import CProcessControl as CProcessControl
+if TYPE_CHECKING:
+    from mpPy6.CProcessControlCore import CProcessControlCore
 
 
 class CResultRecord:
+    __slots__ = ('function_name', 'signal_name', 'result', 'cmd_id', 'func_id', 'signal_id',
+                 't_sent', 't_received', 't_started', 't_finished')
 
-    def __init__(self, function_name: str, signal_name: str, result):
+    def __init__(self, function_name: str, signal_name: str, result, cmd_id: int = None):
         self.function_name: str = function_name
         self.signal_name: str = signal_name
         self.result = result
+        # Id of the command (CCommandRecord.cmd_id) this record answers
+        self.cmd_id: int = cmd_id
+        # Indices of the function in CProcess.command_table() and of the signal in CProcess.signal_table(). If set, the
+        # record is sent with the ids instead of the names (see resolve_names).
+        self.func_id: int = None
+        self.signal_id: int = None
 
-    def emit_signal(self, class_object: CProcessControl):
+        # Timestamps (time.time()) of the answered command (see CCommandRecord) and of the creation of this record
+        self.t_sent: float = None
+        self.t_received: float = None
+        self.t_started: float = None
+        self.t_finished: float = time.time()
+
+    def __getstate__(self):
+        # Compact wire format: a tuple instead of a dict of attribute names, names are replaced by their ids if known
+        function = self.func_id if self.func_id is not None else self.function_name
+        signal = self.signal_id if self.signal_id is not None else self.signal_name
+        return (function, signal, self.result, self.cmd_id,
+                self.t_sent, self.t_received, self.t_started, self.t_finished)
+
+    def __setstate__(self, state):
+        (function, signal, self.result, self.cmd_id,
+         self.t_sent, self.t_received, self.t_started, self.t_finished) = state
+        if isinstance(function, int):
+            self.func_id, self.function_name = function, None
+        else:
+            self.func_id, self.function_name = None, function
+        if isinstance(signal, int):
+            self.signal_id, self.signal_name = signal, None
+        else:
+            self.signal_id, self.signal_name = None, signal
+
+    def resolve_names(self, command_table: tuple[str, ...], signal_table: tuple[str, ...]):
+        """
+        Restores the names, that have been sent as ids (see __getstate__).
+        :param command_table: CProcess.command_table() of the child class.
+        :param signal_table: CProcess.signal_table() of the child class.
+        """
+        if self.function_name is None:
+            self.function_name = command_table[self.func_id]
+        if self.signal_name is None and self.signal_id is not None:
+            self.signal_name = signal_table[self.signal_id]
+
+    def emit_signal(self, class_object: 'CProcessControlCore'):
         if hasattr(class_object, '_module_logger'):
             logger: logging.Logger =  class_object._module_logger
         else:
             logger = logging.getLogger(f"{__name__} - fallback")
 
+        debug = logger.isEnabledFor(logging.DEBUG)
         if self.signal_name is None:
-            logger.debug(f"Function {self.function_name} returned {self.result}. "
+            if debug:
+                logger.debug(f"Function {self.function_name} returned {self.result}. "
                                                f"No signal to emit.")
             return
-        if hasattr(class_object, '_module_logger'):
+        if debug:
             logger.debug(f"Function {self.function_name} returned {self.result}. "
                                                f"Emitting {self} in {class_object.__class__.__name__}.")
         emitter = getattr(class_object, self.signal_name).emit
@@ -0,0 +1,220 @@
+import os
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+
+def _numpy():
+    # numpy is optional, arrays can only be sent if it has already been imported by the user
+    return sys.modules.get('numpy', None)
+
+
+def _untrack(shm: SharedMemory):
+    """
+        The process creating a segment hands its ownership over to the receiver, which unlinks it after attaching.
+        Thus, the creating process must not register the segment with its resource tracker (it would try to unlink it
+        again at exit and complain about a leaked segment).
+    """
+    if os.name == 'posix':
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+
+
+class _CSharedMemory(SharedMemory):
+
+    def __del__(self):
+        try:
+            self.close()
+        except BufferError:
+            # Still referenced by a view, the mapping is released together with the last view
+            pass
+
+
+class CSharedBuffer:
+    """
+        Handle of a buffer (NumPy array, bytes, bytearray or memoryview) that has been copied into a shared memory
+        segment. Only this handle is pickled and sent through the queues, the receiver attaches to the segment and
+        rebuilds the object.
+    """
+
+    def __init__(self, name: str, nbytes: int, kind: str, shape: tuple = None, dtype=None):
+        self.name: str = name
+        self.nbytes: int = nbytes
+        self.kind: str = kind
+        self.shape: tuple = shape
+        self.dtype = dtype
+
+    @staticmethod
+    def is_shareable(obj, threshold: int) -> bool:
+        np = _numpy()
+        if np is not None and isinstance(obj, np.ndarray):
+            return not obj.dtype.hasobject and obj.nbytes > 0 and obj.nbytes >= threshold
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            nbytes = memoryview(obj).nbytes
+            return nbytes > 0 and nbytes >= threshold
+        return False
+
+    @staticmethod
+    def export(obj, registry: 'CSharedMemoryRegistry' = None) -> 'CSharedBuffer':
+        """
+        Copies obj into a new shared memory segment and returns the handle of the segment.
+        :param obj: A NumPy array or an object supporting the buffer protocol.
+        :param registry: Registry that keeps the segment open, if the platform requires it (Windows).
+        :return: The handle to send instead of obj.
+        """
+        np = _numpy()
+        if np is not None and isinstance(obj, np.ndarray):
+            shm = SharedMemory(create=True, size=obj.nbytes)
+            dst = np.ndarray(obj.shape, dtype=obj.dtype, buffer=shm.buf)
+            dst[...] = obj
+            del dst
+            handle = CSharedBuffer(shm.name, obj.nbytes, 'ndarray', obj.shape, obj.dtype)
+        else:
+            mv = memoryview(obj)
+            if not mv.contiguous:
+                mv = memoryview(mv.tobytes())
+            shm = SharedMemory(create=True, size=mv.nbytes)
+            shm.buf[:mv.nbytes] = mv.cast('B')
+            kind = 'memoryview' if isinstance(obj, memoryview) else type(obj).__name__
+            handle = CSharedBuffer(shm.name, mv.nbytes, kind)
+        _untrack(shm)
+        if os.name == 'nt' and registry is not None:
+            # Windows destroys the segment as soon as the last handle is closed, thus keep it open until the receiver
+            # had the chance to attach.
+            registry.keep_alive(shm)
+        else:
+            shm.close()
+        return handle
+
+    def attach(self, registry: 'CSharedMemoryRegistry'):
+        """
+        Attaches to the segment and rebuilds the object. NumPy arrays and memoryviews are zero-copy views of the
+        segment, which is kept open by the registry until the last view has been deleted. bytes and bytearrays are
+        copied out of the segment, since they can not reference foreign memory.
+        :param registry: The registry of the receiving process.
+        :return: The rebuilt object.
+        """
+        shm = _CSharedMemory(name=self.name)
+        shm.unlink()
+        if self.kind == 'ndarray':
+            # frombuffer holds a view of the buffer, which keeps the mapping from being closed (np.ndarray does not)
+            np = _numpy()
+            obj = np.frombuffer(shm.buf, dtype=self.dtype, count=self.nbytes // np.dtype(self.dtype).itemsize)
+            obj = obj.reshape(self.shape)
+        elif self.kind == 'memoryview':
+            obj = shm.buf[:self.nbytes].toreadonly()
+        elif self.kind == 'bytearray':
+            obj = bytearray(shm.buf[:self.nbytes])
+        else:
+            obj = bytes(shm.buf[:self.nbytes])
+        registry.register(shm)
+        return obj
+
+    def release(self):
+        """
+        Removes the segment without attaching to it, e.g. if the record carrying this handle is dropped.
+        """
+        try:
+            shm = SharedMemory(name=self.name)
+            shm.unlink()
+            shm.close()
+        except FileNotFoundError:
+            pass
+
+    def __repr__(self):
+        if self.kind == 'ndarray':
+            return f"CSharedBuffer({self.name}, ndarray{self.shape} {self.dtype})"
+        return f"CSharedBuffer({self.name}, {self.kind}[{self.nbytes}])"
+
+
+class CSharedMemoryRegistry:
+    """
+        Keeps the shared memory segments of a process open as long as they are referenced by rebuilt objects.
+        sweep() has to be called regularly to close the segments that are not referenced anymore.
+        The registry may be used from several threads (e.g. concurrent commands of a child).
+    """
+
+    def __init__(self, keep_alive_time: float = 10):
+        self._segments: list[SharedMemory] = []
+        self._kept_alive: list[tuple[float, SharedMemory]] = []
+        self.keep_alive_time = keep_alive_time
+        self._lock = threading.RLock()
+
+    def register(self, shm: SharedMemory):
+        with self._lock:
+            self._segments.append(shm)
+            self.sweep()
+
+    def keep_alive(self, shm: SharedMemory):
+        with self._lock:
+            self._kept_alive.append((time.time() + self.keep_alive_time, shm))
+            self.sweep()
+
+    def sweep(self):
+        with self._lock:
+            alive = []
+            for shm in self._segments:
+                try:
+                    # Fails as long as a view of the segment exists
+                    shm.close()
+                except BufferError:
+                    alive.append(shm)
+            self._segments = alive
+
+            now = time.time()
+            while self._kept_alive and self._kept_alive[0][0] < now:
+                self._kept_alive.pop(0)[1].close()
+
+    def __len__(self):
+        return len(self._segments) + len(self._kept_alive)
+
+
+def to_shared_memory(obj, threshold: int, registry: CSharedMemoryRegistry = None):
+    """
+    Replaces obj (or the elements of a tuple or the values of a dict) by shared memory handles, if it is a buffer of at
+    least threshold bytes.
+    :param obj: The object to send.
+    :param threshold: Minimum size in bytes. If None, obj is returned unchanged.
+    :param registry: See CSharedBuffer.export.
+    :return: obj, a handle or a tuple/dict containing handles.
+    """
+    if threshold is None:
+        return obj
+    if isinstance(obj, tuple):
+        return tuple(CSharedBuffer.export(o, registry) if CSharedBuffer.is_shareable(o, threshold) else o
+                     for o in obj)
+    if isinstance(obj, dict):
+        return {k: CSharedBuffer.export(o, registry) if CSharedBuffer.is_shareable(o, threshold) else o
+                for k, o in obj.items()}
+    if CSharedBuffer.is_shareable(obj, threshold):
+        return CSharedBuffer.export(obj, registry)
+    return obj
+
+
+def from_shared_memory(obj, registry: CSharedMemoryRegistry):
+    """
+    Inverse of to_shared_memory: attaches to all handles in obj (or the elements of a tuple or values of a dict).
+    """
+    if isinstance(obj, CSharedBuffer):
+        return obj.attach(registry)
+    if isinstance(obj, tuple) and any(isinstance(o, CSharedBuffer) for o in obj):
+        return tuple(o.attach(registry) if isinstance(o, CSharedBuffer) else o for o in obj)
+    if isinstance(obj, dict) and any(isinstance(o, CSharedBuffer) for o in obj.values()):
+        return {k: o.attach(registry) if isinstance(o, CSharedBuffer) else o for k, o in obj.items()}
+    return obj
+
+
+def release_shared_memory(obj):
+    """
+    Removes all segments referenced by obj (or the elements of a tuple or values of a dict) without attaching to them.
+    """
+    if isinstance(obj, CSharedBuffer):
+        obj.release()
+    elif isinstance(obj, (tuple, dict)):
+        for o in (obj.values() if isinstance(obj, dict) else obj):
+            if isinstance(o, CSharedBuffer):
+                o.release()
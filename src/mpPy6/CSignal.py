@@ -0,0 +1,76 @@
+import logging
+import threading
+
+
+class CSignal:
+    """
+        Signal of CProcessControlCore, used like a Qt Signal without Qt: declared as class attribute, connected to
+        plain callables and emitted with the arguments. The connected slots are called by the emitting thread (the
+        monitor thread of the control class), slots of a GUI or an event loop have to hand the call over themselves
+        (e.g. loop.call_soon_threadsafe).
+    """
+
+    def __init__(self, *types, name: str = None):
+        """
+        :param types: Types of the arguments (informative only).
+        :param name: Name of the signal, defaults to the name of the class attribute.
+        """
+        self.types = types
+        self.name = name
+
+    def __set_name__(self, owner, name):
+        if self.name is None:
+            self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        # Every instance has its own connections
+        bound = instance.__dict__.get(self._attribute())
+        if bound is None:
+            bound = instance.__dict__.setdefault(self._attribute(), CBoundSignal(self.name))
+        return bound
+
+    def _attribute(self) -> str:
+        return f'_signal_{self.name}'
+
+    def __str__(self):
+        return f"{self.name}({', '.join(getattr(t, '__name__', str(t)) for t in self.types)})"
+
+
+class CBoundSignal:
+    """
+        Signal of one instance, see CSignal.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # Replaced (not modified) on changes, thus emit does not need the lock
+        self._slots: tuple = ()
+        self._lock = threading.Lock()
+
+    def connect(self, slot: callable):
+        with self._lock:
+            self._slots = self._slots + (slot,)
+
+    def disconnect(self, slot: callable = None):
+        """
+        Disconnects slot, or all slots if None.
+        """
+        with self._lock:
+            if slot is None:
+                self._slots = ()
+            elif slot not in self._slots:
+                raise RuntimeError(f"{slot} is not connected to {self.name}.")
+            else:
+                slots = list(self._slots)
+                slots.remove(slot)
+                self._slots = tuple(slots)
+
+    def emit(self, *args):
+        for slot in self._slots:
+            try:
+                slot(*args)
+            except Exception as e:
+                # Like Qt, an exception of a slot does not prevent calling the other slots
+                logging.getLogger(__name__).error(f"Error in slot {slot} of signal {self.name}: {e}")
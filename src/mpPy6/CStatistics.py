@@ -0,0 +1,83 @@
+import bisect
+import collections
+import threading
+
+
+class CStatistics:
+    """
+        Aggregates durations (seconds) per function name and stage. For every series, the number of samples, the mean
+        and maximum, a histogram of all samples and percentiles of the latest samples are available.
+    """
+    # Time the command waited in the cmd_queue (sent by the control class until taken by the child)
+    QUEUE_WAIT = 'queue_wait'
+    # Execution of the function in the child (without waiting for a thread of the concurrent executor)
+    EXECUTION = 'execution'
+    # Time the result waited in the state_queue (including batching) until its signal is emitted
+    RESULT_WAIT = 'result_wait'
+    # Emission of the signal (including directly connected slots)
+    EMIT = 'emit'
+    # Call of the registered function until its signal has been emitted
+    TOTAL = 'total'
+
+    STAGES = (QUEUE_WAIT, EXECUTION, RESULT_WAIT, EMIT, TOTAL)
+    # Upper bounds of the histogram bins in seconds
+    HISTOGRAM_BINS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, float('inf'))
+    PERCENTILES = (50, 90, 99)
+
+    def __init__(self, samples: int = 1000):
+        """
+        :param samples: Number of latest samples per series used for the percentiles.
+        """
+        self.samples = samples
+        self._series: dict[str, dict[str, _CSeries]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, stage: str, duration: float):
+        if duration is None:
+            return
+        with self._lock:
+            stages = self._series.setdefault(name, {})
+            if stage not in stages:
+                stages[stage] = _CSeries(self.samples, len(self.HISTOGRAM_BINS))
+            stages[stage].add(duration, bisect.bisect_left(self.HISTOGRAM_BINS, duration))
+
+    def snapshot(self, name: str = None) -> dict:
+        """
+        :param name: Only return the statistics of this function.
+        :return: {function name: {stage: {'count', 'mean', 'max', 'p50', 'p90', 'p99', 'histogram'}}}. The histogram
+            maps the upper bounds of HISTOGRAM_BINS to the number of samples.
+        """
+        with self._lock:
+            names = [name] if name is not None else list(self._series)
+            return {n: {stage: series.summary(self.PERCENTILES, self.HISTOGRAM_BINS)
+                        for stage, series in self._series.get(n, {}).items()}
+                    for n in names}
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class _CSeries:
+
+    def __init__(self, samples: int, bins: int):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.latest = collections.deque(maxlen=samples)
+        self.histogram = [0] * bins
+
+    def add(self, duration: float, bin_index: int):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.latest.append(duration)
+        self.histogram[bin_index] += 1
+
+    def summary(self, percentiles: tuple, bins: tuple) -> dict:
+        latest = sorted(self.latest)
+        summary = {'count': self.count, 'mean': self.total / self.count, 'max': self.max}
+        for p in percentiles:
+            summary[f'p{p}'] = latest[min(len(latest) - 1, int(len(latest) * p / 100))]
+        summary['histogram'] = dict(zip(bins, self.histogram))
+        return summary
@@ -0,0 +1,204 @@
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+from mpPy6.CSharedMemory import _numpy
+
+
+class CStream:
+    """
+        Channel for high-rate data (e.g. frames of a camera) from one child to the control class: a ring of fixed-size
+        slots in a shared memory segment. The child (the only writer) copies every item into the next free slot, the
+        control class (the only reader) takes all available items at once. No queue and no pickling is involved, the
+        indices are plain integers in the segment, written by one side only (single producer, single consumer).
+
+        Only the first item after the reader has found the stream empty is announced (CStreamNotification), by the
+        signal on_stream_data of the control class. Thus the signals arrive at the rate the reader consumes the items
+        (e.g. the refresh rate of a plot), not at the rate they are produced. The control class also checks the streams
+        periodically, since the request for a notification may not be seen by the writer (see take_lost_notification).
+
+        Created by CProcessControlCore.create_stream, the child finds it in CProcess.streams.
+    """
+    # Indices of the counters in the header. Written by the writer: HEAD (items written) and DROPPED (items dropped),
+    # written by the reader: TAIL (items read). NOTIFY is set by the reader if it waits for a notification, and reset
+    # by the writer when sending it. The counters of each side are placed in their own cache line.
+    HEAD, DROPPED, TAIL, NOTIFY = 0, 1, 8, 9
+    _HEADER_BYTES = 128
+    _ALIGNMENT = 64
+
+    def __init__(self, name: str, slot_size: int, slots: int = 16, dtype=None, shape: tuple = None,
+                 drop_if_slow: bool = False, poll_interval: float = 0.0005, _shm_name: str = None):
+        """
+        :param name: Name of the stream, used by the child to find it and sent with on_stream_data.
+        :param slot_size: Maximum size of an item in bytes.
+        :param slots: Number of items the stream can hold.
+        :param dtype: NumPy dtype of the items, read returns arrays of this dtype (with the given shape) instead of
+            bytes.
+        :param shape: Shape of the items read (only with dtype), e.g. the shape of a frame.
+        :param drop_if_slow: If the stream is full, drop the written item instead of waiting for the reader.
+        :param poll_interval: Sleep time (seconds) of a writer waiting for a free slot.
+        """
+        if slot_size <= 0 or slots <= 0:
+            raise ValueError(f"Stream {name} needs a positive slot size and number of slots.")
+        self.name = name
+        self.slot_size = slot_size
+        self.slots = slots
+        self.dtype = dtype
+        self.shape = tuple(shape) if shape is not None else None
+        self.drop_if_slow = drop_if_slow
+        self.poll_interval = poll_interval
+        # Slots start at an aligned offset and have an aligned size, thus aligned items stay aligned
+        self._stride = -(-slot_size // self._ALIGNMENT) * self._ALIGNMENT
+        self._payload = -(-(self._HEADER_BYTES + 8 * slots) // self._ALIGNMENT) * self._ALIGNMENT
+        self._owner = _shm_name is None
+        if self._owner:
+            self._shm = SharedMemory(create=True, size=self._payload + self._stride * slots)
+        else:
+            # Registered again with the resource tracker, which is shared with the creator and already knows the
+            # segment. Only the creator unlinks it.
+            self._shm = SharedMemory(name=_shm_name)
+        self._index = self._shm.buf[:self._payload].cast('Q')
+        if self._owner:
+            self._index[self.NOTIFY] = 1
+        # Called with the name of the stream by the writer, if the reader waits for a notification (see CProcess)
+        self._notify: callable = None
+
+    def __getstate__(self):
+        # Sent to the child: it attaches to the segment by its name
+        return (self.name, self.slot_size, self.slots, self.dtype, self.shape, self.drop_if_slow, self.poll_interval,
+                self._shm.name)
+
+    def __setstate__(self, state):
+        name, slot_size, slots, dtype, shape, drop_if_slow, poll_interval, shm_name = state
+        self.__init__(name, slot_size, slots, dtype, shape, drop_if_slow, poll_interval, _shm_name=shm_name)
+
+    def __len__(self):
+        """
+        Number of items written and not read yet.
+        """
+        return self._index[self.HEAD] - self._index[self.TAIL]
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of items dropped by the writer, since the stream was full (drop_if_slow).
+        """
+        return self._index[self.DROPPED]
+
+    def write(self, data, timeout: float = None) -> bool:
+        """
+        Copies data into the next slot. Called by the child.
+        :param data: A NumPy array or an object supporting the buffer protocol, with at most slot_size bytes.
+        :param timeout: Maximum time (seconds) to wait for a free slot if the stream is full, None waits until the
+            reader took an item. Not used with drop_if_slow.
+        :return: False if the item has been dropped or the timeout expired.
+        """
+        mv = memoryview(data)
+        if not mv.contiguous:
+            mv = memoryview(mv.tobytes())
+        mv = mv.cast('B')
+        if mv.nbytes > self.slot_size:
+            raise ValueError(f"Item of {mv.nbytes} bytes exceeds the slot size {self.slot_size} of stream {self.name}.")
+        index = self._index
+        head = index[self.HEAD]
+        if head - index[self.TAIL] >= self.slots:
+            if self.drop_if_slow:
+                index[self.DROPPED] += 1
+                return False
+            t_end = None if timeout is None else time.monotonic() + timeout
+            while head - index[self.TAIL] >= self.slots:
+                if t_end is not None and time.monotonic() >= t_end:
+                    return False
+                time.sleep(self.poll_interval)
+        slot = head % self.slots
+        offset = self._payload + slot * self._stride
+        self._shm.buf[offset:offset + mv.nbytes] = mv
+        index[self._HEADER_BYTES // 8 + slot] = mv.nbytes
+        # Publishing the item: the reader does not touch the slot before HEAD has been advanced
+        index[self.HEAD] = head + 1
+        if index[self.NOTIFY]:
+            index[self.NOTIFY] = 0
+            if self._notify is not None:
+                self._notify(self.name)
+        return True
+
+    def read(self, max_items: int = None) -> list:
+        """
+        Takes all available items (at most max_items) out of the stream. Called by the control class, typically in the
+        slot of on_stream_data. If the stream has been emptied, the next written item is announced again.
+        :return: The items as bytes, or NumPy arrays if the stream has a dtype.
+        """
+        index = self._index
+        items = []
+        while True:
+            tail = index[self.TAIL]
+            available = index[self.HEAD] - tail
+            if max_items is not None:
+                available = min(available, max_items - len(items))
+            for i in range(available):
+                slot = (tail + i) % self.slots
+                offset = self._payload + slot * self._stride
+                items.append(self._decode(self._shm.buf[offset:offset + index[self._HEADER_BYTES // 8 + slot]]))
+            # Releasing the slots to the writer
+            index[self.TAIL] = tail + available
+            if max_items is not None and len(items) >= max_items:
+                return items
+            index[self.NOTIFY] = 1
+            if index[self.HEAD] == tail + available or not index[self.NOTIFY]:
+                # Empty, or the writer has already taken the request for a notification
+                return items
+            # Written after the check above, maybe before NOTIFY was set (thus not announced): read it now
+
+    def take_lost_notification(self) -> bool:
+        """
+        Takes the request for a notification like the writer, if items are available although the reader still waits
+        for a notification. Called periodically by the control class: the writer may not have seen the request, as
+        the stores of the reader (NOTIFY) and of the writer (HEAD) are not ordered against the following loads of the
+        other side. A duplicate notification does no harm, the reader finds the stream empty.
+        :return: True if the items have to be announced.
+        """
+        index = self._index
+        if index[self.NOTIFY] and index[self.HEAD] != index[self.TAIL]:
+            index[self.NOTIFY] = 0
+            return True
+        return False
+
+    def _decode(self, view: memoryview):
+        try:
+            if self.dtype is None:
+                return bytes(view)
+            item = _numpy().frombuffer(view, dtype=self.dtype).copy()
+            return item.reshape(self.shape) if self.shape is not None else item
+        finally:
+            view.release()
+
+    def close(self):
+        """
+        Closes the mapping of the segment, the creator also removes the segment.
+        """
+        self._index.release()
+        self._shm.close()
+        if self._owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class CStreamNotification:
+    """
+        Record sent by the writer of a stream via the state queue, if the reader waits for a notification. The control
+        class emits on_stream_data with the name of the stream.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name: str = name
+
+    def __getstate__(self):
+        return self.name
+
+    def __setstate__(self, state):
+        self.name = state
+
+    def __repr__(self):
+        return f"CStreamNotification <{self.name}>"
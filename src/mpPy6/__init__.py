@@ -1,14 +1,53 @@
+import importlib
 import os
 import sys
+import types
 
 from .CCommandRecord import CCommandRecord
-from .CException import CException
+from .CException import CException, CTimeoutException
+from .CFuture import CFuture
 from .CProcess import CProcess
-from .CProcessControl import CProcessControl
+from .CPropertyStore import CPropertyStore
+from .CQueue import CQueue
 from .CResultRecord import CResultRecord
+from .CSharedMemory import CSharedBuffer
+from .CSignal import CSignal
+from .CStream import CStream
 
 from .CProperty import CProperty
 
-from PySide6.QtCore import Signal
-
 sys.path.append(os.path.join(os.path.dirname(__file__), '../'))
+
+# Imported on first access (PEP 562), thus the children do not import Qt
+_LAZY_IMPORTS = {
+    'CAgent': ('mpPy6.CAgent', 'CAgent'),
+    'CProcessControl': ('mpPy6.CProcessControl', 'CProcessControl'),
+    'CProcessControlCore': ('mpPy6.CProcessControlCore', 'CProcessControlCore'),
+    'Signal': ('PySide6.QtCore', 'Signal'),
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_IMPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = _LAZY_IMPORTS[name]
+    value = getattr(importlib.import_module(module_name), attribute)
+    globals()[name] = value
+    return value
+
+
+class _CPackage(types.ModuleType):
+
+    def __setattr__(self, name, value):
+        # Importing the submodule (e.g. "import mpPy6.CProcessControl") binds it to its name in the package, which
+        # would hide the class of the same name
+        if isinstance(value, types.ModuleType) and value.__name__ == _LAZY_IMPORTS.get(name, (None,))[0]:
+            value = getattr(value, _LAZY_IMPORTS[name][1])
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _CPackage
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_IMPORTS))
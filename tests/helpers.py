@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import unittest
+
+# Shared by the tests: Qt without a display and mpPy6 from the source tree
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+TESTS = os.path.dirname(os.path.abspath(__file__))
+SRC = os.path.join(TESTS, '../src')
+sys.path.append(SRC)
+
+
+def wait_for(predicate, timeout: float = 10):
+    """
+    Processes the Qt events until predicate() is true or the timeout has expired.
+    :return: The last value of predicate().
+    """
+    # Imported on demand, since the agent (see test_remote) imports the test modules without Qt
+    from PySide6.QtWidgets import QApplication
+    t_end = time.time() + timeout
+    while not predicate() and time.time() < t_end:
+        QApplication.processEvents()
+        time.sleep(0.01)
+    return predicate()
+
+
+def shut_down(control, timeout: float = 5):
+    """
+    Stops the children of the control class and waits for them (also for the standby children).
+    """
+    control.safe_exit(reason="Test finished.")
+    for child in control.children + control._standby_children:
+        child.join(timeout=timeout)
+
+
+class ControlTestCase(unittest.TestCase):
+    """
+    Base of the tests of a control class. Every test gets the control class of make_control as self.control, or
+    assigns it itself if make_control returns None. It is shut down after the test.
+    """
+    # The QApplication is only created for the tests of the Qt control classes
+    qt = True
+    # Maximum time (seconds) to wait for each child after the test
+    join_timeout = 5
+
+    @classmethod
+    def setUpClass(cls):
+        if cls.qt:
+            from PySide6.QtWidgets import QApplication
+            cls.app = QApplication.instance() or QApplication(sys.argv)
+
+    def setUp(self):
+        self.control = self.make_control()
+
+    def make_control(self):
+        """
+        :return: The control class used by every test, None if the tests create it themselves.
+        """
+        return None
+
+    def tearDown(self):
+        if self.control is not None:
+            shut_down(self.control, self.join_timeout)
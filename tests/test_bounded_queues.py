@@ -0,0 +1,186 @@
+import concurrent.futures
+import multiprocessing
+import os
+import queue
+import struct
+import time
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+
+
+def result(function_name: str, value):
+    return mpPy6.CResultRecord(function_name, None, value)
+
+
+def drain(q: mpPy6.CQueue) -> list:
+    records = []
+    while True:
+        try:
+            records.append(q.get(timeout=0.2))
+        except queue.Empty:
+            return records
+
+
+class TestCQueue(unittest.TestCase):
+
+    def test_drop_newest(self):
+        dropped = []
+        q = mpPy6.CQueue(2, mpPy6.CQueue.DROP_NEWEST, on_drop=dropped.append)
+        for i in range(4):
+            q.put(i)
+        self.assertEqual(drain(q), [0, 1])
+        self.assertEqual(dropped, [2, 3])
+        self.assertEqual(q.statistics()['dropped_newest'], 2)
+
+    def test_drop_oldest(self):
+        q = mpPy6.CQueue(2, mpPy6.CQueue.DROP_OLDEST)
+        for i in range(4):
+            q.put(i)
+        self.assertEqual(drain(q), [2, 3])
+        self.assertEqual(q.statistics()['dropped_oldest'], 2)
+
+    def test_coalesce_keeps_latest_record_of_every_function(self):
+        q = mpPy6.CQueue(3, mpPy6.CQueue.COALESCE)
+        for record in [result('frame', 0), result('frame', 1), result('status', 'ok'), result('frame', 2)]:
+            q.put(record)
+        # Coalesced when the queue is full
+        self.assertEqual([(r.function_name, r.result) for r in drain(q)], [('status', 'ok'), ('frame', 2)])
+        self.assertEqual(q.statistics()['coalesced'], 2)
+
+    def test_raise(self):
+        q = mpPy6.CQueue(1, mpPy6.CQueue.RAISE)
+        q.put(0)
+        with self.assertRaises(queue.Full):
+            q.put(1)
+        self.assertEqual(q.statistics()['raised'], 1)
+
+    def test_block(self):
+        q = mpPy6.CQueue(1, mpPy6.CQueue.BLOCK)
+        q.put(0)
+        with self.assertRaises(queue.Full):
+            q.put(1, timeout=0.1)
+        self.assertEqual(q.statistics()['blocked'], 1)
+
+    def test_answers_are_never_dropped(self):
+        for policy in (mpPy6.CQueue.DROP_NEWEST, mpPy6.CQueue.DROP_OLDEST, mpPy6.CQueue.COALESCE):
+            q = mpPy6.CQueue(2, policy)
+            q.put(mpPy6.CResultRecord('echo', None, 'answer', cmd_id=1))
+            q.put([result('frame', 0), mpPy6.CResultRecord('echo', None, 'batched answer', cmd_id=2)])
+            for i in range(1, 4):
+                q.put(result('frame', i))
+            # The queue holds only answers: a new answer waits for the consumer
+            with self.assertRaises(queue.Full):
+                q.put(mpPy6.CResultRecord('echo', None, 'answer', cmd_id=3), timeout=0.1)
+            records = drain(q)
+            self.assertEqual(records[0].result, 'answer', policy)
+            self.assertEqual(records[1][1].result, 'batched answer', policy)
+            self.assertEqual(len(records), 2, policy)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            mpPy6.CQueue(1, 'drop_everything')
+
+    def test_release_locks_of_ended_process(self):
+        q = mpPy6.CQueue()
+        # A process that ends while sending a record (holding the write lock)
+        process = multiprocessing.Process(target=hold_lock_and_exit, args=(q,))
+        process.start()
+        process.join(timeout=10)
+        self.assertFalse(q._wlock.acquire(timeout=0.1))
+        self.assertEqual(q.release_locks_of(os.getpid()), [])
+        self.assertEqual(q.release_locks_of(process.pid), ['write'])
+        q.put(1)
+        self.assertEqual(drain(q), [1])
+
+    def test_incomplete_record_of_ended_writer(self):
+        q = mpPy6.CQueue()
+        process = multiprocessing.Process(target=write_incomplete_record_and_exit, args=(q,))
+        process.start()
+        self.assertTrue(wait_for(lambda: q._reader.poll()))
+        self.assertEqual(q.get_written_by(process.sentinel), 1)
+        self.assertTrue(wait_for(lambda: q._reader.poll()))
+        # Does not wait for the missing part of the record
+        t_start = time.time()
+        with self.assertRaises(EOFError):
+            q.get_written_by(process.sentinel)
+        self.assertLess(time.time() - t_start, 5)
+        process.join(timeout=10)
+        with self.assertRaises(queue.Empty):
+            q.get_written_by(process.sentinel)
+        # The incomplete record has been removed, the queue can be used again
+        q.put(2)
+        self.assertTrue(wait_for(lambda: q._reader.poll()))
+        self.assertEqual(q.get_written_by(process.sentinel), 2)
+
+
+def hold_lock_and_exit(q: mpPy6.CQueue):
+    q._wlock.acquire()
+    os._exit(3)
+
+
+def write_incomplete_record_and_exit(q: mpPy6.CQueue):
+    writer = os.dup(q._writer.fileno())
+    q.put(1)
+    q.close()
+    q.join_thread()
+    # The header of a record of 1 MB and its first bytes
+    os.write(writer, struct.pack('!i', 1_000_000) + bytes(100))
+    time.sleep(0.5)
+    os._exit(3)
+
+
+class BusyChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def process_frame(self, frame: int, duration: float = 0):
+        time.sleep(duration)
+        return frame
+
+
+class BusyChildProcessControl(mpPy6.CProcessControl):
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(BusyChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def process_frame(self, frame: int, duration: float = 0):
+        pass
+
+
+class TestBoundedCommandQueue(ControlTestCase):
+
+    def make_control(self):
+        return BusyChildProcessControl(cmd_queue_size=2, cmd_queue_policy=mpPy6.CQueue.DROP_OLDEST)
+
+    def test_dropped_commands_are_cancelled(self):
+        busy = self.control.process_frame(-1, 0.5)
+        time.sleep(0.2)
+        frames = [self.control.process_frame(i) for i in range(5)]
+        self.assertEqual(busy.result(timeout=5), -1)
+        self.assertEqual([f.result(timeout=5) for f in frames[-2:]], [3, 4])
+        for f in frames[:-2]:
+            with self.assertRaises(concurrent.futures.CancelledError):
+                f.result(timeout=5)
+        self.assertEqual(self.control.queue_statistics()['cmd_queue']['dropped_oldest'], 3)
+
+
+class TestBoundedStateQueue(ControlTestCase):
+
+    def make_control(self):
+        return BusyChildProcessControl(state_queue_size=2, state_queue_policy=mpPy6.CQueue.DROP_NEWEST)
+
+    def test_futures_are_resolved_with_full_state_queue(self):
+        frames = [self.control.process_frame(i) for i in range(2000)]
+        self.assertEqual([f.result(timeout=10) for f in frames], list(range(2000)))
+        self.assertEqual(self.control.queue_statistics()['state_queue']['dropped_newest'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
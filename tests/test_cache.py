@@ -0,0 +1,89 @@
+import time
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+from mpPy6.CResultCache import CResultCache
+
+
+class CacheChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+        self.calls = 0
+
+    @mpPy6.CProcess.register_signal(postfix='_finished')
+    def calibrate(self, channel: int, gain: float = 1.0):
+        self.calls += 1
+        return channel * gain, self.calls
+
+
+class CacheChildProcessControl(mpPy6.CProcessControl):
+    calibrate_finished = mpPy6.Signal(float, int)
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(CacheChildProcess)
+
+    @mpPy6.CProcessControl.register_function(cache=True, cache_ttl=0.5)
+    def calibrate(self, channel: int, gain: float = 1.0):
+        pass
+
+
+class TestResultCache(unittest.TestCase):
+
+    def test_lru_eviction(self):
+        cache = CResultCache(max_entries=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), (True, 1))
+        cache.put('c', 3)
+        # 'b' is the least recently used entry
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('a'), (True, 1))
+
+    def test_max_bytes(self):
+        cache = CResultCache(max_entries=None, max_bytes=10)
+        cache.put('a', b'123456')
+        cache.put('b', b'123456')
+        self.assertEqual(cache.statistics()['entries'], 1)
+        self.assertEqual(cache.statistics()['bytes'], 6)
+        cache.put('c', b'12345678901')
+        self.assertEqual(cache.get('c'), (False, None))
+
+    def test_unhashable_arguments(self):
+        self.assertIsNone(CResultCache.make_key(([1, 2],), {}))
+        self.assertEqual(CResultCache.make_key((1,), {'b': 2, 'a': 1}), CResultCache.make_key((1,), {'a': 1, 'b': 2}))
+
+
+class TestCachedFunction(ControlTestCase):
+
+    def make_control(self):
+        return CacheChildProcessControl()
+
+    def setUp(self):
+        super().setUp()
+        self.emitted = []
+        self.control.calibrate_finished.connect(lambda value, calls: self.emitted.append((value, calls)))
+
+    def test_hit_does_not_reach_child(self):
+        self.assertEqual(self.control.calibrate(2, gain=3.0).result(timeout=10), (6.0, 1))
+        self.assertTrue(wait_for(lambda: len(self.emitted) == 1))
+        # The cached result is emitted by the call itself
+        self.assertEqual(self.control.calibrate(2, gain=3.0).result(timeout=0), (6.0, 1))
+        self.assertEqual(self.emitted, [(6.0, 1), (6.0, 1)])
+        self.assertEqual(self.control.calibrate(2).result(timeout=10), (2.0, 2))
+        self.assertEqual(self.control.cache_statistics()['calibrate'],
+                         {'entries': 2, 'bytes': 0, 'hits': 1, 'misses': 2})
+
+    def test_invalidate_and_ttl(self):
+        self.assertEqual(self.control.calibrate(1).result(timeout=10), (1.0, 1))
+        self.control.invalidate_cache('calibrate', 1)
+        self.assertEqual(self.control.calibrate(1).result(timeout=10), (1.0, 2))
+        time.sleep(0.6)
+        self.assertEqual(self.control.calibrate(1).result(timeout=10), (1.0, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
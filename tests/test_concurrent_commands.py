@@ -0,0 +1,94 @@
+import asyncio
+import time
+import unittest
+
+from helpers import ControlTestCase
+
+import mpPy6
+
+
+class ConcurrentChildProcess(mpPy6.CProcess):
+    max_concurrent_commands = 4
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(concurrent=True)
+    def wait_for_device(self, duration: float):
+        time.sleep(duration)
+        return duration
+
+    @mpPy6.CProcess.register_signal(postfix='_finished')
+    async def wait_for_socket(self, duration: float):
+        await asyncio.sleep(duration)
+        return duration
+
+    @mpPy6.CProcess.register_signal(concurrent=True)
+    def fail(self):
+        raise ValueError("Device not found")
+
+    @mpPy6.CProcess.register_signal()
+    def ping(self):
+        return 'pong'
+
+
+class ConcurrentChildProcessControl(mpPy6.CProcessControl):
+    wait_for_socket_finished = mpPy6.Signal(float)
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(ConcurrentChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def wait_for_device(self, duration: float):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def wait_for_socket(self, duration: float):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def fail(self):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def ping(self):
+        pass
+
+
+class TestConcurrentCommands(ControlTestCase):
+
+    def make_control(self):
+        return ConcurrentChildProcessControl()
+
+    def setUp(self):
+        super().setUp()
+        self.control.on_exception_raised.disconnect(self.control.display_exception)
+        # Wait for the child to be started
+        self.assertEqual(self.control.ping().result(timeout=10), 'pong')
+
+    def test_concurrent_functions_run_in_parallel(self):
+        start = time.time()
+        futures = [self.control.wait_for_device(0.5) for _ in range(4)]
+        self.assertEqual([f.result(timeout=5) for f in futures], [0.5] * 4)
+        self.assertLess(time.time() - start, 1.5)
+
+    def test_coroutine_functions_run_in_parallel(self):
+        start = time.time()
+        futures = [self.control.wait_for_socket(0.5) for _ in range(10)]
+        self.assertEqual([f.result(timeout=5) for f in futures], [0.5] * 10)
+        self.assertLess(time.time() - start, 1.5)
+
+    def test_other_commands_are_not_blocked(self):
+        slow = self.control.wait_for_device(2)
+        self.assertEqual(self.control.ping().result(timeout=1), 'pong')
+        self.assertFalse(slow.done())
+        self.assertEqual(slow.result(timeout=5), 2)
+
+    def test_exception_of_concurrent_function(self):
+        with self.assertRaises(ValueError):
+            self.control.fail().result(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
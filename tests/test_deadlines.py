@@ -0,0 +1,105 @@
+import time
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+
+
+class DeadlineChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def echo(self, value):
+        return value
+
+    @mpPy6.CProcess.register_signal()
+    def sleep(self, duration: float):
+        time.sleep(duration)
+
+    @mpPy6.CProcess.register_signal()
+    def work(self):
+        t_start = time.time()
+        while not self.is_cancelled():
+            time.sleep(0.01)
+        return time.time() - t_start
+
+    @mpPy6.CProcess.register_signal()
+    def work_without_timeout(self):
+        return self.work()
+
+    @mpPy6.CProcess.register_signal()
+    def stream(self):
+        while True:
+            time.sleep(0.01)
+            yield 0
+
+
+class DeadlineChildProcessControl(mpPy6.CProcessControl):
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(DeadlineChildProcess)
+
+    @mpPy6.CProcessControl.register_function(timeout=1)
+    def echo(self, value):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def sleep(self, duration: float):
+        pass
+
+    @mpPy6.CProcessControl.register_function(timeout=0.3)
+    def work(self):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def work_without_timeout(self):
+        pass
+
+    @mpPy6.CProcessControl.register_function(timeout=0.3)
+    def stream(self):
+        pass
+
+
+class TestDeadlines(ControlTestCase):
+
+    def make_control(self):
+        return DeadlineChildProcessControl()
+
+    def setUp(self):
+        super().setUp()
+        self.control.on_exception_raised.disconnect(self.control.display_exception)
+        self.exceptions = []
+        self.control.on_exception_raised.connect(self.exceptions.append)
+
+    def test_expired_command_is_not_executed(self):
+        self.assertEqual(self.control.echo(1).result(timeout=5), 1)
+        self.control.sleep(1.5)
+        # exception() raises (instead of returning) the TimeoutError, if the future is not resolved in time
+        self.assertIsInstance(self.control.echo(2).exception(timeout=5), TimeoutError)
+        self.assertTrue(wait_for(lambda: len(self.exceptions) == 1))
+        self.assertIsInstance(self.exceptions[0], mpPy6.CTimeoutException)
+
+    def test_running_function_polls_deadline(self):
+        duration = self.control.work().result(timeout=5)
+        self.assertGreaterEqual(duration, 0.2)
+        self.assertLess(duration, 2)
+
+    def test_running_function_polls_cancellation(self):
+        self.assertEqual(self.control.echo(1).result(timeout=5), 1)
+        future = self.control.work_without_timeout()
+        time.sleep(0.2)
+        self.control.cancel_command(future.cmd_id)
+        self.assertTrue(future.cancelled())
+        # The child is free again, thus the next command is answered within its deadline
+        self.assertEqual(self.control.echo(3).result(timeout=5), 3)
+
+    def test_stream_stopped_by_deadline(self):
+        self.assertIsInstance(self.control.stream().exception(timeout=5), TimeoutError)
+
+
+if __name__ == '__main__':
+    unittest.main()
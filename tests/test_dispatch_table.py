@@ -0,0 +1,67 @@
+import unittest
+
+from helpers import ControlTestCase
+
+import mpPy6
+
+
+class DispatchChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def set_point(self, value: float):
+        return value
+
+    @mpPy6.CProcess.register_signal(signal_name='fixed_signal')
+    def fixed(self):
+        return 1
+
+
+class DispatchChildProcessControl(mpPy6.CProcessControl):
+    fixed_signal = mpPy6.Signal(int)
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(DispatchChildProcess)
+        self.on_exception_raised.disconnect(self.display_exception)
+
+    @mpPy6.CProcessControl.register_function()
+    def set_point(self, value: float):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def fixed(self):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def not_implemented_in_child(self):
+        pass
+
+
+class TestDispatchTable(ControlTestCase):
+
+    def make_control(self):
+        return DispatchChildProcessControl()
+
+    def test_command_table(self):
+        table = DispatchChildProcess.command_table()
+        self.assertIs(table, DispatchChildProcess.command_table())
+        self.assertIn('set_point', table)
+        self.assertIn('set_child_log_level', table)
+        self.assertNotIn('set_point', mpPy6.CProcess.command_table())
+        self.assertEqual(self.control._command_ids['set_point'], table.index('set_point'))
+
+    def test_commands_are_dispatched_by_id(self):
+        futures = [self.control.set_point(i / 10) for i in range(100)]
+        self.assertEqual([f.result(timeout=5) for f in futures], [i / 10 for i in range(100)])
+        self.assertEqual(self.control.fixed().result(timeout=5), 1)
+
+    def test_unknown_function(self):
+        with self.assertRaises(AttributeError):
+            self.control.not_implemented_in_child().result(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import time
+import unittest
+
+from helpers import ControlTestCase
+
+import mpPy6
+
+
+class FutureChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(signal_name='add_two_finished')
+    def add_two(self, num1: int, num2: int):
+        return num1 + num2
+
+    @mpPy6.CProcess.register_signal()
+    def divide(self, num1: int, num2: int):
+        return num1 / num2
+
+    def multiply(self, num1: int, num2: int):
+        return num1 * num2
+
+    @mpPy6.CProcess.register_signal()
+    def sleep(self, duration: float):
+        time.sleep(duration)
+
+
+class FutureChildProcessControl(mpPy6.CProcessControl):
+    add_two_finished = mpPy6.Signal(int, name='add_two_finished')
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_pool(FutureChildProcess, 2)
+
+    @mpPy6.CProcessControl.register_function()
+    def add_two(self, num1: int, num2: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def divide(self, num1: int, num2: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def multiply(self, num1: int, num2: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def sleep(self, duration: float):
+        pass
+
+
+class TestFutures(ControlTestCase):
+
+    def make_control(self):
+        return FutureChildProcessControl()
+
+    def setUp(self):
+        super().setUp()
+        self.control.on_exception_raised.disconnect(self.control.display_exception)
+
+    def test_result_from_thread(self):
+        self.assertEqual(self.control.add_two(1, 2).result(timeout=5), 3)
+
+    def test_result_of_function_not_registered_as_signal(self):
+        self.assertEqual(self.control.multiply(3, 4).result(timeout=5), 12)
+
+    def test_exception_is_set(self):
+        future = self.control.divide(1, 0)
+        self.assertIsInstance(future.exception(timeout=5), ZeroDivisionError)
+
+    def test_await_many_outstanding_requests(self):
+        async def gather():
+            return await asyncio.gather(*[self.control.add_two(i, i) for i in range(20)])
+
+        self.assertEqual(asyncio.run(asyncio.wait_for(gather(), 5)), [2 * i for i in range(20)])
+
+    def test_pending_futures_fail_if_child_ends(self):
+        future = self.control.sleep(10)
+        time.sleep(0.2)
+        for child in self.control.children:
+            child.terminate()
+        self.assertIsInstance(future.exception(timeout=5), ChildProcessError)
+
+
+if __name__ == '__main__':
+    unittest.main()
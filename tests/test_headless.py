@@ -0,0 +1,119 @@
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+from helpers import ControlTestCase, SRC, shut_down
+
+import mpPy6
+
+
+class HeadlessChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(postfix='_finished')
+    def add(self, a: int, b: int):
+        return a + b
+
+    @mpPy6.CProcess.register_signal()
+    def total(self, *values: int):
+        return sum(values)
+
+    @mpPy6.CProcess.register_signal()
+    def fail(self):
+        raise ValueError("failed")
+
+
+class HeadlessChildProcessControl(mpPy6.CProcessControlCore):
+    add_finished = mpPy6.CSignal(int)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.register_child_process(HeadlessChildProcess)
+
+    @mpPy6.CProcessControlCore.register_function()
+    def add(self, a: int, b: int):
+        pass
+
+    @mpPy6.CProcessControlCore.register_function(signal=add_finished)
+    def total(self, *values: int):
+        pass
+
+    @mpPy6.CProcessControlCore.register_function()
+    def fail(self):
+        pass
+
+
+class TestHeadless(ControlTestCase):
+
+    qt = False
+
+    def make_control(self):
+        return HeadlessChildProcessControl()
+
+    def test_callback(self):
+        received, done = [], threading.Event()
+        self.control.add_finished.connect(lambda value: (received.append(value), done.set()))
+        self.assertEqual(self.control.add(1, 2).result(timeout=10), 3)
+        self.assertTrue(done.wait(timeout=10))
+        self.assertEqual(received, [3])
+
+    def test_asyncio(self):
+        async def main():
+            return await asyncio.gather(self.control.add(1, 2), self.control.add(3, 4))
+
+        self.assertEqual(asyncio.run(main()), [3, 7])
+
+    def test_exception(self):
+        exceptions, done = [], threading.Event()
+        self.control.on_exception_raised.connect(lambda e: (exceptions.append(e), done.set()))
+        self.assertIsInstance(self.control.fail().exception(timeout=10), ValueError)
+        self.assertTrue(done.wait(timeout=10))
+
+    def test_signals_are_per_instance(self):
+        other = HeadlessChildProcessControl()
+        try:
+            self.assertIsNot(self.control.add_finished, other.add_finished)
+        finally:
+            shut_down(other)
+
+
+class TestCSignal(unittest.TestCase):
+
+    def test_failing_slot_does_not_stop_others(self):
+        class Emitter:
+            changed = mpPy6.CSignal(int)
+
+        emitter, received = Emitter(), []
+        emitter.changed.connect(lambda value: 1 / 0)
+        emitter.changed.connect(received.append)
+        emitter.changed.emit(1)
+        self.assertEqual(received, [1])
+        emitter.changed.disconnect(received.append)
+        emitter.changed.emit(2)
+        self.assertEqual(received, [1])
+        self.assertEqual(str(Emitter.changed), 'changed(int)')
+
+    def test_qt_is_not_imported(self):
+        code = ("import sys; sys.path.insert(0, sys.argv[1]); sys.path.insert(0, sys.argv[2])\n"
+                "import test_headless\n"
+                "control = test_headless.HeadlessChildProcessControl()\n"
+                "received = []\n"
+                "control.add_finished.connect(received.append)\n"
+                "try:\n"
+                "    assert control.total(1, 2, 3).result(timeout=10) == 6\n"
+                "finally:\n"
+                "    control.safe_exit()\n"
+                "    [child.join(timeout=5) for child in control.children]\n"
+                "print(received, [m for m in sys.modules if m.startswith('PySide6')])")
+        output = subprocess.run([sys.executable, '-c', code, SRC, os.path.dirname(os.path.abspath(__file__))],
+                                capture_output=True, text=True, timeout=60)
+        self.assertEqual(output.stdout.strip().splitlines()[-1], '[6] []', output.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import multiprocessing
+import subprocess
+import sys
+import textwrap
+import time
+import unittest
+
+from helpers import ControlTestCase, shut_down, SRC, wait_for
+
+import mpPy6
+from mpPy6.CHeartbeat import CHeartbeat
+
+
+class HeartbeatChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def echo(self, value):
+        return value
+
+    @mpPy6.CProcess.register_signal()
+    def sleep(self, duration: float):
+        time.sleep(duration)
+
+
+class HeartbeatChildProcessControl(mpPy6.CProcessControl):
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(HeartbeatChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def echo(self, value):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def sleep(self, duration: float):
+        pass
+
+
+class TestHeartbeat(ControlTestCase):
+
+    def make_control(self):
+        return HeartbeatChildProcessControl(heartbeat_interval=0.05, stall_timeout=0.5)
+
+    def setUp(self):
+        super().setUp()
+        self.heartbeats, self.stalls = [], []
+        self.control.on_heartbeat.connect(self.heartbeats.append)
+        self.control.on_child_stalled.connect(self.stalls.append)
+
+    def test_health(self):
+        self.assertEqual(self.control.echo(1).result(timeout=10), 1)
+        self.assertTrue(wait_for(lambda: len(self.heartbeats) >= 3))
+        health = self.control.child_health()[0]
+        self.assertEqual(health['pid'], self.control.child_process_pid)
+        self.assertLess(health['heartbeat_age'], 0.5)
+        self.assertGreater(health['rss'], 0)
+        self.assertGreater(health['cpu_time'], 0)
+        self.assertGreaterEqual(health['commands'], 1)
+        self.assertIsNone(health['command'])
+        self.assertFalse(health['stalled'])
+        self.assertEqual(self.stalls, [])
+
+    @unittest.skipIf(sys.platform == 'darwin', "Queue sizes are not available on macOS.")
+    def test_queue_depths(self):
+        self.control.sleep(1)
+        self.control.echo(1)
+        self.control.echo(2)
+        self.assertTrue(wait_for(lambda: self.control.child_health()[0]['command'] == 'sleep'))
+        health = self.control.child_health()[0]
+        self.assertEqual(health['cmd_queue_depth'][mpPy6.CProcessControl.PRIORITY_NORMAL], 2)
+        self.assertEqual(health['control_queue_depth'], 0)
+        self.assertEqual(health['state_queue_depth'], 0)
+
+    def test_stalled_command(self):
+        future = self.control.sleep(1.5)
+        self.assertTrue(wait_for(lambda: len(self.stalls) == 1))
+        self.assertEqual(self.stalls[0]['stalled'], 'command')
+        self.assertEqual(self.stalls[0]['command'], 'sleep')
+        # The heartbeat continues while the command loop is blocked
+        self.assertLess(self.stalls[0]['heartbeat_age'], 0.5)
+        future.result(timeout=10)
+        self.assertTrue(wait_for(lambda: not self.heartbeats[-1][0]['stalled']))
+        # A stall is reported once
+        self.assertEqual(len(self.stalls), 1)
+
+    def test_disabled_by_default(self):
+        control = HeartbeatChildProcessControl()
+        try:
+            self.assertEqual(control.echo(1).result(timeout=10), 1)
+            self.assertEqual(control.child_health(), [])
+        finally:
+            shut_down(control)
+
+
+class TestWithoutResource(unittest.TestCase):
+
+    def test_import_without_resource_module(self):
+        # As on Windows: neither the module resource nor /proc exist
+        code = textwrap.dedent("""
+            import builtins, sys
+            sys.modules['resource'] = None
+            sys.path.insert(0, sys.argv[1])
+            import mpPy6
+            from mpPy6.CHeartbeat import _resident_set_size
+
+            def no_proc(*args, **kwargs):
+                raise OSError("No /proc")
+
+            builtins.open = no_proc
+            print(_resident_set_size())
+        """)
+        out = subprocess.run([sys.executable, '-c', code, SRC], capture_output=True, text=True, timeout=60)
+        self.assertEqual(out.returncode, 0, out.stderr)
+        self.assertEqual(out.stdout.strip(), 'None')
+
+    def test_unknown_rss(self):
+        heartbeat = CHeartbeat(multiprocessing.get_context())
+        heartbeat._values[CHeartbeat.RSS] = -1
+        self.assertIsNone(heartbeat.snapshot(())['rss'])
+
+if __name__ == '__main__':
+    unittest.main()
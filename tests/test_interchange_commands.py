@@ -1,50 +1,61 @@
 import os
-import time
-
-from PySide6.QtCore import Signal
+import unittest
 
-import cmp
+from helpers import ControlTestCase, wait_for
 
-import unittest
+from PySide6.QtCore import Signal
 
+import mpPy6
 
-class ChildProcessCustomSignals(cmp.CProcess):
 
-    def __init__(self, state_queue, cmd_queue, internal_log):
-        super().__init__(state_queue, cmd_queue, internal_log=internal_log)
-        self.logger = None
+class ChildProcessCustomSignals(mpPy6.CProcess):
 
-    def postrun_init(self):
-        self.logger, self.logger_h = self.create_new_logger(f"{self.__class__.__name__}-({os.getpid()})")
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
 
-    @cmp.CProcess.register_signal()
+    @mpPy6.CProcess.register_signal(postfix='_changed')
     def call_without_mp(self, a, b, c=None, **kwargs):
         self.logger.info(f"{os.getpid()} -> call_without_mp with {a}, {b}, {c} and {kwargs}!")
-        time.sleep(1)
         return c
 
+    @mpPy6.CProcess.register_signal(signal_name='testSignals')
+    def call_with_custom_signal(self, a):
+        return a
 
-class ChildProcessControlCustomSignals(cmp.CProcessControl):
-    testSignals = Signal(int)
 
-    # call_without_mp2_changed = Signal(int, int, int)
+class ChildProcessControlCustomSignals(mpPy6.CProcessControl):
+    testSignals = Signal(int)
+    call_without_mp_changed = Signal(int)
 
-    def __init__(self, parent, signal_class, internal_logging):
-        super().__init__(parent, signal_class, internal_logging=internal_logging)
-        self.register_child_process(ChildProcessCustomSignals(self.state_queue, self.cmd_queue,
-                                                              internal_log=internal_logging))
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(ChildProcessCustomSignals)
 
-    @cmp.CProcessControl.register_function()
+    @mpPy6.CProcessControl.register_function()
     def call_without_mp(self, a, b, c=None):
         pass
 
+    @mpPy6.CProcessControl.register_function()
+    def call_with_custom_signal(self, a):
+        pass
 
-class TestInterchangeCommands(unittest.TestCase):
 
+class TestInterchangeCommands(ControlTestCase):
 
-    def test_custom_signals(self):
-        process_control = ChildProcessControlCustomSignals()
+    def make_control(self):
+        return ChildProcessControlCustomSignals()
 
+    def test_custom_signals(self):
+        received = []
+        self.control.testSignals.connect(received.append)
+        self.control.call_with_custom_signal(42)
+        self.assertTrue(wait_for(lambda: received == [42]))
+
+    def test_signal_with_postfix(self):
+        received = []
+        self.control.call_without_mp_changed.connect(received.append)
+        self.control.call_without_mp(1, 2, c=3)
+        self.assertTrue(wait_for(lambda: received == [3]))
 
 
 if __name__ == '__main__':
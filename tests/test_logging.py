@@ -0,0 +1,122 @@
+import logging
+import os
+import queue
+import tempfile
+import time
+import unittest
+
+from helpers import ControlTestCase, shut_down, wait_for
+
+import mpPy6
+from mpPy6.CLogHandler import CBatchedQueueHandler
+
+
+class LoggingChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def log_lines(self, n: int):
+        for i in range(n):
+            self.logger.info(f"Line {i}")
+
+    @mpPy6.CProcess.register_signal()
+    def log_and_sleep(self, duration: float):
+        self.logger.info("Started")
+        time.sleep(duration)
+
+
+class LoggingChildProcessControl(mpPy6.CProcessControl):
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(LoggingChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def log_lines(self, n: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def log_and_sleep(self, duration: float):
+        pass
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def make_record(level: int, msg: str) -> logging.LogRecord:
+    return logging.LogRecord('test', level, __file__, 0, msg, None, None)
+
+
+class TestCBatchedQueueHandler(unittest.TestCase):
+
+    def test_records_are_sent_in_batches(self):
+        q = queue.Queue()
+        handler = CBatchedQueueHandler(q, batch_size=3)
+        for i in range(4):
+            handler.handle(make_record(logging.INFO, f"{i}"))
+        self.assertEqual([r.msg for r in q.get_nowait()], ['0', '1', '2'])
+        self.assertTrue(q.empty())
+        handler.flush()
+        self.assertEqual([r.msg for r in q.get_nowait()], ['3'])
+
+    def test_warning_is_sent_immediately(self):
+        q = queue.Queue()
+        handler = CBatchedQueueHandler(q)
+        handler.handle(make_record(logging.INFO, "info"))
+        handler.handle(make_record(logging.WARNING, "warning"))
+        self.assertEqual([r.msg for r in q.get_nowait()], ['info', 'warning'])
+
+    def test_batch_is_sent_after_max_delay(self):
+        q = queue.Queue()
+        handler = CBatchedQueueHandler(q, max_delay=0.01)
+        handler.handle(make_record(logging.INFO, "info"))
+        self.assertEqual([r.msg for r in q.get(timeout=1)], ['info'])
+
+
+class TestChildLogging(ControlTestCase):
+
+    def test_log_records_are_sent_via_log_queue(self):
+        self.control = LoggingChildProcessControl()
+        handler = ListHandler()
+        self.control.logger.addHandler(handler)
+        self.control.log_lines(20).result(timeout=5)
+        self.assertTrue(wait_for(lambda: "Line 19" in handler.messages))
+
+    def test_records_are_sent_during_long_command(self):
+        self.control = LoggingChildProcessControl()
+        handler = ListHandler()
+        self.control.logger.addHandler(handler)
+        future = self.control.log_and_sleep(3)
+        self.assertTrue(wait_for(lambda: "Started" in handler.messages, timeout=2))
+        self.assertFalse(future.done())
+
+    def test_ring_buffer(self):
+        self.control = LoggingChildProcessControl(log_ring_size=5)
+        handler = ListHandler()
+        self.control.logger.addHandler(handler)
+        self.control.log_lines(20).result(timeout=5)
+        lines = self.control.get_child_log().result(timeout=5)
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[-1].endswith("Line 19"))
+        self.assertNotIn("Line 19", handler.messages)
+
+    def test_log_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.control = LoggingChildProcessControl(log_file=os.path.join(directory, "child_{worker_index}.log"))
+            self.control.log_lines(3).result(timeout=5)
+            shut_down(self.control)
+            with open(os.path.join(directory, "child_0.log")) as f:
+                self.assertIn("Line 2", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
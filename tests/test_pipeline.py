@@ -0,0 +1,98 @@
+import os
+import threading
+import unittest
+
+from helpers import shut_down
+
+import mpPy6
+
+
+class SourceChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(signal_name='frame_ready')
+    def frame(self, i: int):
+        return i, os.getpid()
+
+    @mpPy6.CProcess.register_signal()
+    def acquire(self, n: int):
+        for i in range(n):
+            self.frame(i)
+        return n
+
+
+class FilterChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(postfix='_finished')
+    def filter(self, i: int, source_pid: int):
+        return i * 2, source_pid
+
+
+class SourceChildProcessControl(mpPy6.CProcessControlCore):
+    frame_ready = mpPy6.CSignal(int, int)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.register_child_process(SourceChildProcess)
+
+    @mpPy6.CProcessControlCore.register_function()
+    def acquire(self, n: int):
+        pass
+
+
+class FilterChildProcessControl(mpPy6.CProcessControlCore):
+    filter_finished = mpPy6.CSignal(int, int)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.register_child_process(FilterChildProcess)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.source = SourceChildProcessControl()
+        self.filter = FilterChildProcessControl()
+        self.frames, self.filtered, self.done = [], [], threading.Event()
+        self.source.frame_ready.connect(lambda i, pid: self.frames.append(i))
+
+        def on_filtered(i, source_pid):
+            self.filtered.append((i, source_pid))
+            if len(self.filtered) == 100:
+                self.done.set()
+
+        self.filter.filter_finished.connect(on_filtered)
+
+    def tearDown(self):
+        for control in (self.source, self.filter):
+            shut_down(control)
+
+    def test_signal_is_sent_to_other_child(self):
+        self.source.connect_pipeline('frame_ready', self.filter, 'filter')
+        self.assertEqual(self.source.acquire(100).result(timeout=10), 100)
+        self.assertTrue(self.done.wait(timeout=10))
+        self.assertEqual(self.filtered, [(i * 2, self.source.child.pid) for i in range(100)])
+        # Not observed: the source control class does not receive the frames
+        self.assertEqual(self.frames, [])
+        self.assertNotIn('frame', self.source.command_statistics())
+
+    def test_observed_pipeline(self):
+        self.source.connect_pipeline('frame_ready', self.filter, 'filter', observe=True)
+        self.source.acquire(100)
+        self.assertTrue(self.done.wait(timeout=10))
+        self.source.acquire(0).result(timeout=10)
+        self.assertEqual(self.frames, list(range(100)))
+
+    def test_child_cannot_be_connected_to_itself(self):
+        with self.assertRaises(ValueError):
+            self.filter.connect_pipeline('filter_finished', self.filter, 'filter')
+        self.assertEqual(self.filter._pipeline_outputs, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import time
+import unittest
+
+from helpers import ControlTestCase
+
+import mpPy6
+
+
+class PriorityChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def work(self, duration: float):
+        time.sleep(duration)
+        return time.time()
+
+    @mpPy6.CProcess.register_signal()
+    def abort(self):
+        return time.time()
+
+    @mpPy6.CProcess.register_signal()
+    def cleanup_data(self):
+        return time.time()
+
+
+class PriorityChildProcessControl(mpPy6.CProcessControl):
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(PriorityChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def work(self, duration: float):
+        pass
+
+    @mpPy6.CProcessControl.register_function(priority=mpPy6.CProcessControl.PRIORITY_HIGH)
+    def abort(self):
+        pass
+
+    @mpPy6.CProcessControl.register_function(priority=mpPy6.CProcessControl.PRIORITY_LOW)
+    def cleanup_data(self):
+        pass
+
+
+class TestPriorities(ControlTestCase):
+
+    def make_control(self):
+        return PriorityChildProcessControl()
+
+    def test_high_priority_overtakes_backlog(self):
+        backlog = [self.control.work(0.2) for _ in range(5)]
+        abort = self.control.abort()
+        finished = [f.result(timeout=5) for f in backlog]
+        # At most the running command and the one taken before the abort arrived are executed first
+        self.assertLess(abort.result(timeout=5), finished[2])
+
+    def test_low_priority_waits_for_backlog(self):
+        busy = self.control.work(0.3)
+        time.sleep(0.1)
+        cleanup = self.control.cleanup_data()
+        backlog = [self.control.work(0.1) for _ in range(3)]
+        finished = [f.result(timeout=5) for f in [busy] + backlog]
+        self.assertGreater(cleanup.result(timeout=5), finished[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import time
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+
+
+class PoolChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(signal_name='work_finished')
+    def work(self, duration: float):
+        time.sleep(duration)
+        return os.getpid()
+
+    @mpPy6.CProcess.register_signal(signal_name='worker_index_reported')
+    def report_worker_index(self):
+        return self.worker_index
+
+
+class PoolChildProcessControl(mpPy6.CProcessControl):
+    work_finished = mpPy6.Signal(int, name='work_finished')
+    worker_index_reported = mpPy6.Signal(int, name='worker_index_reported')
+
+    def __init__(self, parent=None, workers: int = 3, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_pool(PoolChildProcess, workers)
+
+    @mpPy6.CProcessControl.register_function()
+    def work(self, duration: float):
+        pass
+
+    @mpPy6.CProcessControl.register_function(broadcast=True)
+    def report_worker_index(self):
+        pass
+
+
+class TestProcessPool(ControlTestCase):
+
+    def make_control(self):
+        return PoolChildProcessControl(workers=3)
+
+    def test_commands_are_spread_over_workers(self):
+        pids = []
+        self.control.work_finished.connect(pids.append)
+        for _ in range(6):
+            self.control.work(0.5)
+        self.assertTrue(wait_for(lambda: len(pids) == 6))
+        self.assertEqual(len(self.control.children), 3)
+        self.assertGreater(len(set(pids)), 1)
+        self.assertTrue(set(pids).issubset(set(self.control.child_process_pids)))
+
+    def test_broadcast_reaches_every_worker(self):
+        indices = []
+        self.control.worker_index_reported.connect(indices.append)
+        self.control.report_worker_index()
+        self.assertTrue(wait_for(lambda: len(indices) == 3))
+        self.assertEqual(sorted(indices), [0, 1, 2])
+
+    def test_safe_exit_stops_idle_workers_immediately(self):
+        t_start = time.time()
+        self.control.safe_exit(reason="Test shutdown.")
+        for child in self.control.children:
+            child.join(timeout=5)
+        self.assertFalse(any(child.is_alive() for child in self.control.children))
+        self.assertLess(time.time() - t_start, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from helpers import ControlTestCase
+
+import mpPy6
+
+
+class PropertyChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+        self._temperature = 0.0
+        self._spectrum = np.zeros(16)
+        self._status = ''
+
+    @mpPy6.CProperty
+    def temperature(self):
+        return self._temperature
+
+    @temperature.setter('temperature_changed', shared=float)
+    def temperature(self, value: float):
+        self._temperature = value
+
+    @mpPy6.CProperty
+    def spectrum(self):
+        return self._spectrum
+
+    @spectrum.setter('spectrum_changed', shared=(np.float64, (16,)))
+    def spectrum(self, value):
+        self._spectrum = value
+
+    @mpPy6.CProperty
+    def status(self):
+        return self._status
+
+    @status.setter('status_changed')
+    def status(self, value: str):
+        self._status = value
+
+    @mpPy6.CProcess.register_signal()
+    def measure(self, n: int):
+        for i in range(n):
+            self.temperature = float(i)
+            self.spectrum = np.full(16, i, dtype=np.float64)
+        self.status = 'measured'
+        return n
+
+
+class PropertyChildProcessControl(mpPy6.CProcessControlCore):
+    temperature_changed = mpPy6.CSignal(float)
+    spectrum_changed = mpPy6.CSignal(object)
+    status_changed = mpPy6.CSignal(str)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.register_child_process(PropertyChildProcess)
+
+    @mpPy6.CProcessControlCore.register_function()
+    def measure(self, n: int):
+        pass
+
+
+class TestCPropertyStore(unittest.TestCase):
+
+    def test_values_and_changes(self):
+        store = mpPy6.CPropertyStore({'connected': bool, 'count': int, 'image': (np.uint8, (2, 3))})
+        try:
+            self.assertIsNone(store.read('count'))
+            self.assertEqual(store.changes(), {})
+            store.write('connected', True)
+            store.write('count', 1)
+            store.write('count', 2)
+            store.write('image', np.ones((2, 3)))
+            changes = store.changes()
+            self.assertEqual(changes['count'], 2)
+            self.assertIs(changes['connected'], True)
+            np.testing.assert_array_equal(changes['image'], np.ones((2, 3), dtype=np.uint8))
+            self.assertEqual(store.changes(), {})
+            with self.assertRaises(ValueError):
+                mpPy6.CPropertyStore({'name': str})
+        finally:
+            store.close()
+
+    def test_writer_killed_while_writing(self):
+        store = mpPy6.CPropertyStore({'count': int, 'spectrum': (np.float64, (4_000_000,))})
+        version = store._entries['spectrum'][0] // 8
+        try:
+            store.write('spectrum', np.zeros(4_000_000))
+            self.assertEqual(store.changes().keys(), {'spectrum'})
+            for _ in range(20):
+                writer = multiprocessing.get_context('fork').Process(target=write_forever, args=(store,))
+                writer.start()
+                t_end = time.time() + 10
+                while not store._versions[version] & 1 and time.time() < t_end:
+                    pass
+                os.kill(writer.pid, signal.SIGKILL)
+                writer.join()
+                if store._versions[version] & 1:
+                    break
+            self.assertTrue(store._versions[version] & 1, "The writer was never killed while writing.")
+            # Does not wait for the dead writer: the last value read completely
+            t0 = time.time()
+            np.testing.assert_array_equal(store.read('spectrum'), np.zeros(4_000_000))
+            self.assertLess(time.time() - t0, 1)
+            store.changes()
+            self.assertEqual(store.changes(), {})
+            # Another writer continues the store
+            store.recover()
+            self.assertFalse(store._versions[version] & 1)
+            store.write('spectrum', np.full(4_000_000, -1.0))
+            np.testing.assert_array_equal(store.changes()['spectrum'], np.full(4_000_000, -1.0))
+        finally:
+            store.close()
+
+
+def write_forever(store: mpPy6.CPropertyStore):
+    for i in itertools.count(1):
+        store.write('spectrum', np.full(4_000_000, float(i)))
+
+
+class TestPropertyStoreControl(ControlTestCase):
+
+    qt = False
+
+    def make_control(self):
+        return PropertyChildProcessControl(property_interval=0.05)
+
+    def test_shared_properties_are_read_without_messages(self):
+        temperatures, statuses, done = [], [], threading.Event()
+        self.control.temperature_changed.connect(temperatures.append)
+        self.control.status_changed.connect(lambda value: (statuses.append(value), done.set()))
+        self.assertEqual(self.control.measure(1000).result(timeout=10), 1000)
+        self.assertEqual(self.control.property_value('temperature'), 999.0)
+        np.testing.assert_array_equal(self.control.property_value('spectrum'), np.full(16, 999.0))
+        # Not shared: sent as message, as before
+        self.assertTrue(done.wait(timeout=10))
+        self.assertEqual(statuses, ['measured'])
+        t_end = time.time() + 10
+        while (not temperatures or temperatures[-1] != 999.0) and time.time() < t_end:
+            time.sleep(0.01)
+        # Only the latest values are emitted, at most every property_interval
+        self.assertEqual(temperatures[-1], 999.0)
+        self.assertLess(len(temperatures), 1000)
+        self.assertNotIn('temperature', self.control.command_statistics())
+        self.assertIn('status', self.control.command_statistics())
+        with self.assertRaises(KeyError):
+            self.control.property_value('status')
+
+    def test_monitor_sleeps_while_values_do_not_change(self):
+        temperatures = []
+        self.control.temperature_changed.connect(temperatures.append)
+        emit_properties, passes = self.control._emit_properties, []
+        self.control._emit_properties = lambda **kwargs: (passes.append(time.time()), emit_properties(**kwargs))
+        self.assertEqual(self.control.measure(1).result(timeout=10), 1)
+        time.sleep(0.5)
+        passes.clear()
+        time.sleep(1)
+        # Not polled every property_interval (0.05 seconds)
+        self.assertLess(len(passes), 5)
+        # The next change is announced by the child
+        self.control.measure(3)
+        t_end = time.time() + 10
+        while temperatures[-1:] != [2.0] and time.time() < t_end:
+            time.sleep(0.01)
+        self.assertEqual(temperatures[-1], 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
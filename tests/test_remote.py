@@ -0,0 +1,168 @@
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from multiprocessing import connection
+
+from helpers import ControlTestCase, TESTS, SRC, wait_for
+
+import mpPy6
+
+AUTHKEY = b'test-remote'
+
+
+# Qt is only imported by the tests, since the agent imports this module to load the child class
+class RemoteChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, offset: int = 0, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+        self.offset = offset
+
+    @mpPy6.CProcess.register_signal(postfix='_finished')
+    def add(self, a: int, b: int):
+        return a + b + self.offset
+
+    @mpPy6.CProcess.register_signal()
+    def get_pid(self):
+        return os.getpid()
+
+    @mpPy6.CProcess.register_signal()
+    def crash(self):
+        os._exit(3)
+
+    @mpPy6.CProcess.register_signal(signal_name='worker_started')
+    def report_pid(self):
+        return os.getpid()
+
+    @mpPy6.CProcess.register_signal()
+    def work(self, duration: float):
+        time.sleep(duration)
+        return os.getpid()
+
+
+def make_control(workers: int = 1, **kwargs):
+    class RemoteChildProcessControl(mpPy6.CProcessControl):
+        add_finished = mpPy6.Signal(int)
+        worker_started = mpPy6.Signal(int)
+
+        def __init__(self, parent=None, *args, **kwargs):
+            super().__init__(parent, *args, **kwargs)
+            self.register_child_pool(RemoteChildProcess, workers, offset=100)
+
+        @mpPy6.CProcessControl.register_function()
+        def add(self, a: int, b: int):
+            pass
+
+        @mpPy6.CProcessControl.register_function()
+        def get_pid(self):
+            pass
+
+        @mpPy6.CProcessControl.register_function()
+        def crash(self):
+            pass
+
+        @mpPy6.CProcessControl.register_function(broadcast=True)
+        def report_pid(self):
+            pass
+
+        @mpPy6.CProcessControl.register_function()
+        def work(self, duration: float):
+            pass
+
+    return RemoteChildProcessControl(**kwargs)
+
+
+class TestRemote(ControlTestCase):
+
+    join_timeout = 10
+
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.address = os.path.join(self.directory.name, 'agent.sock')
+        env = dict(os.environ, MPPY6_AGENT_AUTHKEY=AUTHKEY.decode(),
+                   PYTHONPATH=os.pathsep.join([SRC, TESTS, os.environ.get('PYTHONPATH', '')]))
+        self.agent = subprocess.Popen([sys.executable, '-m', 'mpPy6.CAgent', self.address, '--log-level', 'WARNING'],
+                                      env=env)
+        t_end = time.time() + 10
+        while not os.path.exists(self.address) and time.time() < t_end:
+            time.sleep(0.01)
+
+    def tearDown(self):
+        super().tearDown()
+        self.agent.terminate()
+        self.agent.wait(timeout=10)
+        self.directory.cleanup()
+
+    def test_commands_are_executed_by_agent(self):
+        self.control = make_control(agent_address=self.address, agent_authkey=AUTHKEY)
+        results = []
+        self.control.add_finished.connect(results.append)
+        self.assertEqual(self.control.add(1, 2).result(timeout=10), 103)
+        self.assertTrue(wait_for(lambda: results == [103]))
+        # The child runs in a process of the agent, not in the local stand-in
+        remote_pid = self.control.get_pid().result(timeout=10)
+        self.assertNotIn(remote_pid, (os.getpid(), self.control.child.pid))
+
+    def test_remote_crash_is_restarted(self):
+        self.control = make_control(agent_address=self.address, agent_authkey=AUTHKEY, restart_children=True)
+        restarts = []
+        self.control.on_child_restarted.connect(restarts.append)
+        first_pid = self.control.get_pid().result(timeout=10)
+        self.control.crash()
+        self.assertTrue(wait_for(lambda: len(restarts) == 1))
+        self.assertEqual(restarts[0]['exitcode'], 3)
+        self.assertNotEqual(self.control.get_pid().result(timeout=10), first_pid)
+
+    def test_pool_shares_commands_like_local_workers(self):
+        self.control = make_control(workers=3, agent_address=self.address, agent_authkey=AUTHKEY)
+        started = []
+        self.control.worker_started.connect(started.append)
+        self.control.report_pid()
+        self.assertTrue(wait_for(lambda: len(started) == 3))
+        t_start = time.time()
+        futures = [self.control.work(0.3) for _ in range(6)]
+        pids = [future.result(timeout=10) for future in futures]
+        # Every worker takes the next command when it is idle, not when the command is sent
+        self.assertEqual(sorted(pids.count(pid) for pid in set(pids)), [2, 2, 2])
+        self.assertLess(time.time() - t_start, 1.0)
+
+    def test_different_command_table_is_refused(self):
+        conn = connection.Client(self.address, authkey=AUTHKEY)
+        # E.g. a control class of another version of the code
+        conn.send(('start', f'{__name__}:RemoteChildProcess', (), {}, {'lanes': 1, 'cmd_lane': 0},
+                   RemoteChildProcess.command_table() + ('removed_function',)))
+        self.assertTrue(conn.poll(10))
+        self.assertEqual(conn.recv(), ('exit', 1))
+        conn.close()
+
+    def test_deadline_is_relative_to_receipt(self):
+        conn = connection.Client(self.address, authkey=AUTHKEY)
+        conn.send(('start', f'{__name__}:RemoteChildProcess', (), {'offset': 100},
+                   {'internal_log': False, 'internal_log_level': 'WARNING', 'lanes': 1, 'cmd_lane': 0},
+                   RemoteChildProcess.command_table()))
+        cmd = mpPy6.CCommandRecord('remote', 'add', 1, 2)
+        cmd.cmd_id = 1
+        # The clock of the control class is an hour behind the one of the agent, the command has 10 s left
+        cmd.deadline = time.time() - 3600
+        conn.send(('cmd', 0, cmd, 10))
+        answers = []
+        while not answers and conn.poll(10):
+            kind, record = conn.recv()
+            if kind == 'state':
+                answers += [r for r in (record if isinstance(record, list) else [record]) if r.cmd_id == 1]
+        conn.send(('stop',))
+        conn.close()
+        self.assertEqual(len(answers), 1)
+        self.assertIsInstance(answers[0], mpPy6.CResultRecord)
+        self.assertEqual(answers[0].result, 103)
+
+    def test_wrong_authkey_is_rejected(self):
+        with self.assertRaises(connection.AuthenticationError):
+            connection.Client(self.address, authkey=b'wrong')
+
+
+if __name__ == '__main__':
+    unittest.main()
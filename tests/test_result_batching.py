@@ -0,0 +1,91 @@
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+
+
+class TelemetryChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+        self._position = 0
+
+    @mpPy6.CProperty
+    def position(self):
+        return self._position
+
+    @position.setter('position_changed')
+    def position(self, value: int):
+        self._position = value
+
+    @mpPy6.CProcess.register_signal(signal_name='sweep_finished')
+    def sweep(self, steps: int):
+        for step in range(steps):
+            self.position = step
+        return steps
+
+
+class TelemetryChildProcessControl(mpPy6.CProcessControl):
+    position_changed = mpPy6.Signal(object, name='position_changed')
+    sweep_finished = mpPy6.Signal(int, name='sweep_finished')
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(TelemetryChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def sweep(self, steps: int):
+        pass
+
+
+class TestResultBatching(ControlTestCase):
+
+    def make_control(self):
+        return TelemetryChildProcessControl(result_batch_interval=0.05, result_batch_size=500)
+
+    def setUp(self):
+        super().setUp()
+        self.positions = []
+        self.finished = []
+        self.control.position_changed.connect(self.positions.append)
+        self.control.sweep_finished.connect(self.finished.append)
+
+    def test_latest_value_wins(self):
+        self.control.set_signal_coalescing('position_changed', mpPy6.CProcessControl.COALESCE_LATEST)
+        self.control.sweep(2000)
+        self.assertTrue(wait_for(lambda: self.finished == [2000] and self.positions[-1:] == [1999]))
+        self.assertLess(len(self.positions), 2000)
+        self.assertEqual(self.positions[-1], 1999)
+
+    def test_deliver_as_list(self):
+        self.control.set_signal_coalescing('position_changed', mpPy6.CProcessControl.COALESCE_LIST)
+        self.control.sweep(2000)
+        self.assertTrue(wait_for(lambda: sum(len(chunk) for chunk in self.positions) == 2000))
+        self.assertTrue(all(isinstance(p, list) for p in self.positions))
+        self.assertEqual([p for chunk in self.positions for p in chunk], list(range(2000)))
+
+    def test_pending_batch_is_sent_when_idle(self):
+        self.control.sweep(3)
+        self.assertTrue(wait_for(lambda: self.finished == [3]))
+        self.assertEqual(self.positions, [0, 1, 2])
+
+
+class TestResultBatchSizeOnly(ControlTestCase):
+
+    def make_control(self):
+        return TelemetryChildProcessControl(result_batch_size=10)
+
+    def setUp(self):
+        super().setUp()
+        self.finished = []
+        self.control.sweep_finished.connect(self.finished.append)
+
+    def test_partial_batch_is_sent_when_idle(self):
+        # Fewer results than result_batch_size, without result_batch_interval
+        self.control.sweep(1)
+        self.assertTrue(wait_for(lambda: self.finished == [1], timeout=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import os
+import time
+import unittest
+
+from helpers import ControlTestCase, shut_down, wait_for
+
+import numpy as np
+
+import mpPy6
+
+
+class SharedMemoryChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(signal_name='frame_acquired')
+    def acquire_frame(self, rows: int, cols: int):
+        return np.arange(rows * cols, dtype=np.float64).reshape(rows, cols)
+
+    @mpPy6.CProcess.register_signal(signal_name='trace_acquired')
+    def acquire_trace(self, size: int):
+        return b"\x01" * size, size
+
+    @mpPy6.CProcess.register_signal(signal_name='waveform_uploaded')
+    def upload_waveform(self, waveform, name: str = None):
+        # Report, whether the argument has been received as view of a shared memory segment
+        return float(waveform.sum()), not waveform.flags.owndata
+
+    @mpPy6.CProcess.register_signal()
+    def sleep(self, duration: float):
+        time.sleep(duration)
+
+    @mpPy6.CProcess.register_signal()
+    def store_waveform(self, waveform):
+        return waveform.size
+
+
+class SharedMemoryChildProcessControl(mpPy6.CProcessControl):
+    frame_acquired = mpPy6.Signal(object, name='frame_acquired')
+    trace_acquired = mpPy6.Signal(bytes, int, name='trace_acquired')
+    waveform_uploaded = mpPy6.Signal(float, bool, name='waveform_uploaded')
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(SharedMemoryChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def acquire_frame(self, rows: int, cols: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def acquire_trace(self, size: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function(shared_memory=True)
+    def upload_waveform(self, waveform, name: str = None):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def sleep(self, duration: float):
+        pass
+
+    @mpPy6.CProcessControl.register_function(shared_memory=True, timeout=0.1)
+    def store_waveform(self, waveform):
+        pass
+
+
+def shared_memory_segments() -> int:
+    return len([name for name in os.listdir('/dev/shm') if name.startswith('psm_')])
+
+
+class TestSharedMemoryResults(ControlTestCase):
+
+    def make_control(self):
+        return SharedMemoryChildProcessControl(shared_memory_threshold=1024)
+
+    def test_array_is_received_from_shared_memory(self):
+        frames = []
+        self.control.frame_acquired.connect(frames.append)
+        self.control.acquire_frame(1000, 1000)
+        self.assertTrue(wait_for(lambda: len(frames) == 1))
+        self.assertEqual(frames[0].shape, (1000, 1000))
+        self.assertEqual(frames[0][999, 999], 999999.0)
+
+    def test_bytes_in_tuple_are_received_from_shared_memory(self):
+        traces = []
+        self.control.trace_acquired.connect(lambda data, size: traces.append((data, size)))
+        self.control.acquire_trace(4096)
+        self.assertTrue(wait_for(lambda: len(traces) == 1))
+        self.assertEqual(traces[0], (b"\x01" * 4096, 4096))
+
+    def test_segments_are_closed_after_use(self):
+        frames = []
+        self.control.frame_acquired.connect(frames.append)
+        self.control.acquire_frame(100, 100)
+        self.assertTrue(wait_for(lambda: len(frames) == 1))
+        self.assertEqual(len(self.control._shared_memory), 1)
+        frames.clear()
+        self.control._shared_memory.sweep()
+        self.assertEqual(len(self.control._shared_memory), 0)
+
+    def test_arguments_are_passed_using_shared_memory(self):
+        uploads = []
+        self.control.waveform_uploaded.connect(lambda total, shared: uploads.append((total, shared)))
+        self.control.upload_waveform(np.ones(10), name="small")
+        self.control.upload_waveform(waveform=np.ones(1000))
+        self.assertTrue(wait_for(lambda: len(uploads) == 2))
+        self.assertEqual(uploads, [(10.0, True), (1000.0, True)])
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), "Segments are not listed in /dev/shm.")
+    def test_arguments_of_skipped_commands_are_released(self):
+        segments = shared_memory_segments()
+        self.control.sleep(0.5)
+        expired = [self.control.store_waveform(np.ones(1 << 17)) for _ in range(5)]
+        cancelled = self.control.store_waveform(np.ones(1 << 17))
+        self.control.cancel_command(cancelled.cmd_id)
+        # Not executed: the deadline has passed while the child was busy, or the command has been cancelled
+        for future in expired:
+            with self.assertRaises(TimeoutError):
+                future.result(timeout=10)
+        self.assertTrue(cancelled.cancelled())
+        self.assertTrue(wait_for(lambda: shared_memory_segments() == segments))
+
+    @unittest.skipUnless(os.path.isdir('/dev/shm'), "Segments are not listed in /dev/shm.")
+    def test_arguments_of_queued_commands_are_released_on_exit(self):
+        segments = shared_memory_segments()
+        self.control.sleep(0.5)
+        futures = [self.control.upload_waveform(np.ones(1 << 17)) for _ in range(10)]
+        time.sleep(0.1)
+        shut_down(self.control)
+        # Never taken by the child
+        for future in futures:
+            with self.assertRaises(ChildProcessError):
+                future.result(timeout=10)
+        self.assertTrue(wait_for(lambda: shared_memory_segments() == segments))
+
+
+if __name__ == '__main__':
+    unittest.main()
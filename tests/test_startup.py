@@ -0,0 +1,64 @@
+import importlib
+import os
+import subprocess
+import sys
+import unittest
+
+from helpers import SRC, shut_down
+
+import mpPy6
+
+
+# Qt is only imported by the tests, since the forkserver children import this module to load the child class
+class StartupChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def parent_pid(self):
+        return os.getppid()
+
+
+def make_control(**kwargs):
+    class StartupChildProcessControl(mpPy6.CProcessControl):
+
+        def __init__(self, parent=None, *args, **kwargs):
+            super().__init__(parent, *args, **kwargs)
+            self.register_child_process(StartupChildProcess)
+
+        @mpPy6.CProcessControl.register_function()
+        def parent_pid(self):
+            pass
+
+    return StartupChildProcessControl(**kwargs)
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_import_does_not_load_qt(self):
+        code = ("import sys; sys.path.insert(0, sys.argv[1]); import mpPy6; "
+                "print([m for m in ('PySide6', 'rich', 'asyncio') if m in sys.modules])")
+        output = subprocess.run([sys.executable, '-c', code, SRC], capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), '[]')
+
+    def test_lazy_attributes(self):
+        from PySide6.QtCore import Signal
+        self.assertIs(mpPy6.Signal, Signal)
+        # Importing the submodule does not hide the class
+        importlib.import_module('mpPy6.CProcessControl')
+        self.assertTrue(isinstance(mpPy6.CProcessControl, type))
+
+    def test_forkserver(self):
+        from PySide6.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv)
+        control = make_control(start_method='forkserver', preload=[__name__])
+        try:
+            # The child is forked by the server, not by this process
+            self.assertNotEqual(control.parent_pid().result(timeout=30), os.getpid())
+        finally:
+            shut_down(control)
+
+
+if __name__ == '__main__':
+    unittest.main()
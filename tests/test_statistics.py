@@ -0,0 +1,79 @@
+import time
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+from mpPy6.CStatistics import CStatistics
+
+
+class StatisticsChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def work(self, duration: float):
+        time.sleep(duration)
+
+
+class StatisticsChildProcessControl(mpPy6.CProcessControl):
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(StatisticsChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def work(self, duration: float):
+        pass
+
+
+class TestCStatistics(unittest.TestCase):
+
+    def test_percentiles_and_histogram(self):
+        statistics = CStatistics()
+        for i in range(1, 101):
+            statistics.add('f', CStatistics.EXECUTION, i / 1000)
+        summary = statistics.snapshot()['f'][CStatistics.EXECUTION]
+        self.assertEqual(summary['count'], 100)
+        self.assertAlmostEqual(summary['mean'], 0.0505)
+        self.assertAlmostEqual(summary['p50'], 0.051)
+        self.assertAlmostEqual(summary['p99'], 0.1)
+        self.assertEqual(summary['max'], 0.1)
+        self.assertEqual(summary['histogram'][1e-3], 1)
+        self.assertEqual(summary['histogram'][1e-2], 9)
+        self.assertEqual(summary['histogram'][1e-1], 90)
+
+
+class TestCommandStatistics(ControlTestCase):
+
+    def make_control(self):
+        return StatisticsChildProcessControl()
+
+    def test_stages_are_measured(self):
+        futures = [self.control.work(0.1) for _ in range(5)]
+        for f in futures:
+            f.result(timeout=5)
+        # The future is resolved after the signal has been emitted
+        statistics = self.control.command_statistics('work')['work']
+        self.assertEqual(statistics[CStatistics.EXECUTION]['count'], 5)
+        self.assertAlmostEqual(statistics[CStatistics.EXECUTION]['p50'], 0.1, delta=0.05)
+        # The last command waited for the four commands before
+        self.assertGreater(statistics[CStatistics.QUEUE_WAIT]['max'], 0.3)
+        self.assertGreater(statistics[CStatistics.TOTAL]['max'], 0.45)
+        self.assertIn(CStatistics.RESULT_WAIT, statistics)
+
+        child_statistics = self.control.get_command_statistics().result(timeout=5)
+        self.assertEqual(child_statistics['work'][CStatistics.EXECUTION]['count'], 5)
+
+    def test_statistics_are_emitted_periodically(self):
+        snapshots = []
+        self.control.on_statistics_updated.connect(snapshots.append)
+        self.control.set_statistics_interval(0.1)
+        self.control.work(0).result(timeout=5)
+        self.assertTrue(wait_for(lambda: len(snapshots) >= 2, timeout=5))
+        self.assertIn('work', snapshots[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
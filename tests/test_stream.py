@@ -0,0 +1,124 @@
+import threading
+import unittest
+
+import numpy as np
+
+from helpers import ControlTestCase
+
+import mpPy6
+
+
+class StreamChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal()
+    def acquire(self, frames: int):
+        for i in range(frames):
+            self.streams['frames'].write(np.full((4, 8), i, dtype=np.uint16))
+        return frames
+
+
+class StreamChildProcessControl(mpPy6.CProcessControlCore):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.register_child_process(StreamChildProcess)
+
+    @mpPy6.CProcessControlCore.register_function()
+    def acquire(self, frames: int):
+        pass
+
+
+class TestCStream(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = mpPy6.CStream('test', slot_size=16, slots=4)
+        self.notifications = []
+        self.stream._notify = self.notifications.append
+
+    def tearDown(self):
+        self.stream.close()
+
+    def test_items_wrap_around(self):
+        for i in range(10):
+            self.assertTrue(self.stream.write(bytes([i]) * (i + 1)))
+            self.assertEqual(self.stream.read(), [bytes([i]) * (i + 1)])
+        self.assertEqual(len(self.stream), 0)
+
+    def test_only_first_item_after_read_is_announced(self):
+        self.stream.write(b'a')
+        self.stream.write(b'b')
+        self.assertEqual(self.notifications, ['test'])
+        self.assertEqual(self.stream.read(max_items=1), [b'a'])
+        # Not emptied, thus the reader does not wait for a notification
+        self.stream.write(b'c')
+        self.assertEqual(self.stream.read(), [b'b', b'c'])
+        self.stream.write(b'd')
+        self.assertEqual(self.notifications, ['test', 'test'])
+
+    def test_full_stream(self):
+        for i in range(4):
+            self.stream.write(bytes([i]))
+        self.assertFalse(self.stream.write(b'x', timeout=0.01))
+        self.stream.drop_if_slow = True
+        self.assertFalse(self.stream.write(b'x'))
+        self.assertEqual(self.stream.dropped, 1)
+        self.assertEqual(self.stream.read(), [bytes([i]) for i in range(4)])
+        with self.assertRaises(ValueError):
+            self.stream.write(bytes(17))
+
+    def test_lost_notification_is_taken(self):
+        self.assertFalse(self.stream.take_lost_notification())
+        # The writer did not see the request of the reader
+        self.stream._index[mpPy6.CStream.NOTIFY] = 0
+        self.stream.write(b'a')
+        self.stream._index[mpPy6.CStream.NOTIFY] = 1
+        self.assertEqual(self.notifications, [])
+        self.assertTrue(self.stream.take_lost_notification())
+        self.assertFalse(self.stream.take_lost_notification())
+        self.assertEqual(self.stream.read(), [b'a'])
+        self.assertFalse(self.stream.take_lost_notification())
+
+
+class TestStreamControl(ControlTestCase):
+
+    qt = False
+
+    def make_control(self):
+        return StreamChildProcessControl()
+
+    def test_child_streams_frames(self):
+        frames = self.control.create_stream('frames', slot_size=64, slots=8, dtype=np.uint16, shape=(4, 8))
+        received, done = [], threading.Event()
+
+        def on_stream_data(name):
+            received.extend(frames.read())
+            if len(received) == 100:
+                done.set()
+
+        self.control.on_stream_data.connect(on_stream_data)
+        self.assertEqual(self.control.acquire(100).result(timeout=10), 100)
+        # Every item is announced or read together with an announced one
+        self.assertTrue(done.wait(timeout=10))
+        self.assertEqual([int(frame[0, 0]) for frame in received], list(range(100)))
+        self.assertEqual(received[-1].shape, (4, 8))
+        # The notifications are no results of the child
+        self.assertEqual(self.control.command_statistics('attach_stream')['attach_stream']['emit']['count'], 1)
+
+    def test_lost_notification_is_announced(self):
+        frames = self.control.create_stream('frames', slot_size=64, slots=8, dtype=np.uint16, shape=(4, 8))
+        announced = threading.Event()
+        self.control.on_stream_data.connect(lambda name: announced.set())
+        # The writer does not see the request for a notification
+        frames._index[mpPy6.CStream.NOTIFY] = 0
+        self.assertEqual(self.control.acquire(3).result(timeout=10), 3)
+        frames._index[mpPy6.CStream.NOTIFY] = 1
+        # Announced by the periodic check of the control class
+        self.assertTrue(announced.wait(timeout=10))
+        self.assertEqual(len(frames.read()), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
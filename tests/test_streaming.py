@@ -0,0 +1,117 @@
+import asyncio
+import time
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+
+
+class StreamChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+
+    @mpPy6.CProcess.register_signal(signal_name='chunk', finished_signal_name='acquired')
+    def acquire(self, n: int):
+        for i in range(n):
+            yield i
+        return n
+
+    @mpPy6.CProcess.register_signal(signal_name='chunk')
+    def acquire_forever(self):
+        i = 0
+        while True:
+            time.sleep(0.01)
+            yield i
+            i += 1
+
+    @mpPy6.CProcess.register_signal(signal_name='chunk', finished_signal_name='acquired_async')
+    async def acquire_async(self, n: int):
+        for i in range(n):
+            await asyncio.sleep(0)
+            yield i
+
+    @mpPy6.CProcess.register_signal()
+    def echo(self, value):
+        return value
+
+
+class StreamChildProcessControl(mpPy6.CProcessControl):
+    chunk = mpPy6.Signal(int)
+    acquired = mpPy6.Signal(int)
+    # Asynchronous generators have no return value, the signal is emitted without arguments
+    acquired_async = mpPy6.Signal()
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(StreamChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def acquire(self, n: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def acquire_forever(self):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def acquire_async(self, n: int):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def echo(self, value):
+        pass
+
+
+class TestStreaming(ControlTestCase):
+
+    def make_control(self):
+        return StreamChildProcessControl()
+
+    def setUp(self):
+        super().setUp()
+        self.chunks, self.finished = [], []
+        self.control.chunk.connect(self.chunks.append)
+        self.control.acquired.connect(self.finished.append)
+
+    def test_generator_streams_items(self):
+        future = self.control.acquire(5)
+        self.assertEqual(future.result(timeout=5), 5)
+        self.assertTrue(wait_for(lambda: self.finished == [5]))
+        # The items are emitted in order, before the completion signal
+        self.assertEqual(self.chunks, [0, 1, 2, 3, 4])
+
+    def test_async_generator_streams_items(self):
+        finished = []
+        self.control.acquired_async.connect(lambda: finished.append(True))
+        self.assertIsNone(self.control.acquire_async(3).result(timeout=5))
+        self.assertTrue(wait_for(lambda: finished == [True]))
+        self.assertEqual(self.chunks, [0, 1, 2])
+
+    def test_cancel_stream(self):
+        future = self.control.acquire_forever()
+        self.assertTrue(wait_for(lambda: len(self.chunks) >= 3))
+        self.control.cancel_command(future.cmd_id)
+        self.assertTrue(future.cancelled())
+        # Executed while the stream was running, its answer is included in the statistics
+        self.assertTrue(wait_for(lambda: 'execution' in self.control.command_statistics().get('cancel_command', {})))
+
+        # The child is able to execute other commands again
+        self.assertEqual(self.control.echo(1).result(timeout=5), 1)
+        wait_for(lambda: False, timeout=0.2)
+        n = len(self.chunks)
+        wait_for(lambda: False, timeout=0.2)
+        self.assertEqual(len(self.chunks), n)
+
+    def test_cancel_queued_command(self):
+        running = self.control.acquire_forever()
+        queued = self.control.echo(2)
+        self.control.cancel_command(queued.cmd_id)
+        self.control.cancel_command(running.cmd_id)
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(self.control.echo(3).result(timeout=5), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
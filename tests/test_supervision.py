@@ -0,0 +1,151 @@
+import os
+import signal
+import time
+import unittest
+
+from helpers import ControlTestCase, wait_for
+
+import mpPy6
+
+
+class SupervisedChildProcess(mpPy6.CProcess):
+
+    def __init__(self, state_queue, cmd_queue, kill_flag, *args, **kwargs):
+        super().__init__(state_queue, cmd_queue, kill_flag, *args, **kwargs)
+        self.initialized = False
+
+    def postrun_init(self):
+        self.initialized = True
+
+    @mpPy6.CProcess.register_signal()
+    def get_pid(self):
+        return os.getpid() if self.initialized else None
+
+    @mpPy6.CProcess.register_signal()
+    def crash(self):
+        os._exit(3)
+
+    @mpPy6.CProcess.register_signal(signal_name='flooded')
+    def flood(self, duration: float):
+        t_end = time.time() + duration
+        while time.time() < t_end:
+            yield os.getpid()
+
+    @mpPy6.CProcess.register_signal(signal_name='flooded_large')
+    def flood_large(self, size: int, duration: float):
+        # Records much larger than PIPE_BUF, not transferred via shared memory
+        t_end = time.time() + duration
+        while time.time() < t_end:
+            yield os.getpid(), bytes(size)
+
+
+class SupervisedChildProcessControl(mpPy6.CProcessControl):
+
+    def __init__(self, parent=None, *args, **kwargs):
+        super().__init__(parent, *args, **kwargs)
+        self.register_child_process(SupervisedChildProcess)
+
+    @mpPy6.CProcessControl.register_function()
+    def get_pid(self):
+        pass
+
+    @mpPy6.CProcessControl.register_function()
+    def crash(self):
+        pass
+
+
+class FloodedChildProcessControl(mpPy6.CProcessControlCore):
+    flooded = mpPy6.CSignal(int)
+    flooded_large = mpPy6.CSignal(int, bytes)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.register_child_pool(SupervisedChildProcess, 2)
+
+    @mpPy6.CProcessControlCore.register_function()
+    def flood(self, duration: float):
+        pass
+
+    @mpPy6.CProcessControlCore.register_function()
+    def flood_large(self, size: int, duration: float):
+        pass
+
+
+class TestSupervision(ControlTestCase):
+
+    def crash_child(self) -> dict:
+        restarts = []
+        self.control.on_child_restarted.connect(restarts.append)
+        first_pid = self.control.get_pid().result(timeout=10)
+        future = self.control.crash()
+        self.assertTrue(wait_for(lambda: len(restarts) == 1))
+        # The command executed by the crashed child is not answered anymore
+        self.assertIsInstance(future.exception(timeout=10), ChildProcessError)
+        self.assertEqual(restarts[0]['ended_pid'], first_pid)
+        self.assertEqual(restarts[0]['exitcode'], 3)
+        # The replacement has been initialized and takes the commands
+        self.assertEqual(self.control.get_pid().result(timeout=10), restarts[0]['pid'])
+        self.assertNotEqual(restarts[0]['pid'], first_pid)
+        self.assertEqual(self.control.supervision_statistics()['restarts'], 1)
+        return restarts[0]
+
+    def test_restart(self):
+        self.control = SupervisedChildProcessControl(restart_children=True)
+        self.crash_child()
+        self.assertEqual(self.control.child_process_pid, self.control.child.pid)
+
+    def test_restart_with_standby(self):
+        self.control = SupervisedChildProcessControl(restart_children=True, standby_children=1)
+        standby_pid = self.control._standby_children[0].pid
+        self.assertEqual(self.crash_child()['pid'], standby_pid)
+        # A new standby child is started for the next failure
+        self.assertEqual(self.control.supervision_statistics()['standby'], 1)
+        self.assertNotEqual(self.control._standby_children[0].pid, standby_pid)
+
+    def test_restart_while_other_worker_floods_results(self):
+        self.control = FloodedChildProcessControl(restart_children=True)
+        flooding = []
+        self.control.flooded.connect(flooding.append)
+        future = self.control.flood(3)
+        self.assertTrue(wait_for(lambda: len(flooding) > 0))
+        idle_pid = [pid for pid in self.control.child_process_pids if pid != flooding[0]][0]
+        t_killed = time.time()
+        os.kill(idle_pid, signal.SIGKILL)
+        while self.control.supervision_statistics()['restarts'] == 0 and time.time() < t_killed + 10:
+            time.sleep(0.001)
+        # Replaced while the state queue is still busy
+        self.assertLess(time.time() - t_killed, 1)
+        self.assertFalse(future.done())
+        self.assertNotIn(idle_pid, self.control.child_process_pids)
+
+    def test_restart_after_kill_while_sending_large_record(self):
+        self.control = FloodedChildProcessControl(restart_children=True)
+        received = []
+        self.control.flooded_large.connect(lambda pid, data: received.append(pid))
+        self.control.flood_large(8_000_000, 10)
+        self.assertTrue(wait_for(lambda: len(received) > 2))
+        flooding_pid = received[0]
+        # Most likely killed while a record is written into its state queue
+        os.kill(flooding_pid, signal.SIGKILL)
+        self.assertTrue(wait_for(lambda: self.control.supervision_statistics()['restarts'] == 1))
+        self.assertNotIn(flooding_pid, self.control.child_process_pids)
+        # The monitor does not wait for the rest of the record, the other child and the replacement keep working
+        flooding = set()
+        self.control.flooded.connect(flooding.add)
+        futures = [self.control.flood(1), self.control.flood(1)]
+        for future in futures:
+            future.result(timeout=10)
+        self.assertEqual(flooding, set(self.control.child_process_pids))
+        self.assertEqual(self.control.queue_statistics()['state_queue']['dropped_oldest'], 0)
+
+    def test_no_restart_by_default(self):
+        self.control = SupervisedChildProcessControl()
+        future = self.control.crash()
+        self.control.child.join(timeout=10)
+        self.assertFalse(self.control.child.is_alive())
+        self.assertIsInstance(future.exception(timeout=10), ChildProcessError)
+        self.assertEqual(self.control.supervision_statistics()['restarts'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
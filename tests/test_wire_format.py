@@ -0,0 +1,68 @@
+import pickle
+import unittest
+
+import helpers  # Sets up the path of mpPy6 and the Qt platform
+
+import mpPy6
+
+
+class WireChildProcess(mpPy6.CProcess):
+
+    @mpPy6.CProcess.register_signal(postfix='_changed')
+    def set_point(self, value: float):
+        return value
+
+    @mpPy6.CProcess.register_signal()
+    def reset(self):
+        pass
+
+
+class TestWireFormat(unittest.TestCase):
+
+    def test_records_have_no_dict(self):
+        self.assertFalse(hasattr(mpPy6.CCommandRecord(None, 'reset'), '__dict__'))
+        self.assertFalse(hasattr(mpPy6.CResultRecord('reset', None, None), '__dict__'))
+
+    def test_signal_table(self):
+        commands = WireChildProcess.command_table()
+        signals = WireChildProcess.signal_table()
+        self.assertEqual(len(commands), len(signals))
+        self.assertEqual(signals[commands.index('set_point')], 'set_point_changed')
+        self.assertIsNone(signals[commands.index('reset')])
+
+    def test_command_sent_by_id(self):
+        commands = WireChildProcess.command_table()
+        cmd = mpPy6.CCommandRecord('Controller', 'set_point', 1.5, key='value')
+        cmd.func_id = commands.index('set_point')
+        cmd.cmd_id, cmd.t_sent = 7, 123.0
+
+        data = pickle.dumps(cmd)
+        self.assertNotIn(b'set_point', data)
+        received = pickle.loads(data)
+        self.assertIsNone(received.func_name)
+        received.resolve_names(commands, 'Child')
+        self.assertEqual((received.func_name, received.proc_name), ('set_point', 'Child'))
+        self.assertEqual((received.args, received.kwargs, received.cmd_id, received.t_sent),
+                         ((1.5,), {'key': 'value'}, 7, 123.0))
+
+    def test_result_sent_by_id(self):
+        commands, signals = WireChildProcess.command_table(), WireChildProcess.signal_table()
+        res = mpPy6.CResultRecord('set_point', 'set_point_changed', 1.5, cmd_id=3)
+        res.func_id = res.signal_id = commands.index('set_point')
+
+        data = pickle.dumps(res)
+        self.assertNotIn(b'set_point', data)
+        received = pickle.loads(data)
+        received.resolve_names(commands, signals)
+        self.assertEqual((received.function_name, received.signal_name, received.result, received.cmd_id),
+                         ('set_point', 'set_point_changed', 1.5, 3))
+        self.assertEqual(received.t_finished, res.t_finished)
+
+    def test_unknown_names_are_sent(self):
+        res = pickle.loads(pickle.dumps(mpPy6.CResultRecord('fset', 'value_changed', 2)))
+        res.resolve_names((), ())
+        self.assertEqual((res.function_name, res.signal_name, res.result), ('fset', 'value_changed', 2))
+
+
+if __name__ == '__main__':
+    unittest.main()